@@ -5,13 +5,21 @@ import hashlib
 import hmac
 import json
 import secrets
+import threading
 import time
+from collections import OrderedDict
 from typing import Any
+from urllib.parse import unquote
 
 
 AUTH_COOKIE = "yahaha_session"
 PBKDF2_ITERATIONS = 310_000
 DEFAULT_SESSION_DAYS = 180
+SESSION_CACHE_SIZE = 1024
+# Signed asset URLs expire on hour boundaries so the same image keeps the same
+# URL (and browser cache entry) for an hour, and stays valid for at least a day.
+ASSET_URL_TTL_SECONDS = 24 * 3600
+ASSET_URL_BUCKET_SECONDS = 3600
 
 
 def _b64encode(value: bytes) -> str:
@@ -87,7 +95,8 @@ def issue_token(config: dict[str, Any], username: str) -> str:
     return f"{encoded}.{_b64encode(signature)}"
 
 
-def verify_token(config: dict[str, Any], token: str) -> str | None:
+def token_claims(config: dict[str, Any], token: str) -> tuple[str, int] | None:
+    """Return ``(username, expires_at)`` for a valid session token."""
     value = auth_config(config)
     try:
         encoded, provided = token.split(".", 1)
@@ -102,13 +111,90 @@ def verify_token(config: dict[str, Any], token: str) -> str | None:
         username = str(payload.get("sub") or "")
         if not username or username != str(value.get("username") or ""):
             return None
-        if int(payload.get("exp") or 0) <= int(time.time()):
+        expires_at = int(payload.get("exp") or 0)
+        if expires_at <= int(time.time()):
             return None
-        return username
+        return username, expires_at
     except (TypeError, ValueError, json.JSONDecodeError):
         return None
 
 
+def verify_token(config: dict[str, Any], token: str) -> str | None:
+    claims = token_claims(config, token)
+    return claims[0] if claims else None
+
+
+class SessionCache:
+    """Remembers verified session tokens until they expire.
+
+    Entries are only valid for the username and secret they were verified
+    against; a config change that touches either (new admin, logout-all
+    rotation) drops the whole cache. Failed tokens are never cached, so
+    garbage tokens cannot grow it.
+    """
+
+    def __init__(self, max_entries: int = SESSION_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._identity: tuple[str, str] = ("", "")
+        self._sessions: OrderedDict[str, tuple[str, int]] = OrderedDict()
+
+    def verify(self, config: dict[str, Any], token: str) -> str | None:
+        value = auth_config(config)
+        identity = (str(value.get("username") or ""), str(value.get("token_secret") or ""))
+        now = int(time.time())
+        with self._lock:
+            if identity != self._identity:
+                self._identity = identity
+                self._sessions.clear()
+            cached = self._sessions.get(token)
+            if cached and cached[1] > now:
+                self._sessions.move_to_end(token)
+                return cached[0]
+        claims = token_claims(config, token)
+        if not claims:
+            return None
+        with self._lock:
+            if identity == self._identity:
+                self._sessions[token] = claims
+                self._sessions.move_to_end(token)
+                while len(self._sessions) > self.max_entries:
+                    self._sessions.popitem(last=False)
+        return claims[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+def _asset_signature(config: dict[str, Any], path: str, expires_at: int) -> str:
+    secret = str(auth_config(config).get("token_secret") or "")
+    digest = hmac.new(secret.encode("utf-8"), f"asset\n{path}\n{expires_at}".encode("utf-8"), hashlib.sha256).digest()
+    return _b64encode(digest[:18])
+
+
+def sign_asset_url(config: dict[str, Any], url: str, *, now: float | None = None) -> str:
+    """Append ``exp`` and ``sig`` so a /data URL is served without a session.
+
+    Returned unchanged when authentication is not configured yet.
+    """
+    if not is_auth_configured(config) or "?" in url:
+        return url
+    current = int(time.time() if now is None else now)
+    expires_at = (current + ASSET_URL_TTL_SECONDS) // ASSET_URL_BUCKET_SECONDS * ASSET_URL_BUCKET_SECONDS + ASSET_URL_BUCKET_SECONDS
+    return f"{url}?exp={expires_at}&sig={_asset_signature(config, unquote(url), expires_at)}"
+
+
+def verify_asset_signature(config: dict[str, Any], path: str, expires: str, signature: str) -> bool:
+    """Check a signed URL; ``path`` is the decoded request path."""
+    if not is_auth_configured(config) or not expires.isdigit() or not signature:
+        return False
+    expires_at = int(expires)
+    if expires_at <= int(time.time()):
+        return False
+    return hmac.compare_digest(_asset_signature(config, path, expires_at), signature)
+
+
 def request_token(authorization: str | None, cookie_token: str | None) -> str:
     header = str(authorization or "").strip()
     if header.lower().startswith("bearer "):
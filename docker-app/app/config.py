@@ -6,14 +6,20 @@ from pathlib import Path
 import secrets
 import shutil
 import tempfile
+import threading
 from typing import Any
 
 import yaml
 
+from .metrics import CACHE_REQUESTS
+
 
 DATA_DIR = Path(os.environ.get("YAHAA_DATA_DIR", "/app/data"))
 CONFIG_PATH = DATA_DIR / "config.yaml"
 
+_CONFIG_CACHE_LOCK = threading.Lock()
+_CONFIG_CACHE: tuple[tuple[int, int, int], "FrozenConfig"] | None = None
+
 
 DEFAULT_CONFIG: dict[str, Any] = {
     "enabled": True,
@@ -24,6 +30,7 @@ DEFAULT_CONFIG: dict[str, Any] = {
     "lock_latest_sort": False,
     "cron": "",
     "delay": 60,
+    "generation_concurrency": 3,
     "emby_url": "",
     "emby_api_key": "",
     "jellyfin_url": "",
@@ -102,6 +109,66 @@ DEFAULT_CONFIG: dict[str, Any] = {
 }
 
 
+class FrozenConfig(dict):
+    """Read-only parsed configuration shared by every caller of config_snapshot().
+
+    Nested mappings are frozen as well and lists become tuples. deepcopy()
+    returns plain mutable containers, which is what load_config() hands out.
+    """
+
+    def _readonly(self, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("config snapshot is read-only; use load_config() for a mutable copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return thaw_config(self)
+
+
+def freeze_config(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenConfig((key, freeze_config(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_config(item) for item in value)
+    return value
+
+
+def thaw_config(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: thaw_config(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_config(item) for item in value]
+    return value
+
+
+def config_signature() -> tuple[int, int, int] | None:
+    try:
+        stat = CONFIG_PATH.stat()
+    except OSError:
+        return None
+    if not CONFIG_PATH.is_file():
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def remember_config(config: dict[str, Any], signature: tuple[int, int, int] | None) -> FrozenConfig:
+    global _CONFIG_CACHE
+    snapshot = freeze_config(config)
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE = (signature, snapshot) if signature else None
+    return snapshot
+
+
+def invalidate_config_cache() -> None:
+    global _CONFIG_CACHE
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE = None
+
+
 def ensure_data_dirs() -> None:
     for path in (
         DATA_DIR,
@@ -151,7 +218,31 @@ def infer_local_mode(raw: dict[str, Any]) -> dict[str, Any]:
     return raw
 
 
+def config_snapshot() -> FrozenConfig:
+    """Return the parsed configuration without re-reading an unchanged file.
+
+    The cache is keyed by the file's inode, size and mtime, so edits made by
+    hand or by another process are picked up on the next call, and
+    save_config() replaces it directly. The snapshot is shared and read-only.
+    """
+    signature = config_signature()
+    with _CONFIG_CACHE_LOCK:
+        cached = _CONFIG_CACHE
+    if signature and cached and cached[0] == signature:
+        CACHE_REQUESTS.inc(cache="config", result="hit")
+        return cached[1]
+    CACHE_REQUESTS.inc(cache="config", result="miss")
+    # Use the signature taken before reading: if the file changes (or is
+    # rewritten below) while it is parsed, the next call reads it again.
+    return remember_config(read_config(), signature)
+
+
 def load_config() -> dict[str, Any]:
+    """Return a private, mutable copy of the current configuration."""
+    return deepcopy(config_snapshot())
+
+
+def read_config() -> dict[str, Any]:
     ensure_data_dirs()
     if CONFIG_PATH.is_dir():
         backup_path = DATA_DIR / "config.yaml.invalid-dir"
@@ -169,7 +260,7 @@ def load_config() -> dict[str, Any]:
             return normalize_config(deep_merge(DEFAULT_CONFIG, raw))
     if not CONFIG_PATH.exists():
         save_config(DEFAULT_CONFIG)
-        return load_config()
+        return read_config()
     try:
         raw = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8")) or {}
     except Exception:
@@ -186,7 +277,8 @@ def load_config() -> dict[str, Any]:
 
 def save_config(config: dict[str, Any]) -> dict[str, Any]:
     ensure_data_dirs()
-    incoming = infer_local_mode(config or {}) if isinstance(config, dict) else {}
+    invalidate_config_cache()
+    incoming = infer_local_mode(thaw_config(config) or {}) if isinstance(config, dict) else {}
     normalized = normalize_config(deep_merge(DEFAULT_CONFIG, incoming))
     payload = yaml.safe_dump(normalized, allow_unicode=True, sort_keys=False)
     temp_path: Path | None = None
@@ -202,6 +294,7 @@ def save_config(config: dict[str, Any]) -> dict[str, Any]:
         saved = yaml.safe_load(CONFIG_PATH.read_text(encoding="utf-8"))
         if not isinstance(saved, dict):
             raise ValueError("配置文件写入后无法解析")
+        remember_config(normalized, config_signature())
     except Exception:
         try:
             if temp_path:
@@ -223,6 +316,10 @@ def normalize_config(config: dict[str, Any]) -> dict[str, Any]:
         config["log_retention_days"] = max(1, min(365, int(config.get("log_retention_days") or 7)))
     except (TypeError, ValueError):
         config["log_retention_days"] = 7
+    try:
+        config["generation_concurrency"] = max(1, min(8, int(config.get("generation_concurrency") or 3)))
+    except (TypeError, ValueError):
+        config["generation_concurrency"] = 3
     config["history_enabled"] = bool(config.get("history_enabled", config.get("save_recent_covers", True)))
     config["preview_font_enabled"] = bool(config.get("preview_font_enabled", True))
     config["font_subset_enabled"] = bool(config.get("font_subset_enabled", True))
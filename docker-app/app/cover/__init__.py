@@ -1,4 +1,3 @@
-from .renderer import CoverRenderer
-
-__all__ = ["CoverRenderer"]
+from .renderer import RENDER_CANCEL, CoverRenderer, RenderCancelled
 
+__all__ = ["CoverRenderer", "RENDER_CANCEL", "RenderCancelled"]
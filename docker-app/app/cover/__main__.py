@@ -0,0 +1,5 @@
+from .bulk import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,216 @@
+"""Per-style render benchmark with a JSON baseline and regression check.
+
+Times every ``CoverRenderer`` style across resolutions, frame counts and
+output formats. Each case runs in a fresh spawned process so its peak RSS is
+its own rather than the high-water mark of everything before it::
+
+    python -m app.cover.benchmark --save-baseline bench/baseline.json
+    python -m app.cover.benchmark --baseline bench/baseline.json --tolerance 0.25
+
+With ``--baseline`` the run exits non-zero when any case got slower (or
+grew its peak RSS) by more than the tolerance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any
+
+
+STATIC_STYLES = ("single_1", "single_2", "multi_1", "static_4")
+ANIMATED_STYLES = ("animated_1", "animated_2", "animated_3", "animated_4")
+STATIC_RESOLUTIONS = ("720p", "1080p", "4k")
+STATIC_FORMATS = ("jpg", "png")
+ANIMATED_RESOLUTIONS = ("320x180", "640x360")
+ANIMATED_FRAMES = (24, 96)
+ANIMATED_FORMATS = ("apng", "gif")
+ANIMATION_FPS = 12
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    style: str
+    resolution: str
+    output_format: str
+    frames: int = 1
+
+    @property
+    def case_id(self) -> str:
+        if self.style.startswith("animated_"):
+            return f"{self.style}/{self.resolution}/{self.frames}f/{self.output_format}"
+        return f"{self.style}/{self.resolution}/{self.output_format}"
+
+
+def build_cases(
+    styles: list[str] | None = None,
+    resolutions: list[str] | None = None,
+    formats: list[str] | None = None,
+    frames: list[int] | None = None,
+    quick: bool = False,
+) -> list[BenchmarkCase]:
+    def pick(values: tuple[Any, ...], wanted: list[Any] | None) -> tuple[Any, ...]:
+        if wanted:
+            values = tuple(value for value in values if value in wanted) or tuple(wanted)
+        return values[:1] if quick and not wanted else values
+
+    cases: list[BenchmarkCase] = []
+    for style in STATIC_STYLES:
+        if styles and style not in styles:
+            continue
+        for resolution, output_format in itertools.product(pick(STATIC_RESOLUTIONS, resolutions), pick(STATIC_FORMATS, formats)):
+            cases.append(BenchmarkCase(style, resolution, output_format))
+    for style in ANIMATED_STYLES:
+        if styles and style not in styles:
+            continue
+        for resolution, frame_count, output_format in itertools.product(
+            pick(ANIMATED_RESOLUTIONS, resolutions), pick(ANIMATED_FRAMES, frames), pick(ANIMATED_FORMATS, formats)
+        ):
+            cases.append(BenchmarkCase(style, resolution, output_format, frame_count))
+    return cases
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _run_case(case: BenchmarkCase, source_dir: str, repeat: int) -> dict[str, Any]:
+    from .presets import create_preset_layout
+    from .renderer import LOGGER, CoverRenderer
+
+    LOGGER.disabled = True
+    source_paths = sorted(Path(source_dir).glob("*.jpg"))
+    fonts_dir = Path(__file__).resolve().parents[1] / "bundled_fonts"
+    if not fonts_dir.exists():
+        fonts_dir = Path(__file__).resolve().parents[2] / "bundled-fonts"
+    renderer = CoverRenderer(fonts_dir)
+    config: dict[str, Any] = {"resolution": case.resolution, "output_format": case.output_format}
+    if case.style.startswith("animated_"):
+        config.update({
+            "animation_resolution": case.resolution,
+            "animation_format": case.output_format,
+            "animation_fps": ANIMATION_FPS,
+            "animation_duration": max(1, case.frames // ANIMATION_FPS),
+        })
+    else:
+        # Match the service: preset styles render through their canvas layout.
+        config["custom_static_layout"] = create_preset_layout(case.style)
+    rss_before = _peak_rss_mb()
+    timings: list[float] = []
+    output_bytes = 0
+    with tempfile.TemporaryDirectory() as work_dir:
+        for attempt in range(max(1, repeat)):
+            started = time.perf_counter()
+            output = renderer.render(source_paths, "基准测试", "Benchmark", case.style, config, Path(work_dir) / f"{attempt}.out")
+            timings.append(time.perf_counter() - started)
+            output_bytes = output.stat().st_size
+    peak = _peak_rss_mb()
+    return {
+        "wall_seconds": round(statistics.median(timings), 4),
+        "peak_rss_mb": peak,
+        "render_rss_mb": round(max(0.0, peak - rss_before), 1),
+        "output_bytes": output_bytes,
+    }
+
+
+def run_benchmark(cases: list[BenchmarkCase], repeat: int = 1) -> dict[str, Any]:
+    from ..mock import PALETTES, ensure_mock_images
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as raw:
+        source_dir = ensure_mock_images(Path(raw), "sources", "Benchmark", len(PALETTES))[0].parent
+        context = get_context("spawn")
+        for case in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                try:
+                    measured = pool.submit(_run_case, case, str(source_dir), repeat).result()
+                except Exception as exc:
+                    measured = {"error": f"{type(exc).__name__}: {exc}"}
+            results[case.case_id] = {**asdict(case), **measured}
+    return {
+        "created_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def compare_to_baseline(current: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[dict[str, Any]]:
+    """Return one entry per case whose wall time or peak RSS exceeds baseline * (1 + tolerance)."""
+    regressions: list[dict[str, Any]] = []
+    for case_id, result in current.get("cases", {}).items():
+        reference = baseline.get("cases", {}).get(case_id)
+        if not reference or "error" in reference:
+            continue
+        if "error" in result:
+            regressions.append({"case": case_id, "metric": "error", "current": result["error"]})
+            continue
+        for metric in ("wall_seconds", "peak_rss_mb"):
+            before = float(reference.get(metric) or 0)
+            after = float(result.get(metric) or 0)
+            if before > 0 and after > before * (1 + tolerance):
+                regressions.append({"case": case_id, "metric": metric, "baseline": before, "current": after, "ratio": round(after / before, 3)})
+    return regressions
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.cover.benchmark", description="Benchmark every CoverRenderer style.")
+    parser.add_argument("--style", action="append", dest="styles", help="Only this style; repeatable")
+    parser.add_argument("--resolution", action="append", dest="resolutions", help="Only this resolution; repeatable")
+    parser.add_argument("--format", action="append", dest="formats", help="Only this output format; repeatable")
+    parser.add_argument("--frames", action="append", type=int, help="Animated frame count; repeatable")
+    parser.add_argument("--quick", action="store_true", help="One resolution, format and frame count per style")
+    parser.add_argument("--repeat", type=int, default=1, help="Renders per case; the median is recorded")
+    parser.add_argument("--output", type=Path, help="Write this run's results to a JSON file")
+    parser.add_argument("--save-baseline", type=Path, help="Write this run as the new baseline")
+    parser.add_argument("--baseline", type=Path, help="Compare against this baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown / RSS growth as a fraction (default 0.25)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    cases = build_cases(args.styles, args.resolutions, args.formats, args.frames, args.quick)
+    if not cases:
+        print("No benchmark cases selected", file=sys.stderr)
+        return 2
+    report = run_benchmark(cases, args.repeat)
+    for case_id, result in report["cases"].items():
+        if "error" in result:
+            print(f"{case_id:34s}  failed: {result['error']}")
+        else:
+            print(f"{case_id:34s}  {result['wall_seconds']:8.3f}s  {result['peak_rss_mb']:8.1f}MB  {result['output_bytes']:>10d}B")
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    failed = any("error" in result for result in report["cases"].values())
+    if args.baseline:
+        regressions = compare_to_baseline(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for item in regressions:
+            if item["metric"] == "error":
+                print(f"REGRESSION {item['case']}: {item['current']}")
+            else:
+                print(f"REGRESSION {item['case']} {item['metric']}: {item['baseline']} -> {item['current']} (x{item['ratio']})")
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,152 @@
+"""Headless bulk rendering for local library folders.
+
+Renders every library under a ``local_images`` style input directory (one
+sub-folder per library, loose images in the root become "本地封面") without a
+media server, HTTP layer or history batch, and writes a JSON timing report
+next to the covers::
+
+    python -m app.cover --input /data/input --output /data/output --jobs 8
+
+Each library is rendered in its own worker process so throughput scales with
+cores rather than being capped by the GIL.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+
+_WORKER_SERVICE: Any = None
+
+
+def build_service(overrides: dict[str, Any]) -> Any:
+    # Imported lazily: app.services depends on this package.
+    from ..services import CoverService
+
+    service = CoverService()
+    service.config = {**service.config, **overrides}
+    return service
+
+
+def _init_worker(overrides: dict[str, Any]) -> None:
+    global _WORKER_SERVICE
+    _WORKER_SERVICE = build_service(overrides)
+
+
+def render_library(service: Any, library: dict[str, Any]) -> dict[str, Any]:
+    started = time.perf_counter()
+    entry: dict[str, Any] = {"library": library["name"], "source_count": library.get("image_count", 0)}
+    try:
+        if library["id"] == "local":
+            result = asyncio.run(service.generate_from_local())
+        else:
+            result = asyncio.run(service.generate_local_library(library["name"]))
+    except Exception as exc:
+        entry.update({"ok": False, "error": str(exc)})
+    else:
+        output = Path(result["output"])
+        entry.update({
+            "ok": True,
+            "style": result.get("style"),
+            "source_count": result.get("source_count", entry["source_count"]),
+            "output": str(output),
+            "bytes": output.stat().st_size if output.exists() else 0,
+        })
+    entry["seconds"] = round(time.perf_counter() - started, 4)
+    return entry
+
+
+def _render_in_worker(library: dict[str, Any]) -> dict[str, Any]:
+    return render_library(_WORKER_SERVICE, library)
+
+
+def run_bulk_render(
+    input_dir: Path,
+    output_dir: Path,
+    jobs: int = 1,
+    style: str = "",
+    library_names: list[str] | None = None,
+) -> dict[str, Any]:
+    """Render all (or the named) local libraries and return the timing report."""
+    overrides: dict[str, Any] = {
+        "local_mode": True,
+        "mock_enabled": False,
+        "history_enabled": False,
+        "covers_input": str(input_dir),
+        "covers_output": str(output_dir),
+    }
+    if style:
+        # A forced style replaces per-library scheme assignments.
+        overrides.update({"default_scheme_id": style, "library_scheme_rules": []})
+    service = build_service(overrides)
+    libraries = service.local_libraries()
+    if library_names:
+        wanted = set(library_names)
+        libraries = [library for library in libraries if library["name"] in wanted or library["id"] in wanted]
+    jobs = max(1, min(int(jobs), len(libraries) or 1))
+    started_at = datetime.now().astimezone()
+    started = time.perf_counter()
+    if jobs == 1:
+        results = [render_library(service, library) for library in libraries]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(overrides,)) as pool:
+            results = list(pool.map(_render_in_worker, libraries))
+    wall = time.perf_counter() - started
+    rendered = [item for item in results if item.get("ok")]
+    render_seconds = sum(float(item["seconds"]) for item in results)
+    return {
+        "started_at": started_at.isoformat(timespec="seconds"),
+        "input": str(input_dir),
+        "output": str(output_dir),
+        "jobs": jobs,
+        "style": style or None,
+        "libraries": len(results),
+        "rendered": len(rendered),
+        "failed": len(results) - len(rendered),
+        "wall_seconds": round(wall, 4),
+        "render_seconds": round(render_seconds, 4),
+        "covers_per_second": round(len(rendered) / wall, 4) if wall > 0 else 0.0,
+        "results": results,
+    }
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.cover", description="Render covers for local library folders without a media server.")
+    parser.add_argument("--input", required=True, type=Path, help="Directory with one sub-folder of images per library")
+    parser.add_argument("--output", required=True, type=Path, help="Directory for rendered covers and the timing report")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--style", default="", help="Force one style or scheme id for every library")
+    parser.add_argument("--library", action="append", dest="libraries", help="Only render this library; repeatable")
+    parser.add_argument("--report", type=Path, help="Timing report path (default: <output>/render_report.json)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+    input_dir = args.input.resolve()
+    if not input_dir.is_dir():
+        print(f"Input directory not found: {input_dir}", file=sys.stderr)
+        return 2
+    output_dir = args.output.resolve()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    report = run_bulk_render(input_dir, output_dir, args.jobs, args.style, args.libraries)
+    report_path = args.report or output_dir / "render_report.json"
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    for item in report["results"]:
+        status = "ok" if item.get("ok") else f"failed: {item.get('error')}"
+        print(f"{item['seconds']:8.2f}s  {item['library']}  {status}")
+    print(
+        f"{report['rendered']}/{report['libraries']} covers in {report['wall_seconds']:.2f}s "
+        f"with {report['jobs']} jobs ({report['covers_per_second']:.2f}/s), report: {report_path}"
+    )
+    return 0 if not report["failed"] else 1
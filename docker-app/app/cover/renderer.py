@@ -5,7 +5,9 @@ import colorsys
 import io
 import logging
 import math
+import threading
 import time
+from contextvars import ContextVar
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
@@ -23,6 +25,20 @@ RESOLUTIONS = {
 }
 LOGGER = logging.getLogger("yahaha_cover_studio")
 
+# Set by the caller (asyncio.to_thread copies it into the worker) so a
+# superseded preview can stop between frames and layers.
+RENDER_CANCEL: ContextVar[threading.Event | None] = ContextVar("render_cancel", default=None)
+
+
+class RenderCancelled(Exception):
+    pass
+
+
+def check_cancelled() -> None:
+    event = RENDER_CANCEL.get()
+    if event is not None and event.is_set():
+        raise RenderCancelled("render cancelled")
+
 
 class CoverRenderer:
     def __init__(self, fonts_dir: Path):
@@ -61,17 +77,29 @@ class CoverRenderer:
         if not images:
             raise ValueError("No source images available")
 
+        # Drafts are interactive previews: one still frame, fast encoders.
+        draft = bool(config.get("draft"))
         try:
-            if animated:
+            check_cancelled()
+            if animated and not draft:
                 self._save_animated(images, title, subtitle, style, size, config, output_path, output_format)
             else:
-                canvas = self._render_static_canvas(images, title, subtitle, style, size, config)
-                save_format = "PNG" if output_path.suffix.lower() == ".png" else "JPEG"
-                if save_format == "JPEG":
-                    canvas = canvas.convert("RGB")
-                    canvas.save(output_path, save_format, quality=92, optimize=True)
+                if animated:
+                    static_style = self._animated_static_style(style)
+                    canvas = self._render_static_canvas(images if style == "animated_3" else [images[0], *images], title, subtitle, static_style, size, config)
                 else:
-                    canvas.save(output_path, save_format, optimize=True)
+                    canvas = self._render_static_canvas(images, title, subtitle, style, size, config)
+                check_cancelled()
+                suffix = output_path.suffix.lower()
+                if suffix == ".gif":
+                    canvas.convert("RGB").convert("P", palette=Image.Palette.ADAPTIVE, colors=192).save(output_path, "GIF")
+                elif suffix == ".png" and draft:
+                    canvas.save(output_path, "PNG", compress_level=1)
+                elif suffix == ".png":
+                    canvas.save(output_path, "PNG", optimize=True)
+                else:
+                    canvas = canvas.convert("RGB")
+                    canvas.save(output_path, "JPEG", quality=80 if draft else 92, optimize=not draft)
             finished = time.perf_counter()
             LOGGER.info(
                 "封面渲染性能 style=%s images=%d decode_ms=%.1f render_encode_ms=%.1f total_ms=%.1f",
@@ -125,10 +153,10 @@ class CoverRenderer:
         duration_s = max(1, min(60, int(float(config.get("animation_duration") or 8))))
         total_frames = max(2, min(3600, fps * duration_s))
         frame_duration_ms = max(20, int(round(duration_s * 1000 / total_frames)))
-        frames = [
-            self._animated_frame(images, title, subtitle, style, size, config, index, total_frames)
-            for index in range(total_frames)
-        ]
+        frames = []
+        for index in range(total_frames):
+            check_cancelled()
+            frames.append(self._animated_frame(images, title, subtitle, style, size, config, index, total_frames))
         if output_format == "gif":
             palette_frames = [frame.convert("P", palette=Image.Palette.ADAPTIVE, colors=192) for frame in frames]
             palette_frames[0].save(
@@ -956,9 +984,11 @@ class CoverRenderer:
             background_z_index = 0
         canvas = Image.new("RGBA", design_size, (0, 0, 0, 0))
         for layer in (item for item in layers if float(item.get("zIndex") or 0) < background_z_index):
+            check_cancelled()
             self._draw_layout_layer(canvas, layer, images, title, subtitle, config)
         canvas.alpha_composite(background)
         for layer in (item for item in layers if float(item.get("zIndex") or 0) >= background_z_index):
+            check_cancelled()
             self._draw_layout_layer(canvas, layer, images, title, subtitle, config)
         text_mask = self._build_text_mask(layers, title, subtitle, config, design_size)
         if text_mask is not None:
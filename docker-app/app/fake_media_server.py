@@ -0,0 +1,392 @@
+"""Self-contained fake Emby/Jellyfin server for offline load testing.
+
+Serves the subset of the media server API that ``MediaServerClient`` and the
+MoviePilot plugin use: library listing, ``/Items`` paging and counts, item
+images with ``maxWidth``/``maxHeight`` and base64 cover uploads. Items are
+synthesized from their index, so a 10k-item library costs nothing until it is
+paged; artwork comes from the mock palettes in ``app.mock``.
+
+Latency, error rate and library sizes are configurable so paging, retry and
+upload throughput can be measured without a production server::
+
+    python -m app.fake_media_server --items 10000 --latency-ms 40 --error-rate 0.02
+
+Every route is also mounted under ``/emby`` because the plugin addresses the
+server as ``[HOST]emby/...``. ``GET /__fake/stats`` reports request and
+upload counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import binascii
+import io
+import random
+import tempfile
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+from fastapi import APIRouter, FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+from PIL import Image
+
+from .mock import MOCK_LIBRARIES, PALETTES, ensure_mock_images
+
+
+# Shows libraries expose one series per this many episodes, mirroring the
+# episodes/titles split that get_library_item_counts() asks for.
+EPISODES_PER_SERIES = 10
+ITEM_TYPES = {
+    "movies": ("Movie",),
+    "shows": ("Series", "Episode"),
+    "music": ("MusicAlbum",),
+}
+
+
+@dataclass
+class FakeServerOptions:
+    kind: str = "emby"
+    api_key: str = "fake-api-key"
+    items_per_library: int | None = None
+    libraries: list[dict[str, Any]] = field(default_factory=lambda: [dict(library) for library in MOCK_LIBRARIES])
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: int | None = None
+    image_dir: Path | None = None
+
+
+class FakeLibrary:
+    def __init__(self, index: int, raw: dict[str, Any], item_count: int) -> None:
+        self.index = index
+        self.id = str(raw.get("id") or f"fake-{index}")
+        self.name = str(raw.get("name") or self.id)
+        self.collection_type = str(raw.get("collection_type") or "movies")
+        self.item_count = max(0, int(item_count))
+        types = ITEM_TYPES.get(self.collection_type, ("Movie",))
+        if self.collection_type == "shows":
+            series = -(-self.item_count // EPISODES_PER_SERIES)
+            self.ranges = [("Series", series), ("Episode", self.item_count)]
+        else:
+            self.ranges = [(types[0], self.item_count)]
+
+    def folder(self, kind: str) -> dict[str, Any]:
+        payload = {
+            "Name": self.name,
+            "CollectionType": self.collection_type,
+            "Locations": [f"/media/{self.id}"],
+            "ItemId": self.id,
+            "RecursiveItemCount": self.item_count,
+        }
+        if kind == "emby":
+            payload["Id"] = self.id
+        return payload
+
+    def select(self, include_types: str) -> list[tuple[str, int]]:
+        wanted = {value.strip() for value in include_types.split(",") if value.strip()}
+        return [(item_type, count) for item_type, count in self.ranges if not wanted or item_type in wanted]
+
+    def item(self, item_type: str, position: int) -> dict[str, Any]:
+        item_id = f"{self.id}.{item_type.lower()}.{position}"
+        tag = f"{zlib.crc32(item_id.encode('utf-8')):08x}"
+        item: dict[str, Any] = {
+            "Id": item_id,
+            "Name": f"{self.name} {item_type} {position + 1}",
+            "Type": item_type,
+            "ParentId": self.id,
+            "TopParentId": self.id,
+            "DateCreated": time.strftime("%Y-%m-%dT%H:%M:%S.0000000Z", time.gmtime(1_700_000_000 - position * 3600)),
+            "ImageTags": {"Primary": tag},
+            "BackdropImageTags": [tag],
+            "PrimaryImageAspectRatio": 0.6667,
+            "Path": f"/media/{self.id}/{item_id}",
+        }
+        if item_type == "Episode":
+            series_id = f"{self.id}.series.{position // EPISODES_PER_SERIES}"
+            item.update({"SeriesId": series_id, "ParentBackdropItemId": series_id, "ParentBackdropImageTags": [tag]})
+        return item
+
+    def page(self, include_types: str, start: int, limit: int | None) -> tuple[list[dict[str, Any]], int]:
+        selected = self.select(include_types)
+        total = sum(count for _, count in selected)
+        end = total if limit is None else min(total, start + max(0, limit))
+        items: list[dict[str, Any]] = []
+        offset = 0
+        for item_type, count in selected:
+            for position in range(max(start, offset), min(end, offset + count)):
+                items.append(self.item(item_type, position - offset))
+            offset += count
+        return items, total
+
+    def find(self, item_id: str) -> dict[str, Any] | None:
+        _, _, rest = item_id.partition(f"{self.id}.")
+        item_type_key, _, raw_position = rest.partition(".")
+        for item_type, count in self.ranges:
+            if item_type.lower() == item_type_key and raw_position.isdigit() and int(raw_position) < count:
+                return self.item(item_type, int(raw_position))
+        return None
+
+
+class FakeMediaServer:
+    def __init__(self, options: FakeServerOptions | None = None) -> None:
+        self.options = options or FakeServerOptions()
+        self.random = random.Random(self.options.seed)
+        self.libraries = [
+            FakeLibrary(index, raw, self.options.items_per_library if self.options.items_per_library is not None else int(raw.get("item_count") or 0))
+            for index, raw in enumerate(self.options.libraries)
+        ]
+        self.requests: Counter[str] = Counter()
+        self.errors = 0
+        self.uploads: dict[str, int] = {}
+        self._image_dir = self.options.image_dir
+        self._image_lock = threading.Lock()
+        self._sources: list[Path] = []
+
+    def library(self, library_id: str) -> FakeLibrary | None:
+        for library in self.libraries:
+            if library.id == library_id:
+                return library
+        return None
+
+    def owner(self, item_id: str) -> FakeLibrary | None:
+        for library in self.libraries:
+            if item_id == library.id or item_id.startswith(f"{library.id}."):
+                return library
+        return None
+
+    def source_images(self) -> list[Path]:
+        with self._image_lock:
+            if not self._sources:
+                if self._image_dir is None:
+                    self._image_dir = Path(tempfile.mkdtemp(prefix="fake-media-server-"))
+                self._sources = ensure_mock_images(self._image_dir, "fake-server", "Fake Media", len(PALETTES))
+            return self._sources
+
+    def image_bytes(self, item_id: str, image_type: str, max_width: int | None, max_height: int | None, quality: int | None) -> bytes:
+        sources = self.source_images()
+        source = sources[zlib.crc32(item_id.encode("utf-8")) % len(sources)]
+        return _scaled_image(str(source), image_type.lower() == "primary", max_width or 0, max_height or 0, quality or 90)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": dict(self.requests),
+            "total_requests": sum(self.requests.values()),
+            "errors": self.errors,
+            "uploads": dict(self.uploads),
+        }
+
+
+@lru_cache(maxsize=256)
+def _scaled_image(source: str, portrait: bool, max_width: int, max_height: int, quality: int) -> bytes:
+    with Image.open(source) as raw:
+        image = raw.convert("RGB")
+    if portrait:
+        width = image.height * 2 // 3
+        left = (image.width - width) // 2
+        image = image.crop((left, 0, left + width, image.height))
+    if max_width or max_height:
+        image.thumbnail((max_width or image.width, max_height or image.height), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=max(1, min(100, int(quality))))
+    return buffer.getvalue()
+
+
+def _int_param(value: str | None) -> int | None:
+    try:
+        return int(value) if value not in (None, "") else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"invalid integer: {value}") from None
+
+
+def _route_group(request: Request) -> str:
+    path = request.url.path.removeprefix("/emby")
+    if path.startswith("/Library/"):
+        return "libraries"
+    if "/Images/" in path:
+        return "upload" if request.method == "POST" else "image"
+    if path.rstrip("/") == "/Items":
+        return "items"
+    if path.startswith("/Items/"):
+        return "item"
+    return "other"
+
+
+def create_fake_server_app(options: FakeServerOptions | None = None) -> FastAPI:
+    server = FakeMediaServer(options)
+    app = FastAPI(title="Fake media server")
+    app.state.fake_server = server
+    router = APIRouter()
+
+    @app.middleware("http")
+    async def simulate_conditions(request: Request, call_next):
+        if request.url.path.startswith("/__fake"):
+            return await call_next(request)
+        group = _route_group(request)
+        server.requests[group] += 1
+        delay = server.options.latency_ms + server.random.uniform(0, server.options.latency_jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        provided = request.query_params.get("api_key") or request.headers.get("X-Emby-Token") or ""
+        if server.options.api_key and provided != server.options.api_key:
+            return JSONResponse({"detail": "invalid api_key"}, status_code=401)
+        if server.options.error_rate > 0 and server.random.random() < server.options.error_rate:
+            server.errors += 1
+            return JSONResponse({"detail": "simulated failure"}, status_code=503)
+        return await call_next(request)
+
+    def virtual_folders() -> list[dict[str, Any]]:
+        return [library.folder(server.options.kind) for library in server.libraries]
+
+    @router.get("/Library/VirtualFolders/Query")
+    async def virtual_folders_query() -> dict[str, Any]:
+        folders = virtual_folders()
+        return {"Items": folders, "TotalRecordCount": len(folders)}
+
+    @router.get("/Library/VirtualFolders")
+    @router.get("/Library/VirtualFolders/")
+    async def virtual_folders_list() -> list[dict[str, Any]]:
+        return virtual_folders()
+
+    @router.get("/Library/MediaFolders")
+    async def media_folders() -> dict[str, Any]:
+        folders = [{**library.folder("emby"), "Id": library.id, "Type": "CollectionFolder"} for library in server.libraries]
+        return {"Items": folders, "TotalRecordCount": len(folders)}
+
+    @router.get("/Items")
+    @router.get("/Items/")
+    async def items(request: Request) -> dict[str, Any]:
+        params = request.query_params
+        include_types = params.get("IncludeItemTypes") or ""
+        if include_types == "CollectionFolder":
+            folders = [{**library.folder("emby"), "Id": library.id, "Type": "CollectionFolder"} for library in server.libraries]
+            return {"Items": folders, "TotalRecordCount": len(folders)}
+        library = server.library(params.get("ParentId") or "")
+        if library is None:
+            return {"Items": [], "TotalRecordCount": 0}
+        page, total = library.page(include_types, _int_param(params.get("StartIndex")) or 0, _int_param(params.get("Limit")))
+        return {"Items": page, "TotalRecordCount": total, "StartIndex": _int_param(params.get("StartIndex")) or 0}
+
+    @router.get("/Items/{item_id}")
+    async def item(item_id: str) -> dict[str, Any]:
+        library = server.owner(item_id)
+        found = library.find(item_id) if library else None
+        if found is None:
+            raise HTTPException(status_code=404, detail="item not found")
+        return found
+
+    @router.get("/Items/{item_id}/Images/{image_type}")
+    @router.get("/Items/{item_id}/Images/{image_type}/{image_index}")
+    async def item_image(item_id: str, image_type: str, request: Request, image_index: int = 0) -> Response:
+        if server.owner(item_id) is None:
+            raise HTTPException(status_code=404, detail="item not found")
+        params = request.query_params
+        data = await asyncio.to_thread(
+            server.image_bytes,
+            item_id,
+            image_type,
+            _int_param(params.get("maxWidth")),
+            _int_param(params.get("maxHeight")),
+            _int_param(params.get("quality")),
+        )
+        return Response(content=data, media_type="image/jpeg")
+
+    @router.post("/Items/{item_id}/Images/{image_type}")
+    async def upload_image(item_id: str, image_type: str, request: Request) -> Response:
+        if server.library(item_id) is None:
+            raise HTTPException(status_code=404, detail="library not found")
+        body = await request.body()
+        try:
+            data = base64.b64decode(body, validate=True)
+        except (binascii.Error, ValueError):
+            raise HTTPException(status_code=400, detail="cover body must be base64") from None
+        if not data:
+            raise HTTPException(status_code=400, detail="empty cover")
+        server.uploads[item_id] = server.uploads.get(item_id, 0) + 1
+        return Response(status_code=204)
+
+    @app.get("/__fake/stats")
+    async def stats() -> dict[str, Any]:
+        return server.stats()
+
+    app.include_router(router)
+    app.include_router(router, prefix="/emby")
+    return app
+
+
+@contextmanager
+def running_fake_server(options: FakeServerOptions | None = None, host: str = "127.0.0.1", port: int = 0) -> Iterator[tuple[str, FakeMediaServer]]:
+    """Run the fake server on a background thread; yields (base_url, server)."""
+    import socket
+
+    import uvicorn
+
+    app = create_fake_server_app(options)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    uvicorn_server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False))
+    thread = threading.Thread(target=uvicorn_server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not uvicorn_server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("fake media server failed to start")
+        time.sleep(0.02)
+    try:
+        yield f"http://{host}:{sock.getsockname()[1]}", app.state.fake_server
+    finally:
+        uvicorn_server.should_exit = True
+        thread.join(timeout=10)
+        sock.close()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.fake_media_server", description="Fake Emby/Jellyfin server for offline load testing.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8096)
+    parser.add_argument("--kind", choices=("emby", "jellyfin"), default="emby")
+    parser.add_argument("--api-key", default="fake-api-key")
+    parser.add_argument("--items", type=int, help="Items per library (default: mock library sizes)")
+    parser.add_argument("--libraries", type=int, help="Number of libraries, cycling the mock library types")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 503")
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    import uvicorn
+
+    args = parse_args(argv)
+    libraries = [dict(library) for library in MOCK_LIBRARIES]
+    if args.libraries:
+        libraries = [
+            {**MOCK_LIBRARIES[index % len(MOCK_LIBRARIES)], "id": f"fake-{index + 1}", "name": f"{MOCK_LIBRARIES[index % len(MOCK_LIBRARIES)]['name']} {index + 1}"}
+            for index in range(args.libraries)
+        ]
+    options = FakeServerOptions(
+        kind=args.kind,
+        api_key=args.api_key,
+        items_per_library=args.items,
+        libraries=libraries,
+        latency_ms=max(0.0, args.latency_ms),
+        latency_jitter_ms=max(0.0, args.jitter_ms),
+        error_rate=max(0.0, min(1.0, args.error_rate)),
+        seed=args.seed,
+    )
+    uvicorn.run(create_fake_server_app(options), host=args.host, port=args.port, log_level="warning")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -36,6 +36,17 @@ def _sha256_file(path: Path) -> str:
     return digest.hexdigest()
 
 
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Hardlink the original when source and cache share a filesystem."""
+    temp = target.with_name(f".{target.name}.tmp")
+    temp.unlink(missing_ok=True)
+    try:
+        os.link(source, temp)
+    except OSError:
+        shutil.copy2(source, temp)
+    os.replace(temp, target)
+
+
 def _clean_characters(value: Any) -> str:
     raw = unicodedata.normalize("NFC", str(value or ""))
     return "".join(char for char in raw if not unicodedata.category(char).startswith("C") or char in "\n\t")
@@ -68,20 +79,25 @@ class PreviewFontService:
         self.root = data_dir / "fonts"
         self.subsets_root = self.root / "subsets"
         self.originals_root = self.root / "originals"
+        self.digests_path = self.root / "digests.json"
         self.logger = logger
         self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yahaha-font-subset")
         self._locks: dict[tuple[str, str], threading.Lock] = {}
         self._locks_guard = threading.Lock()
         self._last_schedule: dict[tuple[str, str], float] = {}
+        self._digests: dict[str, dict[str, Any]] | None = None
+        self._digests_guard = threading.Lock()
 
     def assets(self, paths: list[Path]) -> dict[str, dict[str, Any]]:
         assets: dict[str, dict[str, Any]] = {}
+        digests_changed = False
         for path in paths:
             try:
                 resolved = path.resolve()
                 if not resolved.is_file() or resolved.suffix.lower() not in FONT_SUFFIXES:
                     continue
-                source_sha = _sha256_file(resolved)
+                source_sha, computed = self._source_digest(resolved)
+                digests_changed = digests_changed or computed
                 font_id = f"font_{source_sha[:12]}"
                 assets[font_id] = {
                     "font_id": font_id,
@@ -93,12 +109,51 @@ class PreviewFontService:
                 original_copy = self.originals_root / font_id / f"original{resolved.suffix.lower()}"
                 original_copy.parent.mkdir(parents=True, exist_ok=True)
                 if not original_copy.exists() or original_copy.stat().st_size != resolved.stat().st_size:
-                    shutil.copy2(resolved, original_copy)
+                    _link_or_copy(resolved, original_copy)
                 self._write_metadata(assets[font_id])
             except Exception as error:
                 self._log("warning", "读取预览字体失败 %s: %s", path, error)
+        if digests_changed:
+            self._save_digests()
         return assets
 
+    def _source_digest(self, path: Path) -> tuple[str, bool]:
+        """Return the SHA-256 of a font, re-hashing only when its stat signature changed."""
+        stat = path.stat()
+        signature = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        with self._digests_guard:
+            digests = self._load_digests()
+            cached = digests.get(str(path))
+            if isinstance(cached, dict) and cached.get("signature") == signature and cached.get("sha256"):
+                return str(cached["sha256"]), False
+        digest = _sha256_file(path)
+        with self._digests_guard:
+            self._load_digests()[str(path)] = {"signature": signature, "sha256": digest}
+        return digest, True
+
+    def _load_digests(self) -> dict[str, dict[str, Any]]:
+        if self._digests is None:
+            try:
+                value = json.loads(self.digests_path.read_text(encoding="utf-8"))
+                entries = value.get("entries") if isinstance(value, dict) and value.get("schema_version") == SCHEMA_VERSION else None
+                self._digests = entries if isinstance(entries, dict) else {}
+            except Exception:
+                self._digests = {}
+        return self._digests
+
+    def _save_digests(self) -> None:
+        with self._digests_guard:
+            entries = {key: value for key, value in self._load_digests().items() if Path(key).is_file()}
+            self._digests = entries
+            payload = json.dumps({"schema_version": SCHEMA_VERSION, "entries": entries}, ensure_ascii=False, sort_keys=True)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            temp = self.digests_path.with_suffix(".tmp")
+            temp.write_text(payload, encoding="utf-8")
+            os.replace(temp, self.digests_path)
+        except Exception as error:
+            self._log("warning", "写入预览字体摘要缓存失败: %s", error)
+
     def info(self, font_id: str, assets: dict[str, dict[str, Any]], config: dict[str, Any], url_for: Callable[[str, str, str], str]) -> dict[str, Any] | None:
         asset = assets.get(str(font_id or ""))
         if not asset:
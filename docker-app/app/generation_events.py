@@ -0,0 +1,87 @@
+"""Sequenced generation progress events for the server-sent event stream.
+
+GenerationManager publishes one event per state change (run started, library
+started, stage changed, library finished, run finished). Every event carries
+a monotonically increasing ``seq`` so a client that reconnects with
+``Last-Event-ID`` only receives what it missed; when the gap is older than
+the retained window the stream starts over from a full snapshot instead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable
+
+
+MAX_EVENTS = 2000
+
+# Bound by GenerationManager around each library so CoverService can report
+# stage changes without knowing which run it is working for.
+ACTIVE_STAGE_REPORTER: ContextVar[Callable[[str, dict[str, Any]], None] | None] = ContextVar("active_stage_reporter", default=None)
+
+
+def report_stage(stage: str, **fields: Any) -> None:
+    reporter = ACTIVE_STAGE_REPORTER.get()
+    if reporter is not None:
+        reporter(stage, fields)
+
+
+class GenerationEventLog:
+    """Bounded, thread-safe event buffer with asyncio waiters."""
+
+    def __init__(self, max_events: int = MAX_EVENTS) -> None:
+        self._events: deque[dict[str, Any]] = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._waiters: set[tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+
+    @property
+    def seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def publish(self, event_type: str, **data: Any) -> dict[str, Any]:
+        with self._lock:
+            self._seq += 1
+            event = {"seq": self._seq, "type": event_type, "time": time.time(), **data}
+            self._events.append(event)
+            waiters = list(self._waiters)
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(waiter.set)
+            except RuntimeError:
+                # The subscriber's loop is closed; it is dropped in wait().
+                pass
+        return event
+
+    def since(self, seq: int) -> list[dict[str, Any]] | None:
+        """Events after ``seq``, or None when some of them were already evicted."""
+        with self._lock:
+            if seq > self._seq:
+                return None
+            if seq == self._seq:
+                return []
+            oldest = self._events[0]["seq"] if self._events else self._seq + 1
+            if seq + 1 < oldest:
+                return None
+            return [event for event in self._events if event["seq"] > seq]
+
+    async def wait(self, seq: int, timeout: float) -> bool:
+        """Wait until an event newer than ``seq`` exists; False on timeout."""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if self._seq > seq:
+                return True
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
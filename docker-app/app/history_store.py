@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import base64
 import hashlib
 import json
 import os
@@ -63,6 +64,25 @@ def atomic_json(path: Path, payload: dict[str, Any]) -> None:
         temp.unlink(missing_ok=True)
 
 
+def cover_sort_key(cover: dict[str, Any]) -> tuple[str, str, int]:
+    # Newest batch first; within a batch, manifest order (hence -position
+    # under the descending sort).
+    return str(cover.get("created_at") or ""), str(cover.get("batch_id") or ""), -int(cover.get("position") or 0)
+
+
+def encode_cursor(cover: dict[str, Any]) -> str:
+    payload = json.dumps([cover.get("created_at"), cover.get("batch_id"), cover.get("position")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(value: str) -> dict[str, Any]:
+    try:
+        created_at, batch, position = json.loads(base64.urlsafe_b64decode(value + "=" * (-len(value) % 4)))
+        return {"created_at": str(created_at), "batch_id": str(batch), "position": int(position)}
+    except (TypeError, ValueError):
+        raise ValueError("invalid history cursor") from None
+
+
 @dataclass
 class HistoryBatch:
     store: "HistoryStore"
@@ -181,6 +201,52 @@ class HistoryStore:
         start = max(0, (max(1, page) - 1) * max(1, min(page_size, 100)))
         return {"total": len(values), "items": values[start:start + max(1, min(page_size, 100))]}
 
+    def list_history_covers(self, cursor: str = "", limit: int = 0, library: str = "", since: str = "", until: str = "") -> dict[str, Any]:
+        """Page through successful covers, newest first, from the index alone.
+
+        ``cursor`` is the ``next_cursor`` of the previous page; it names the
+        last cover returned rather than an offset, so covers added meanwhile
+        do not shift later pages. ``since``/``until`` are UTC ``created_at``
+        bounds in the index format (inclusive). ``limit=0`` returns the rest.
+        """
+        covers = self._read_index().get("covers", [])
+        after = cover_sort_key(decode_cursor(cursor)) if cursor else None
+        matched: list[dict[str, Any]] = []
+        total = 0
+        next_cursor = ""
+        for cover in covers:
+            created_at = str(cover.get("created_at") or "")
+            if library and library not in {cover.get("library_name"), cover.get("library_key")}:
+                continue
+            if (since and created_at < since) or (until and created_at > until):
+                continue
+            total += 1
+            if after is not None and cover_sort_key(cover) >= after:
+                continue
+            if limit and len(matched) >= limit:
+                next_cursor = encode_cursor(matched[-1])
+                continue
+            matched.append(cover)
+        return {"total": total, "items": matched, "next_cursor": next_cursor}
+
+    def discard_covers(self, paths: list[Path]) -> int:
+        """Drop deleted cover files from the index without a full rebuild."""
+        root = self.batches.resolve()
+        targets = set()
+        for path in paths:
+            try:
+                targets.add(path.resolve().relative_to(root).as_posix())
+            except ValueError:
+                continue
+        if not targets:
+            return 0
+        index = self._read_index()
+        covers = [cover for cover in index["covers"] if f"{cover.get('batch_id')}/{cover.get('file')}" not in targets]
+        removed = len(index["covers"]) - len(covers)
+        if removed:
+            atomic_json(self.index_path, {**index, "covers": covers})
+        return removed
+
     def stats(self) -> dict[str, int]:
         batches = self._read_index().get("batches", [])
         if not isinstance(batches, list):
@@ -213,14 +279,17 @@ class HistoryStore:
 
     def rebuild_history_index(self) -> dict[str, Any]:
         batches: list[dict[str, Any]] = []
+        covers: list[dict[str, Any]] = []
         for directory in self.batches.iterdir():
             manifest = self.get_history_batch(directory.name) if directory.is_dir() else None
             if not manifest:
                 continue
             summary = manifest.get("summary") or {}
             batches.append({"batch_id": manifest.get("batch_id"), "created_at": manifest.get("created_at"), "trigger": manifest.get("trigger"), "status": manifest.get("status"), "item_count": summary.get("total", 0), "success_count": summary.get("success", 0), "failed_count": summary.get("failed", 0)})
+            covers.extend(self._index_covers(directory, manifest))
         batches.sort(key=lambda item: str(item.get("created_at") or ""), reverse=True)
-        index = {"schema_version": HISTORY_SCHEMA_VERSION, "batches": batches}
+        covers.sort(key=cover_sort_key, reverse=True)
+        index = {"schema_version": HISTORY_SCHEMA_VERSION, "batches": batches, "covers": covers}
         atomic_json(self.index_path, index)
         return index
 
@@ -277,9 +346,34 @@ class HistoryStore:
         marker.write_text(iso_time(), encoding="utf-8")
         return imported
 
+    def _index_covers(self, directory: Path, manifest: dict[str, Any]) -> list[dict[str, Any]]:
+        covers = []
+        for position, item in enumerate(manifest.get("items") or []):
+            relative = str(item.get("file") or "")
+            if item.get("status") != "success" or not relative or not (directory / relative).is_file():
+                continue
+            thumbnail = str(item.get("thumbnail") or "")
+            covers.append({
+                "batch_id": manifest.get("batch_id"),
+                "created_at": manifest.get("created_at"),
+                "position": position,
+                "file": relative,
+                "thumbnail": thumbnail if thumbnail and (directory / thumbnail).is_file() else None,
+                "library_name": item.get("library_name"),
+                "library_key": item.get("library_key"),
+                "server_name": item.get("server_name"),
+                "template_id": item.get("template_id"),
+                "size": item.get("size", 0),
+                "upload_status": item.get("upload_status"),
+                "error": item.get("error"),
+            })
+        return covers
+
     def _read_index(self) -> dict[str, Any]:
         try:
             value = json.loads(self.index_path.read_text(encoding="utf-8"))
-            return value if isinstance(value, dict) and isinstance(value.get("batches"), list) else self.rebuild_history_index()
+            # Indexes written before covers were indexed are rebuilt once.
+            valid = isinstance(value, dict) and isinstance(value.get("batches"), list) and isinstance(value.get("covers"), list)
+            return value if valid else self.rebuild_history_index()
         except Exception:
             return self.rebuild_history_index()
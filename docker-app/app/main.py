@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import asyncio
 import base64
-import hashlib
 import hmac
 from email import policy
 from email.parser import BytesParser
@@ -16,35 +15,41 @@ import zipfile
 from pathlib import Path
 from typing import Any
 from datetime import datetime, timezone
-from urllib.parse import parse_qs, quote
+from urllib.parse import parse_qs, quote, unquote
 
 import httpx
 import yaml
 from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse, Response
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 
-from .config import DATA_DIR, ensure_data_dirs, load_config, resolve_data_path, save_config
+from .config import DATA_DIR, config_snapshot, ensure_data_dirs, load_config, resolve_data_path, save_config
+from .generation_events import ACTIVE_STAGE_REPORTER, GenerationEventLog
 from .mock import MOCK_LIBRARIES, ensure_mock_images, mock_library_by_name
 from .media_client import configured_clients
-from .services import library_title_background, library_title_payload, remove_history_item, slugify, title_for_library
-from .time_utils import localize, now_local
+from .metrics import FAILURES, GENERATION_QUEUE_DEPTH, render_metrics
+from .services import library_title_background, library_title_payload, remove_history_item, slugify, title_config_version, title_for_library
+from .time_utils import app_zone, now_local, parse_utc
 from .services import CoverService
+from .static_files import PRIVATE_REVALIDATE_CACHE, REVALIDATE_CACHE, CachedStaticFiles, hashed_asset_cache
 from .history_store import HistoryStore, sha256
 from .title_config import normalize_title_config
 from . import storage
-from .run_logs import APP_LOGGER, RunLog, clean_expired_logs, iter_logs, safe_log_path
+from .cover import RENDER_CANCEL, RenderCancelled
+from .preview_cache import PreviewRenderCache, PreviewSessions, draft_render_config, preview_key, preview_resolution
+from .run_logs import APP_LOGGER, LOG_PAGE_BYTES, RunLog, clean_expired_logs, log_entries, read_log_range, safe_log_path
 from .auth import (
     AUTH_COOKIE,
+    SessionCache,
     auth_config,
     configure_auth,
     is_auth_configured,
     issue_token,
     request_token,
+    sign_asset_url,
+    verify_asset_signature,
     verify_password,
-    verify_token,
 )
 
 
@@ -53,6 +58,21 @@ class GenerateRequest(BaseModel):
     style: str | None = None
 
 
+class RenderJob(BaseModel):
+    style: str = ""
+    title: str = ""
+    subtitle: str = ""
+    library: str = ""
+    server: str = ""
+    config: dict[str, Any] = {}
+    layout: dict[str, Any] | None = None
+    images: list[str] = []
+
+
+class RenderBatchRequest(BaseModel):
+    jobs: list[RenderJob] = []
+
+
 STYLE_TO_PLUGIN = {
     "single_1": ("static_1", "static"),
     "single_2": ("static_2", "static"),
@@ -212,6 +232,8 @@ app.add_middleware(
 )
 
 service = CoverService()
+PREVIEW_RENDERS = PreviewRenderCache(DATA_DIR / "tmp" / "preview_renders")
+PREVIEW_SESSIONS = PreviewSessions()
 
 
 PUBLIC_API_PATHS = {
@@ -223,6 +245,8 @@ PUBLIC_API_PATHS = {
     "/api/v1/webhook/",
     "/api/webhook",
     "/api/webhook/",
+    # Authenticated with the API token in the handler, like the webhook.
+    "/api/v1/render/batch",
 }
 
 
@@ -231,9 +255,12 @@ def request_is_secure(request: Request) -> bool:
     return request.url.scheme == "https" or forwarded == "https"
 
 
+SESSION_CACHE = SessionCache()
+
+
 def authenticated_username(request: Request, config: dict[str, Any]) -> str | None:
     token = request_token(request.headers.get("authorization"), request.cookies.get(AUTH_COOKIE))
-    return verify_token(config, token) if token else None
+    return SESSION_CACHE.verify(config, token) if token else None
 
 
 def set_auth_cookie(response: Response, request: Request, token: str, config: dict[str, Any]) -> None:
@@ -255,7 +282,12 @@ async def require_api_auth(request: Request, call_next):
     protected = path.startswith("/api/") or path == "/data" or path.startswith("/data/")
     if not protected or path in PUBLIC_API_PATHS:
         return await call_next(request)
-    config = load_config()
+    # Read-only snapshot: the middleware runs for every gallery image, so it
+    # must not re-parse or deep-copy the config.
+    config = config_snapshot()
+    if path.startswith("/data/") and "sig" in request.query_params:
+        if verify_asset_signature(config, path, request.query_params.get("exp", ""), request.query_params.get("sig", "")):
+            return await call_next(request)
     if not is_auth_configured(config):
         return JSONResponse(
             status_code=401,
@@ -269,118 +301,229 @@ async def require_api_auth(request: Request, call_next):
     return await call_next(request)
 
 
-class GenerationManager:
-    def __init__(self, cover_service: CoverService) -> None:
-        self.service = cover_service
+class GenerationRun:
+    """One start() call: the libraries it covers, their progress and its stop flag."""
+
+    def __init__(self, style: str, library_name: str | None, trigger: str) -> None:
+        self.style = style
+        self.library_name = library_name
+        self.trigger = trigger
         self.task: asyncio.Task | None = None
-        self.is_generating = False
         self.stop_requested = False
         self.current = 0
         self.total = 0
-        self.label = ""
+        self.label = "准备生成"
         self.items: list[dict[str, Any]] = []
+        self.libraries: list[dict[str, Any]] = []
         self.error = ""
-        self.run_log: RunLog | None = None
+        self.run_log: RunLog | None = RunLog(trigger)
+        self.run_id = self.run_log.task_id
+
+    @property
+    def scope(self) -> str:
+        return str(self.library_name or "")
+
+    def active(self) -> bool:
+        return bool(self.task and not self.task.done())
+
+    def refresh_label(self) -> None:
+        running = [str(entry["name"]) for entry in self.libraries if entry["status"] == "running"]
+        if self.stop_requested:
+            self.label = "停止中"
+        elif running:
+            self.label = f"正在生成 {'、'.join(running)}"
 
     def snapshot(self) -> dict[str, Any]:
+        return {
+            "run_id": self.run_id,
+            "trigger": self.trigger,
+            "library": self.scope,
+            "is_generating": self.active(),
+            "current": self.current,
+            "total": self.total,
+            "label": self.label,
+            "error": self.error,
+            "libraries": [dict(entry) for entry in self.libraries],
+        }
+
+
+class GenerationManager:
+    """Runs generation requests, each fanning out over its libraries.
+
+    A run processes up to ``generation_concurrency`` libraries at once; the work
+    is mostly downloads and uploads, and rendering is already offloaded with
+    ``asyncio.to_thread``. Runs with different scopes may overlap, so a manual
+    or monitor run for one library is not blocked by a scheduled full sweep.
+    CoverService serializes two runs that reach the same library.
+
+    Every state change is also published to ``events`` so UI clients can follow
+    a run over /api/generation/events instead of re-polling the snapshot.
+    """
+
+    def __init__(self, cover_service: CoverService) -> None:
+        self.service = cover_service
+        self.runs: dict[str, GenerationRun] = {}
+        self.last_run: GenerationRun | None = None
+        self.events = GenerationEventLog()
+
+    @property
+    def is_generating(self) -> bool:
+        return any(run.active() for run in self.runs.values())
+
+    def _visible_runs(self) -> list[GenerationRun]:
+        return list(self.runs.values()) or ([self.last_run] if self.last_run else [])
+
+    def progress(self) -> dict[str, Any]:
+        runs = self._visible_runs()
         return {
             "is_generating": self.is_generating,
-            "generation_current": self.current,
-            "generation_total": self.total,
-            "generation_label": self.label,
-            "generation_error": self.error,
-            "generation_items": self.items,
+            "generation_current": sum(run.current for run in runs),
+            "generation_total": sum(run.total for run in runs),
+            "generation_label": " / ".join(run.label for run in runs if run.label),
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        runs = self._visible_runs()
+        return {
+            **self.progress(),
+            "generation_error": next((run.error for run in runs if run.error), ""),
+            "generation_items": [item for run in runs for item in run.items],
+            "generation_runs": [run.snapshot() for run in runs],
+            "generation_seq": self.events.seq,
         }
 
+    def publish(self, event_type: str, run: GenerationRun, **data: Any) -> None:
+        self.events.publish(
+            event_type,
+            run_id=run.run_id,
+            trigger=run.trigger,
+            run_current=run.current,
+            run_total=run.total,
+            run_label=run.label,
+            **data,
+            **self.progress(),
+        )
+
     async def start(self, style: str = "", library_name: str | None = None, trigger: str = "manual") -> dict[str, Any]:
-        if self.task and not self.task.done():
+        scope = str(library_name or "")
+        if any(run.active() and run.scope == scope for run in self.runs.values()):
             return self.snapshot()
-        self.is_generating = True
-        self.stop_requested = False
-        self.current = 0
-        self.total = 0
-        self.label = "准备生成"
-        self.items = []
-        self.error = ""
-        self.run_log = RunLog(trigger)
         self.service.reload()
-        batch = self.service.begin_history_batch(trigger)
-        if batch:
-            self.run_log.info("历史批次开始 batch_id=%s", batch.batch_id)
-        self.run_log.info("任务开始 trigger=%s style=%s library=%s mode=%s", trigger, style or "default", library_name or "all", "local" if self.service.local_mode() else "server")
-        self.task = asyncio.create_task(self._run(style, library_name, trigger))
+        run = GenerationRun(style, library_name, trigger)
+        self.runs[run.run_id] = run
+        run.task = asyncio.create_task(self._run(run))
+        self.publish("run_started", run, library=run.scope)
         await asyncio.sleep(0)
         return self.snapshot()
 
-    async def stop(self) -> dict[str, Any]:
-        if self.task and not self.task.done():
-            self.stop_requested = True
-            self.label = "停止中"
-            return self.snapshot()
-        self.is_generating = False
-        self.label = "已停止"
+    async def stop(self, run_id: str | None = None) -> dict[str, Any]:
+        """Stop the run with ``run_id``, or every active run when it is omitted."""
+        active = [run for run in self.runs.values() if run.active() and (not run_id or run.run_id == run_id)]
+        for run in active:
+            run.stop_requested = True
+            run.refresh_label()
+            self.publish("run_stopping", run)
+        if not active and not run_id and self.last_run:
+            self.last_run.label = "已停止"
         return self.snapshot()
 
-    async def _run(self, style: str = "", library_name: str | None = None, trigger: str = "manual") -> None:
+    def concurrency(self) -> int:
         try:
-            style_name = normalize_style(style)
-            if library_name:
-                self.total = 1
-                self.label = f"正在生成 {library_name}"
-                self.items.extend(await self.service.generate(library_name, style_name, trigger=trigger))
-                self.run_log and self.run_log.info("媒体库完成 library=%s result=%s", library_name, self.items[-1] if self.items else {})
-                self.current = 1
-                self.label = "生成完成"
-                return
-            libraries = self.service.selected_generation_libraries(await self.service.libraries())
-            if not libraries:
-                self.total = 1
-                self.label = "正在生成本地封面"
-                self.items.extend(await self.service.generate(None, style_name, trigger=trigger))
-                self.current = 1
-                self.label = "生成完成"
+            return max(1, min(8, int(self.service.config.get("generation_concurrency") or 3)))
+        except (TypeError, ValueError):
+            return 3
+
+    async def _generate_entry(self, run: GenerationRun, entry: dict[str, Any], style_name: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            if run.stop_requested:
+                entry["status"] = "cancelled"
+                self.publish("item_finished", run, library=entry["name"], status=entry["status"], error="", items=[])
                 return
-            self.total = len(libraries)
-            for library in libraries:
-                if self.stop_requested:
-                    self.label = "已停止"
-                    break
-                library_name = str(library.get("name") or library.get("id") or "").strip()
-                if not library_name:
-                    self.current += 1
-                    continue
-                self.label = f"正在生成 {library_name}"
-                self.items.extend(await self.service.generate(str(library.get("value") or library_name), style_name, trigger=trigger))
-                self.run_log and self.run_log.info("媒体库完成 library=%s", library_name)
-                self.current += 1
-                await asyncio.sleep(0)
-            if not self.stop_requested:
-                self.label = "生成完成"
+            entry["status"] = "running"
+            run.refresh_label()
+            self.publish("item_started", run, library=entry["name"])
+            # _generate_entry runs as its own gather() task, so the reporter
+            # only sees stages of this library.
+            ACTIVE_STAGE_REPORTER.set(lambda stage, fields: self.publish("item_stage", run, **{**fields, "library": entry["name"], "stage": stage}))
+            results: list[dict[str, Any]] = []
+            try:
+                results = await self.service.generate(entry["value"], style_name, trigger=run.trigger)
+                run.items.extend(results)
+                entry["status"] = "skipped" if results and all(item.get("skipped") for item in results) else "done"
+                run.run_log and run.run_log.info("媒体库完成 library=%s result=%s", entry["name"], results[-1] if results else {})
+            except Exception as err:
+                FAILURES.inc(operation="generate", server=entry["server"])
+                entry["status"] = "failed"
+                entry["error"] = str(err)
+                run.error = run.error or (f"{entry['name']}: {err}" if entry["value"] else str(err))
+                run.run_log and run.run_log.exception("媒体库失败 library=%s: %s", entry["name"], err)
+            finally:
+                run.current += 1
+                run.refresh_label()
+                self.publish("item_finished", run, library=entry["name"], status=entry["status"], error=entry["error"], items=results)
+
+    async def _run(self, run: GenerationRun) -> None:
+        # The history batch and run log are bound to this task's context, so
+        # overlapping runs keep separate manifests and log files.
+        if run.run_log:
+            run.run_log.bind()
+        batch = self.service.begin_history_batch(run.trigger)
+        if batch and run.run_log:
+            run.run_log.info("历史批次开始 batch_id=%s", batch.batch_id)
+        if run.run_log:
+            run.run_log.info("任务开始 trigger=%s style=%s library=%s mode=%s", run.trigger, run.style or "default", run.library_name or "all", "local" if self.service.local_mode() else "server")
+        try:
+            style_name = normalize_style(run.style)
+            if run.library_name:
+                run.libraries = [{"name": run.library_name, "value": run.library_name, "server": "unknown", "status": "pending", "error": ""}]
+            else:
+                libraries = self.service.selected_generation_libraries(await self.service.libraries())
+                for library in libraries:
+                    name = str(library.get("name") or library.get("id") or "").strip()
+                    if name:
+                        run.libraries.append({"name": name, "value": str(library.get("value") or name), "server": str(library.get("server_name") or "unknown"), "status": "pending", "error": ""})
+                if not libraries:
+                    run.libraries = [{"name": "本地封面", "value": None, "server": "unknown", "status": "pending", "error": ""}]
+                else:
+                    # Unnamed libraries are counted as processed, as before.
+                    run.current = len(libraries) - len(run.libraries)
+            run.total = run.current + len(run.libraries)
+            self.publish("run_planned", run, libraries=[entry["name"] for entry in run.libraries])
+            semaphore = asyncio.Semaphore(self.concurrency())
+            await asyncio.gather(*(self._generate_entry(run, entry, style_name, semaphore) for entry in run.libraries))
+            if run.stop_requested:
+                run.label = "已停止"
+            elif run.error:
+                run.label = "部分失败" if any(entry["status"] in {"done", "skipped"} for entry in run.libraries) else "生成失败"
+            else:
+                run.label = "生成完成"
         except Exception as err:
-            self.error = str(err)
-            self.label = "生成失败"
-            if self.run_log:
-                self.run_log.exception("任务失败: %s", err)
+            run.error = str(err)
+            run.label = "生成失败"
+            if run.run_log:
+                run.run_log.exception("任务失败: %s", err)
         finally:
             try:
-                manifest = self.service.finalize_history_batch("cancelled" if self.stop_requested else ("failed" if self.error else "success"))
-                if manifest and self.run_log:
-                    self.run_log.info("历史批次完成 batch_id=%s status=%s", manifest.get("batch_id"), manifest.get("status"))
+                manifest = self.service.finalize_history_batch("cancelled" if run.stop_requested else ("failed" if run.error else "success"))
+                if manifest and run.run_log:
+                    run.run_log.info("历史批次完成 batch_id=%s status=%s", manifest.get("batch_id"), manifest.get("status"))
             except Exception as history_error:
                 APP_LOGGER.exception("历史批次归档失败: %s", history_error)
-            if self.run_log:
-                skipped = sum(1 for item in self.items if item.get("skipped"))
-                succeeded = sum(1 for item in self.items if not item.get("skipped") and not item.get("upload_error"))
-                failed = sum(1 for item in self.items if not item.get("skipped") and item.get("upload_error"))
-                self.run_log.info("任务结束 status=%s success=%s failed=%s skipped=%s", self.label, succeeded, failed, skipped + max(0, self.total - self.current))
-                self.run_log.close()
-                self.run_log = None
+            if run.run_log:
+                skipped = sum(1 for item in run.items if item.get("skipped"))
+                succeeded = sum(1 for item in run.items if not item.get("skipped") and not item.get("upload_error"))
+                failed = sum(1 for item in run.items if not item.get("skipped") and item.get("upload_error"))
+                failed += sum(1 for entry in run.libraries if entry["status"] == "failed")
+                run.run_log.info("任务结束 status=%s success=%s failed=%s skipped=%s", run.label, succeeded, failed, skipped + max(0, run.total - run.current))
+                run.run_log.close()
+                run.run_log = None
             try:
                 clean_expired_logs(int(self.service.config.get("log_retention_days") or 7))
             except Exception as cleanup_error:
                 APP_LOGGER.warning("任务后清理日志失败: %s", cleanup_error)
-            self.is_generating = False
-            self.stop_requested = False
+            self.runs.pop(run.run_id, None)
+            self.last_run = run
+            self.publish("run_finished", run, error=run.error, stopped=run.stop_requested)
 
 
 generation_manager = GenerationManager(service)
@@ -422,9 +565,9 @@ class ScheduleManager:
                 pass
 
     async def tick(self, now: datetime | None = None) -> dict[str, Any]:
-        now = now or now_local(str(load_config().get("timezone") or "Asia/Shanghai"))
+        config = config_snapshot()
+        now = now or now_local(str(config.get("timezone") or "Asia/Shanghai"))
         key = now.strftime("%Y%m%d%H%M")
-        config = load_config()
         actions: list[str] = []
 
         cron_expr = str(config.get("cron") or "").strip()
@@ -437,7 +580,7 @@ class ScheduleManager:
         backup_expr = str(config.get("backup_cron") or "").strip()
         if backup_expr and cron_matches(backup_expr, now) and self.last_backup_key != key:
             self.last_backup_key = key
-            path = create_config_backup(config, str(config.get("backup_path") or ""))
+            path = create_config_backup(load_config(), str(config.get("backup_path") or ""))
             self.last_backup = str(path)
             actions.append("backup")
 
@@ -456,7 +599,7 @@ scheduler = ScheduleManager()
 @app.on_event("startup")
 async def startup_scheduler():
     try:
-        clean_expired_logs(int(load_config().get("log_retention_days") or 7))
+        clean_expired_logs(int(config_snapshot().get("log_retention_days") or 7))
     except Exception as error:
         APP_LOGGER.warning("启动时清理日志失败: %s", error)
     scheduler.start()
@@ -468,19 +611,23 @@ async def shutdown_scheduler():
 
 static_dir = Path(__file__).parent / "static"
 ensure_data_dirs()
-app.mount("/static", StaticFiles(directory=static_dir), name="static")
+# Only Vite's output under /assets carries a content hash in its name and is
+# cached forever; /static holds hand-named files (fonts such as
+# "NotoSans-SemiBold.ttf" look hashed) and revalidates with its ETag like
+# everything else. /data is per-user and never precompressed (images).
+app.mount("/static", CachedStaticFiles(directory=static_dir), name="static")
 assets_dir = static_dir / "assets"
 if assets_dir.exists():
-    app.mount("/assets", StaticFiles(directory=assets_dir), name="assets")
+    app.mount("/assets", CachedStaticFiles(directory=assets_dir, cache_control=hashed_asset_cache), name="assets")
 icons_dir = static_dir / "icons"
 if icons_dir.exists():
-    app.mount("/icons", StaticFiles(directory=icons_dir), name="icons")
-app.mount("/data", StaticFiles(directory=DATA_DIR), name="data")
+    app.mount("/icons", CachedStaticFiles(directory=icons_dir), name="icons")
+app.mount("/data", CachedStaticFiles(directory=DATA_DIR, cache_control=PRIVATE_REVALIDATE_CACHE, precompressed=False), name="data")
 
 
 @app.get("/")
 async def index():
-    return FileResponse(static_dir / "index.html")
+    return FileResponse(static_dir / "index.html", headers={"Cache-Control": REVALIDATE_CACHE})
 
 
 @app.get("/favicon.ico")
@@ -586,21 +733,101 @@ async def post_config(config: dict[str, Any]):
         raise HTTPException(status_code=500, detail=f"配置保存失败: {error}") from error
 
 
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def sse_message(event_type: str, seq: int, data: dict[str, Any]) -> str:
+    return f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+LOG_TAIL_POLL_SECONDS = 0.5
+MAX_LOG_PAGE_BYTES = 2 * 1024 * 1024
+
+
 @app.get("/api/logs")
 async def list_logs():
+    active = {path.resolve() for path in RunLog.open_paths()}
     items = []
-    for path in iter_logs():
-        stat = path.stat()
-        items.append({"name": str(path.relative_to(DATA_DIR / "logs")), "size": stat.st_size, "modified": stat.st_mtime})
+    for path, stat in log_entries():
+        items.append({"name": str(path.relative_to(DATA_DIR / "logs")), "size": stat.st_size, "modified": stat.st_mtime, "active": path.resolve() in active})
     return {"items": items}
 
 
 @app.get("/api/logs/content/{name:path}")
-async def read_log(name: str):
+async def read_log(
+    name: str,
+    offset: int | None = Query(None, ge=0),
+    limit: int = Query(LOG_PAGE_BYTES, ge=1),
+    level: str = Query(""),
+    keyword: str = Query(""),
+):
+    """Return whole log records from byte ``offset`` (or the tail) on.
+
+    ``next_offset`` is the cursor for the next page; ``level`` and ``keyword``
+    filter records server-side within a bounded scan per request.
+    """
     path = safe_log_path(name)
     if not path:
         raise HTTPException(status_code=404, detail="日志不存在")
-    return {"name": name, "content": path.read_text(encoding="utf-8", errors="replace")[-200_000:]}
+    page = await asyncio.to_thread(read_log_range, path, offset, min(limit, MAX_LOG_PAGE_BYTES), level, keyword)
+    return {"name": name, **page}
+
+
+def current_log_name() -> str | None:
+    root = DATA_DIR / "logs"
+    open_paths = [path for path in RunLog.open_paths() if path.exists()]
+    if open_paths:
+        return str(max(open_paths, key=lambda path: path.stat().st_mtime).relative_to(root))
+    entries = log_entries()
+    return str(entries[0][0].relative_to(root)) if entries else None
+
+
+@app.get("/api/logs/tail/{name:path}")
+async def tail_log(request: Request, name: str, offset: int | None = Query(None, ge=0), level: str = Query(""), keyword: str = Query("")):
+    """Live tail of a log as server-sent ``log`` events.
+
+    ``name`` may be ``current`` for the newest running task. Each event id is
+    the byte cursor, so a reconnect with ``Last-Event-ID`` resumes where it
+    stopped. The stream sends ``end`` and closes once the task has finished
+    and everything was delivered.
+    """
+    resolved_name = current_log_name() if name == "current" else name
+    path = safe_log_path(resolved_name or "")
+    if not path:
+        raise HTTPException(status_code=404, detail="日志不存在")
+    last_event_id = str(request.headers.get("last-event-id") or "").strip()
+    cursor: int | None = int(last_event_id) if last_event_id.isdigit() else offset
+
+    async def stream():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        idle = 0.0
+        while True:
+            try:
+                page = await asyncio.to_thread(read_log_range, path, cursor, LOG_PAGE_BYTES, level, keyword)
+            except FileNotFoundError:
+                yield sse_message("end", cursor or 0, {"name": resolved_name, "deleted": True})
+                return
+            cursor = int(page["next_offset"])
+            if page["content"] or page["reset"]:
+                idle = 0.0
+                yield sse_message("log", cursor, {"name": resolved_name, **page})
+            if not page["eof"]:
+                continue
+            if path.resolve() not in {item.resolve() for item in RunLog.open_paths()}:
+                yield sse_message("end", cursor, {"name": resolved_name, "next_offset": cursor})
+                return
+            await asyncio.sleep(LOG_TAIL_POLL_SECONDS)
+            idle += LOG_TAIL_POLL_SECONDS
+            if idle >= SSE_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.get("/api/logs/download/{name:path}")
@@ -622,7 +849,7 @@ async def delete_log(name: str):
 
 @app.post("/api/logs/cleanup")
 async def cleanup_logs():
-    return {"removed": clean_expired_logs(int(load_config().get("log_retention_days") or 7))}
+    return {"removed": clean_expired_logs(int(config_snapshot().get("log_retention_days") or 7))}
 
 
 @app.get("/api/libraries")
@@ -698,19 +925,116 @@ async def upload_library(library_name: str):
         raise HTTPException(status_code=500, detail=str(err)) from err
 
 
-@app.post("/api/v1/webhook")
-@app.post("/api/v1/webhook/")
-@app.post("/api/webhook")
-@app.post("/api/webhook/")
-async def media_server_webhook(request: Request, token: str = Query(""), source: str = Query("")):
-    config = load_config()
-    expected_token = str(
+@app.get("/api/generation/events")
+async def generation_events(request: Request, since: int | None = Query(None), until_idle: bool = Query(False)):
+    """Server-sent generation progress.
+
+    Resumes after ``Last-Event-ID`` (or ``?since=``); without a cursor, or when
+    the requested events were already evicted, the stream opens with a
+    ``snapshot`` event carrying the same payload as the status endpoint.
+    ``until_idle`` closes the stream once no run is active, for clients that
+    prefer chunked long-polling over a persistent connection.
+    """
+    last_event_id = str(request.headers.get("last-event-id") or "").strip()
+    cursor = int(last_event_id) if last_event_id.isdigit() else since
+    events_log = generation_manager.events
+
+    async def stream():
+        nonlocal cursor
+        yield "retry: 3000\n\n"
+        pending = events_log.since(cursor) if cursor is not None else None
+        while True:
+            if pending is None:
+                snapshot = generation_manager.snapshot()
+                cursor = int(snapshot["generation_seq"])
+                yield sse_message("snapshot", cursor, snapshot)
+                pending = events_log.since(cursor) or []
+            for event in pending:
+                cursor = int(event["seq"])
+                yield sse_message(str(event["type"]), cursor, event)
+            if until_idle and not generation_manager.is_generating:
+                return
+            if not await events_log.wait(cursor, SSE_KEEPALIVE_SECONDS):
+                yield ": keep-alive\n\n"
+            pending = events_log.since(cursor)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def expected_api_token(config: dict[str, Any]) -> str:
+    return str(
         config.get("api_token")
         or os.environ.get("YAHAAHA_WEBHOOK_TOKEN")
         or os.environ.get("YAHAHA_WEBHOOK_TOKEN")
         or os.environ.get("API_TOKEN")
         or ""
     ).strip()
+
+
+@app.post("/api/v1/render/batch")
+async def render_batch(request: Request, payload: RenderBatchRequest):
+    """Render covers for a remote caller (the MoviePilot plugin) and return them as Base64."""
+    config = config_snapshot()
+    token = request_token(request.headers.get("authorization"), None)
+    expected_token = expected_api_token(config)
+    if not token or not expected_token or not hmac.compare_digest(token, expected_token):
+        raise HTTPException(status_code=403, detail="invalid api token")
+    service.reload()
+    semaphore = asyncio.Semaphore(generation_manager.concurrency())
+
+    async def render(job: RenderJob) -> dict[str, Any]:
+        style = normalize_style(job.style)
+        async with semaphore:
+            try:
+                images = [base64.b64decode(item) for item in job.images if item]
+                data, suffix = await service.render_job(
+                    style,
+                    images,
+                    job.title,
+                    job.subtitle,
+                    overrides=job.config,
+                    layout=job.layout,
+                    library_name=job.library,
+                    server_name=job.server,
+                )
+            except Exception as err:
+                FAILURES.inc(operation="remote_render", server=job.server)
+                APP_LOGGER.warning("远程渲染失败 style=%s title=%s: %s", style, job.title, err)
+                return {"ok": False, "style": style, "error": str(err)}
+        return {
+            "ok": True,
+            "style": style,
+            "format": suffix.lstrip("."),
+            "data": base64.b64encode(data).decode("ascii"),
+        }
+
+    return ok({"results": await asyncio.gather(*(render(job) for job in payload.jobs))})
+
+
+@app.get("/metrics")
+async def metrics(request: Request, token: str = Query("")):
+    """Prometheus scrape endpoint, authenticated with the API token (Bearer or ?token=)."""
+    provided = request_token(request.headers.get("authorization"), None) or token
+    expected_token = expected_api_token(config_snapshot())
+    if not provided or not expected_token or not hmac.compare_digest(provided, expected_token):
+        raise HTTPException(status_code=403, detail="invalid api token")
+    entries = [entry for run in generation_manager.runs.values() if run.active() for entry in run.libraries]
+    for state in ("pending", "running"):
+        GENERATION_QUEUE_DEPTH.set(sum(1 for entry in entries if entry["status"] == state), state=state)
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.post("/api/v1/webhook")
+@app.post("/api/v1/webhook/")
+@app.post("/api/webhook")
+@app.post("/api/webhook/")
+async def media_server_webhook(request: Request, token: str = Query(""), source: str = Query("")):
+    config = load_config()
+    expected_token = expected_api_token(config)
     if not token or token != expected_token:
         raise HTTPException(status_code=403, detail="invalid webhook token")
     source = str(source or "").strip()
@@ -808,7 +1132,7 @@ async def plugin_config():
 
 @app.get("/api/plugin/MediaCoverGenerator/status")
 async def plugin_status():
-    payload = to_status_payload(load_config())
+    payload = to_status_payload(config_snapshot())
     payload.update(generation_manager.snapshot())
     payload.update(scheduler.snapshot())
     return ok(payload)
@@ -825,24 +1149,63 @@ async def plugin_libraries(servers: str = ""):
         service.config["selected_servers"] = previous
 
 
+def history_time_bound(value: str, zone: Any, *, end: bool) -> str:
+    """Turn a local ``YYYY-MM-DD`` (whole day) or ISO time into an index bound."""
+    raw = str(value or "").strip()
+    if not raw:
+        return ""
+    try:
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", raw):
+            moment = datetime.fromisoformat(raw).replace(tzinfo=zone)
+            if end:
+                moment = moment.replace(hour=23, minute=59, second=59, microsecond=999000)
+        else:
+            moment = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+            moment = moment if moment.tzinfo else moment.replace(tzinfo=zone)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=f"时间格式无效: {raw}") from error
+    return moment.astimezone(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
 @app.get("/api/plugin/MediaCoverGenerator/history")
-async def plugin_history():
+async def plugin_history(
+    cursor: str = Query(""),
+    limit: int = Query(0, ge=0, le=1000),
+    library: str = Query(""),
+    since: str = Query(""),
+    until: str = Query(""),
+):
+    """History covers, newest first, read from the history index.
+
+    Without ``limit`` every cover is returned, as MediaCoverGenerator clients
+    expect; with it, ``next_cursor`` (empty on the last page) continues the
+    listing. ``library`` matches a library name or key and ``since``/``until``
+    take local dates or ISO times.
+    """
+    config = config_snapshot()
+    zone = app_zone(str(config.get("timezone") or "Asia/Shanghai"))
     store = HistoryStore(DATA_DIR)
+    try:
+        page = store.list_history_covers(
+            cursor=cursor,
+            limit=limit,
+            library=library.strip(),
+            since=history_time_bound(since, zone, end=False),
+            until=history_time_bound(until, zone, end=True),
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error)) from error
+    batches_root = store.batches.resolve()
     items = []
-    for summary in store.list_history_batches(page_size=1000).get("items", []):
-        manifest = store.get_history_batch(str(summary.get("batch_id") or "")) or {}
-        for item in manifest.get("items") or []:
-            relative = str(item.get("file") or "")
-            path = store.safe_file(str(manifest.get("batch_id") or ""), relative)
-            if not path:
-                continue
-            created_dt = localize(str(manifest.get("created_at") or ""), str(load_config().get("timezone") or "Asia/Shanghai"))
-            url = f"/data/history/batches/{manifest['batch_id']}/{relative}"
-            thumbnail = str(item.get("thumbnail") or "")
-            thumbnail_path = store.safe_file(str(manifest.get("batch_id") or ""), thumbnail) if thumbnail else None
-            thumbnail_url = f"/data/history/batches/{manifest['batch_id']}/{thumbnail}" if thumbnail_path else url
-            items.append({"path": str(path), "name": path.name, "library": item.get("library_name"), "server": item.get("server_name"), "style": item.get("template_id"), "created_at": created_dt.timestamp(), "created_label": created_dt.strftime("%Y-%m-%d %H:%M"), "date": created_dt.strftime("%Y-%m-%d"), "date_label": created_dt.strftime("%m-%d %H:%M"), "size": item.get("size", 0), "uploaded": item.get("upload_status") == "success", "upload_error": item.get("error") or "", "url": url, "src": thumbnail_url, "thumbnail": thumbnail_url, "batch_id": manifest.get("batch_id")})
-    return ok(items)
+    for cover in page["items"]:
+        batch_id = str(cover["batch_id"])
+        created_dt = parse_utc(str(cover.get("created_at") or "")).astimezone(zone)
+        # Signed so the gallery's thumbnails skip per-request session checks.
+        url = sign_asset_url(config, f"/data/history/batches/{batch_id}/{cover['file']}")
+        thumbnail_url = sign_asset_url(config, f"/data/history/batches/{batch_id}/{cover['thumbnail']}") if cover.get("thumbnail") else url
+        path = batches_root / batch_id / str(cover["file"])
+        items.append({"path": str(path), "name": path.name, "library": cover.get("library_name"), "server": cover.get("server_name"), "style": cover.get("template_id"), "created_at": created_dt.timestamp(), "created_label": created_dt.strftime("%Y-%m-%d %H:%M"), "date": created_dt.strftime("%Y-%m-%d"), "date_label": created_dt.strftime("%m-%d %H:%M"), "size": cover.get("size", 0), "uploaded": cover.get("upload_status") == "success", "upload_error": cover.get("error") or "", "url": url, "src": thumbnail_url, "thumbnail": thumbnail_url, "batch_id": batch_id})
+    return {**ok(items), "total": page["total"], "next_cursor": page["next_cursor"]}
 
 
 @app.post("/api/plugin/MediaCoverGenerator/restore_history_batch")
@@ -945,21 +1308,69 @@ async def plugin_preview_sources(required_items: int = Query(9), force_refresh:
 
 @app.post("/api/plugin/MediaCoverGenerator/preview")
 async def plugin_preview(payload: dict[str, Any] | None = None):
+    """Render a preview; ``quality: "draft"`` returns a fast low-fidelity pass.
+
+    Editors send a draft and then the full render with the same ``session``.
+    Each request supersedes the previous one of its session, which is
+    cancelled and answered with ``superseded: true``.
+    """
     payload = payload or {}
-    config = load_config()
-    style = normalize_style(payload.get("style") or config.get("style_config", {}).get("style"))
-    library_name = str(payload.get("library") or "") or await first_library_name(config)
-    cached = cached_preview_payload(config, library_name, style)
-    if cached:
-        return ok(cached)
-    generated = await service.generate(library_name, style)
-    item = generated[0] if generated else {}
-    return ok({
-        "src": item.get("url", ""),
-        "server": item.get("server", "docker"),
-        "library": item.get("library", ""),
-        "style": style,
-    })
+    quality = "draft" if str(payload.get("quality") or "") == "draft" else "full"
+    session = str(payload.get("session") or "default")
+    cancel = PREVIEW_SESSIONS.begin(session)
+    try:
+        config = load_config()
+        style_config = dict(config.get("style_config") or {})
+        style = normalize_style(payload.get("style") or style_config.get("style"))
+        library_name = str(payload.get("library") or "") or await first_library_name(config)
+        service.config = config
+        source = await ensure_preview_images(config, library_name, service.image_limit_for_style(style_config, style))
+        image_paths = [path for path in (safe_data_path(image.get("src", "")) for image in source["images"]) if path and path.is_file()]
+        if not image_paths:
+            return {"code": 1, "msg": "没有可用的预览图片", "data": None}
+        layout = payload.get("layout") if isinstance(payload.get("layout"), dict) else None
+        if layout is None and style == source["style"]:
+            layout = service.scheme_style_and_layout(source["scheme_id"])[1]
+        render_config = service.render_config(style_config, source["library"], style, str(source["server"]), custom_layout=layout)
+        if not style.startswith("animated_"):
+            render_config["resolution"] = preview_resolution(render_config.get("resolution"))
+        render_config["library_item_count"] = source["library_item_count"]
+        render_config["library_item_counts"] = source["library_item_counts"]
+        if quality == "draft":
+            render_config = draft_render_config(render_config, style)
+        title = str(render_config.get("resolved_title") or source["titles"]["zh"])
+        subtitle = str(render_config.get("resolved_subtitle") or source["titles"]["en"])
+        suffix = service.output_suffix(render_config, style)
+        key = preview_key(style, title, subtitle, render_config, image_paths)
+        cached = PREVIEW_RENDERS.lookup(key, suffix)
+        hit = cached is not None
+        if not hit:
+            if cancel.is_set():
+                return preview_superseded()
+            scratch = PREVIEW_RENDERS.scratch_path(key, suffix)
+            token = RENDER_CANCEL.set(cancel)
+            try:
+                rendered = await asyncio.to_thread(service.renderer().render, image_paths, title, subtitle, style, render_config, scratch)
+                cached = PREVIEW_RENDERS.store(key, rendered)
+            except RenderCancelled:
+                return preview_superseded()
+            finally:
+                RENDER_CANCEL.reset(token)
+                scratch.unlink(missing_ok=True)
+        return ok({
+            "src": data_file_url(cached),
+            "server": source["server"],
+            "library": source["library"],
+            "style": style,
+            "quality": quality,
+            "cache": "hit" if hit else "miss",
+        })
+    finally:
+        PREVIEW_SESSIONS.finish(session, cancel)
+
+
+def preview_superseded() -> dict[str, Any]:
+    return {"code": 1, "msg": "预览已被新的请求取代", "data": {"superseded": True}}
 
 
 @app.post("/api/plugin/MediaCoverGenerator/start_generation")
@@ -973,8 +1384,8 @@ async def plugin_generate_now(style: str = Query("")):
 
 
 @app.post("/api/plugin/MediaCoverGenerator/stop_generation")
-async def plugin_stop_generation():
-    return ok(await generation_manager.stop())
+async def plugin_stop_generation(run_id: str = Query("")):
+    return ok(await generation_manager.stop(run_id or None))
 
 
 @app.post("/api/plugin/MediaCoverGenerator/set_cover_style")
@@ -1510,20 +1921,23 @@ async def plugin_delete_saved_cover(file: str = Query("")):
     if path and path.exists() and path.is_file():
         path.unlink()
         remove_history_item(path)
+        HistoryStore(DATA_DIR).discard_covers([path])
         return ok({"deleted": True})
     return ok({"deleted": False})
 
 
 @app.post("/api/plugin/MediaCoverGenerator/delete_saved_covers")
 async def plugin_delete_saved_covers(payload: dict[str, Any] | None = None):
-    deleted = 0
+    deleted: list[Path] = []
     for file in (payload or {}).get("files") or []:
         path = safe_data_path(str(file))
         if path and path.exists() and path.is_file():
             path.unlink()
             remove_history_item(path)
-            deleted += 1
-    return ok({"deleted": deleted})
+            deleted.append(path)
+    if deleted:
+        HistoryStore(DATA_DIR).discard_covers(deleted)
+    return ok({"deleted": len(deleted)})
 
 
 @app.get("/api/plugin/MediaCoverGenerator/download_saved_cover")
@@ -1917,31 +2331,6 @@ def normalize_style(style: Any) -> str:
     )
 
 
-def title_config_version(config: dict[str, Any]) -> str:
-    payload = {
-        "title_config": config.get("title_config") or {},
-        "distinguish_same_name_libraries": bool(config.get("distinguish_same_name_libraries", False)),
-    }
-    serialized = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
-    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
-
-
-def cached_preview_payload(config: dict[str, Any], library_name: str, style: str) -> dict[str, Any] | None:
-    style_config = dict(config.get("style_config") or {})
-    service.config = config
-    render_config = service.render_config(style_config, library_name, style)
-    output_dir = resolve_data_path(config.get("covers_output"), "/app/data/output")
-    output_path = output_dir / f"{slugify(library_name)}_{style}{service.output_suffix(render_config, style)}"
-    if output_path.exists() and output_path.is_file() and output_path.stat().st_size > 0:
-        return {
-            "src": data_file_url(output_path),
-            "server": "cache",
-            "library": library_name,
-            "style": style,
-        }
-    return None
-
-
 def remember_libraries(config: dict[str, Any], libraries: list[dict[str, Any]]) -> None:
     if not libraries or config.get("mock_enabled", True):
         return
@@ -2225,6 +2614,7 @@ def to_plugin_config(config: dict[str, Any]) -> dict[str, Any]:
         "api_token": str(config.get("api_token") or ""),
         "cron": str(config.get("cron") or ""),
         "delay": int(config.get("delay") or 60),
+        "generation_concurrency": int(config.get("generation_concurrency") or 3),
         "emby_url": str(config.get("emby_url") or ""),
         "emby_api_key": str(config.get("emby_api_key") or ""),
         "jellyfin_url": str(config.get("jellyfin_url") or ""),
@@ -2308,6 +2698,7 @@ def from_plugin_config(incoming: dict[str, Any], base: dict[str, Any]) -> dict[s
         "lock_latest_sort",
         "cron",
         "delay",
+        "generation_concurrency",
         "emby_url",
         "emby_api_key",
         "jellyfin_url",
@@ -2758,7 +3149,8 @@ def safe_data_path(value: str) -> Path | None:
     if not raw:
         return None
     if raw.startswith("/data/"):
-        raw = raw[len("/data/") :]
+        # Drop the query of signed or versioned asset URLs.
+        raw = unquote(raw[len("/data/") :].split("?", 1)[0])
     path = Path(raw)
     if not path.is_absolute():
         path = DATA_DIR / raw
@@ -2811,7 +3203,7 @@ def history_style_name(stem: str) -> str:
 
 
 def timestamp_label() -> str:
-    return now_local(str(load_config().get("timezone") or "Asia/Shanghai")).strftime("%Y%m%d_%H%M%S")
+    return now_local(str(config_snapshot().get("timezone") or "Asia/Shanghai")).strftime("%Y%m%d_%H%M%S")
 
 
 def default_avatar_data_url() -> str:
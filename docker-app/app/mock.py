@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageChops, ImageDraw, ImageFont
 
 
 MOCK_LIBRARIES = [
@@ -47,20 +47,12 @@ def ensure_mock_images(input_dir: Path, slug: str, title: str, limit: int) -> li
 def _create_mock_image(path: Path, title: str, index: int) -> None:
     width, height = 1280, 720
     start, end, ink = PALETTES[index % len(PALETTES)]
-    image = Image.new("RGB", (width, height), start)
-    pixels = image.load()
-    sr, sg, sb = _hex(start)
-    er, eg, eb = _hex(end)
-    for y in range(height):
-        t = y / max(1, height - 1)
-        for x in range(width):
-            drift = (x / max(1, width - 1)) * 0.22
-            mix = min(1, t * 0.78 + drift)
-            pixels[x, y] = (
-                int(sr + (er - sr) * mix),
-                int(sg + (eg - sg) * mix),
-                int(sb + (eb - sb) * mix),
-            )
+    # mix = min(1, 0.78 * y/h + 0.22 * x/w), built from gradient masks
+    # instead of a per-pixel loop.
+    vertical = Image.linear_gradient("L").resize((width, height)).point(lambda value: round(value * 0.78))
+    horizontal = Image.linear_gradient("L").rotate(90).resize((width, height)).point(lambda value: round(value * 0.22))
+    mix = ImageChops.add(vertical, horizontal)
+    image = Image.composite(Image.new("RGB", (width, height), end), Image.new("RGB", (width, height), start), mix)
     draw = ImageDraw.Draw(image, "RGBA")
     for step in range(5):
         offset = index * 37 + step * 180
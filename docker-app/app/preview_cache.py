@@ -0,0 +1,186 @@
+"""Content-addressed cache for rendered previews.
+
+A preview is identified by everything the renderer reads: the style, the
+resolved title and subtitle, the full render config (layout, fonts, colors,
+resolution) and the identity (path, size, mtime) of every source image and
+font file. Equal settings therefore hash to the same file, so repeated
+previews, undo/redo and toggling back to an earlier setting are served from
+disk without rendering again.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from .cover.renderer import RESOLUTIONS
+from .metrics import CACHE_REQUESTS
+
+
+PREVIEW_RESOLUTION = "720p"
+DRAFT_RESOLUTION = "360p"
+MAX_PREVIEW_RENDERS = 64
+BLUR_KEYS = {"blur", "blur_size", "shadowBlur"}
+
+
+def resolution_size(value: Any) -> tuple[int, int] | None:
+    if isinstance(value, str) and "x" in value:
+        try:
+            width, height = (int(part) for part in value.lower().split("x", 1))
+        except ValueError:
+            return None
+        return width, height
+    return RESOLUTIONS.get(str(value or ""), RESOLUTIONS["1080p"])
+
+
+def capped_resolution(value: Any, cap: str) -> Any:
+    size = resolution_size(value)
+    limit = RESOLUTIONS[cap]
+    return value if size and size[0] <= limit[0] and size[1] <= limit[1] else cap
+
+
+def preview_resolution(value: Any) -> Any:
+    """Cap a static render resolution at the preview size."""
+    return capped_resolution(value, PREVIEW_RESOLUTION)
+
+
+def _draft_effects(value: Any, blur_scale: float) -> Any:
+    if isinstance(value, list):
+        return [_draft_effects(item, blur_scale) for item in value]
+    if not isinstance(value, dict):
+        return value
+    result = {}
+    for key, item in value.items():
+        if key == "grain":
+            result[key] = 0
+        elif key in BLUR_KEYS and isinstance(item, (int, float, str)) and not isinstance(item, bool):
+            try:
+                result[key] = max(0, int(round(float(item) * blur_scale)))
+            except ValueError:
+                result[key] = item
+        else:
+            result[key] = _draft_effects(item, blur_scale)
+    return result
+
+
+def draft_render_config(render_config: dict[str, Any], style: str) -> dict[str, Any]:
+    """Low-fidelity variant of a preview config for interactive editing.
+
+    Static styles drop to 360p with blur radii scaled by the same factor so
+    the draft looks like a smaller copy of the full render; film grain is
+    removed and animated styles render a single still frame.
+    """
+    config = copy.deepcopy(render_config)
+    config["draft"] = True
+    blur_scale = 1.0
+    if not style.startswith("animated_"):
+        full_size = resolution_size(config.get("resolution"))
+        config["resolution"] = capped_resolution(config.get("resolution"), DRAFT_RESOLUTION)
+        draft_size = resolution_size(config["resolution"])
+        # Layouts compose at their own design size, so their blur stays as is.
+        if full_size and draft_size and not isinstance(config.get("custom_static_layout"), dict):
+            blur_scale = min(1.0, draft_size[0] / full_size[0])
+    return _draft_effects(config, blur_scale)
+
+
+def file_identity(path: str | Path) -> list[Any]:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return [str(path), None, None]
+    return [str(path), stat_result.st_size, stat_result.st_mtime_ns]
+
+
+def preview_key(style: str, title: str, subtitle: str, render_config: dict[str, Any], image_paths: list[Path]) -> str:
+    font_paths = render_config.get("font_paths") if isinstance(render_config.get("font_paths"), dict) else {}
+    fonts = sorted({str(path) for path in [*font_paths.values(), render_config.get("font")] if path})
+    canonical = {
+        "style": style,
+        "title": title,
+        "subtitle": subtitle,
+        "config": render_config,
+        "images": [file_identity(path) for path in image_paths],
+        "fonts": [file_identity(path) for path in fonts],
+    }
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class PreviewSessions:
+    """Latest preview request per editor session.
+
+    Starting a request cancels the one it supersedes, so an abandoned full
+    render stops at its next frame or layer instead of finishing unseen.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._active: dict[str, threading.Event] = {}
+
+    def begin(self, session: str) -> threading.Event:
+        cancel = threading.Event()
+        with self._lock:
+            previous = self._active.get(session)
+            self._active[session] = cancel
+        if previous is not None:
+            previous.set()
+        return cancel
+
+    def finish(self, session: str, cancel: threading.Event) -> None:
+        with self._lock:
+            if self._active.get(session) is cancel:
+                del self._active[session]
+
+
+class PreviewRenderCache:
+    """Bounded directory of rendered previews, evicted least recently used."""
+
+    def __init__(self, root: Path, max_entries: int = MAX_PREVIEW_RENDERS) -> None:
+        self.root = root
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, suffix: str) -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def lookup(self, key: str, suffix: str) -> Path | None:
+        path = self.path_for(key, suffix)
+        try:
+            if path.stat().st_size > 0:
+                # Touch so pruning keeps recently viewed previews.
+                os.utime(path)
+                CACHE_REQUESTS.inc(cache="preview_render", result="hit")
+                return path
+        except OSError:
+            pass
+        CACHE_REQUESTS.inc(cache="preview_render", result="miss")
+        return None
+
+    def store(self, key: str, rendered: Path) -> Path:
+        """Move a finished render into the cache under its key."""
+        target = self.path_for(key, rendered.suffix)
+        os.replace(rendered, target)
+        self.prune()
+        return target
+
+    def scratch_path(self, key: str, suffix: str) -> Path:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return self.root / f".{key}.{threading.get_ident()}.tmp{suffix}"
+
+    def prune(self) -> int:
+        with self._lock:
+            try:
+                entries = [path for path in self.root.iterdir() if path.is_file() and not path.name.startswith(".")]
+            except OSError:
+                return 0
+            entries.sort(key=lambda path: path.stat().st_mtime_ns, reverse=True)
+            removed = 0
+            for path in entries[self.max_entries :]:
+                path.unlink(missing_ok=True)
+                removed += 1
+            return removed
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from collections import deque
+from contextvars import ContextVar
 import logging
+import os
+import re
 from datetime import datetime, timedelta
 from .time_utils import now_local
 from pathlib import Path
-from typing import Iterator
+from typing import Any, Iterator
 
 from .config import DATA_DIR
 
@@ -16,8 +20,20 @@ if not APP_LOGGER.handlers:
     APP_LOGGER.addHandler(stream)
     APP_LOGGER.setLevel(logging.INFO)
 
+ACTIVE_RUN_LOG: ContextVar[str | None] = ContextVar("active_run_log", default=None)
+
+LOG_PAGE_BYTES = 200_000
+# Upper bound on bytes a single filtered read scans, so a rare keyword in a
+# huge file costs a few pages per request rather than a full-file pass.
+LOG_SCAN_BYTES = 8 * 1024 * 1024
+LOG_LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+LOG_RECORD_START = re.compile(rb"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d+ ([A-Z]+) ")
+
 
 class RunLog:
+    # task_id -> file of every run that is still writing.
+    _open: dict[str, Path] = {}
+
     def __init__(self, trigger: str) -> None:
         now = now_local()
         self.started_at = now
@@ -27,11 +43,26 @@ class RunLog:
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self._handler = logging.FileHandler(self.path, encoding="utf-8")
         self._handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
-        # A generation is single-flight. Attach the run file to the shared app
-        # logger so download, render and upload failures emitted by services are
-        # captured in this task's file as well as Docker stdout.
+        self._handler.addFilter(self._owns_record)
+        # Attach the run file to the shared app logger so download, render and
+        # upload failures emitted by services are captured in this task's file
+        # as well as Docker stdout. Runs may overlap, so records are routed by
+        # the run bound to the emitting asyncio task (see bind).
         self.logger = APP_LOGGER
         self.logger.addHandler(self._handler)
+        RunLog._open[self.task_id] = self.path
+
+    def bind(self) -> None:
+        """Route records emitted by the current task (and its to_thread work) to this file."""
+        ACTIVE_RUN_LOG.set(self.task_id)
+
+    def _owns_record(self, record: logging.LogRecord) -> bool:
+        active = ACTIVE_RUN_LOG.get()
+        if active is None:
+            # Records from unbound contexts (plain worker threads) can only be
+            # attributed when a single run is open, as before runs overlapped.
+            return len(RunLog._open) == 1
+        return active == self.task_id
 
     def info(self, message: str, *args: object) -> None:
         self.logger.info(message, *args)
@@ -42,7 +73,12 @@ class RunLog:
     def exception(self, message: str, *args: object) -> None:
         self.logger.exception(message, *args)
 
+    @classmethod
+    def open_paths(cls) -> list[Path]:
+        return list(cls._open.values())
+
     def close(self) -> None:
+        RunLog._open.pop(self.task_id, None)
         self.logger.removeHandler(self._handler)
         self._handler.close()
 
@@ -68,11 +104,25 @@ def clean_expired_logs(retention_days: int) -> int:
     return removed
 
 
-def iter_logs() -> Iterator[Path]:
+def log_entries() -> list[tuple[Path, os.stat_result]]:
+    """Every log file with its stat, newest first; each file is stat'ed once."""
     logs_dir = DATA_DIR / "logs"
     if not logs_dir.exists():
-        return iter(())
-    return iter(sorted((path for path in logs_dir.rglob("*.log") if path.is_file()), key=lambda path: path.stat().st_mtime, reverse=True))
+        return []
+    entries = []
+    for path in logs_dir.rglob("*.log"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        if path.is_file():
+            entries.append((path, stat))
+    entries.sort(key=lambda entry: entry[1].st_mtime, reverse=True)
+    return entries
+
+
+def iter_logs() -> Iterator[Path]:
+    return iter([path for path, _stat in log_entries()])
 
 
 def safe_log_path(name: str) -> Path | None:
@@ -83,3 +133,96 @@ def safe_log_path(name: str) -> Path | None:
     except ValueError:
         return None
     return candidate if candidate.is_file() and candidate.suffix == ".log" else None
+
+
+def _record_matches(record: bytes, min_level: int, keyword: bytes) -> bool:
+    if min_level:
+        match = LOG_RECORD_START.match(record)
+        if not match or LOG_LEVELS.get(match.group(1).decode("ascii"), 0) < min_level:
+            return False
+    return not keyword or keyword in record.lower()
+
+
+def _iter_records(handle: Any, position: int, max_record: int) -> Iterator[tuple[bytes, int]]:
+    """Yield ``(record, end_offset)``; stops before a partially written line."""
+    record = b""
+    while True:
+        line = handle.readline()
+        if not line.endswith(b"\n"):
+            break
+        if record and (LOG_RECORD_START.match(line) or len(record) >= max_record):
+            yield record, position
+            record = b""
+        record += line
+        position += len(line)
+    if record:
+        yield record, position
+
+
+def read_log_range(
+    path: Path,
+    offset: int | None = None,
+    limit: int = LOG_PAGE_BYTES,
+    level: str = "",
+    keyword: str = "",
+    scan_limit: int = LOG_SCAN_BYTES,
+) -> dict[str, Any]:
+    """Read whole log records by byte offset.
+
+    ``offset=None`` returns the last ``limit`` bytes of records. Otherwise
+    reading starts at ``offset`` and ``next_offset`` is the cursor for the
+    following call; a partially written last line is left for that call. An
+    offset past the end (the file was replaced) restarts from 0 and sets
+    ``reset``.
+
+    ``level`` keeps records at or above that level and ``keyword`` keeps
+    records containing it (case-insensitive). A record is a timestamped line
+    plus its continuation lines, so tracebacks stay with their message.
+    Filtered reads scan at most ``scan_limit`` bytes; keep calling from
+    ``next_offset`` until ``eof``.
+    """
+    limit = max(1, int(limit))
+    min_level = LOG_LEVELS.get(str(level or "").strip().upper(), 0)
+    needle = str(keyword or "").strip().lower().encode("utf-8")
+    filtered = bool(min_level or needle)
+    size = path.stat().st_size
+    tail = offset is None
+    reset = False
+    if tail:
+        start = max(0, size - (scan_limit if filtered else limit))
+    else:
+        start = max(0, int(offset or 0))
+        if start > size:
+            start, reset = 0, True
+    chunks: deque[bytes] = deque()
+    kept = 0
+    with path.open("rb") as handle:
+        handle.seek(start)
+        if tail and start > 0:
+            # The tail window usually starts mid-line.
+            start += len(handle.readline())
+        next_offset = start
+        exhausted = False
+        for record, end in _iter_records(handle, start, limit):
+            if not tail:
+                if filtered and (kept >= limit or (end - start > scan_limit and next_offset > start)):
+                    break
+                if not filtered and chunks and kept + len(record) > limit:
+                    break
+            if not filtered or _record_matches(record, min_level, needle):
+                chunks.append(record)
+                kept += len(record)
+                while tail and kept > limit and len(chunks) > 1:
+                    kept -= len(chunks.popleft())
+            next_offset = end
+        else:
+            exhausted = True
+    return {
+        "offset": start,
+        "next_offset": next_offset,
+        "size": size,
+        # Only a partially written line (if anything) is left after the cursor.
+        "eof": exhausted,
+        "reset": reset,
+        "content": b"".join(chunks).decode("utf-8", errors="replace"),
+    }
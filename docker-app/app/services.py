@@ -1,23 +1,28 @@
 from __future__ import annotations
 
 import asyncio
+from contextvars import ContextVar
 from copy import deepcopy
+import hashlib
 import json
 import re
+import tempfile
 import time
 import urllib.request
 from pathlib import Path
-from typing import Any
+from typing import Any, Awaitable
 
 from .config import DATA_DIR, load_config, resolve_data_path, save_config
 from .cover import CoverRenderer
 from .cover.presets import create_preset_layout
+from .metrics import CACHE_REQUESTS, FAILURES, GENERATION_STAGE_SECONDS, UPLOADED_BYTES, UPLOADS
 from .media_client import MediaLibrary, MediaServerClient, configured_clients
 from .mock import MOCK_LIBRARIES, ensure_mock_images, mock_library_by_name
 from .run_logs import APP_LOGGER
 from .history_store import HistoryBatch, HistoryStore
 from .font_preview import PreviewFontService
 from .font_resolution import ResolvedRenderText, resolve_render_text_and_font
+from .generation_events import report_stage
 
 
 IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
@@ -26,6 +31,10 @@ FONT_EXTENSIONS = {".ttf", ".ttc", ".otf", ".woff", ".woff2"}
 BUNDLED_FONTS_DIR = Path(__file__).parent / "bundled_fonts"
 HISTORY_INDEX_FILE = DATA_DIR / "output" / ".history.json"
 LEGACY_HISTORY_INDEX_FILE = DATA_DIR / "history.json"
+# Each generation run owns its history batch through the asyncio task that
+# executes it, so a manual run started during a scheduled sweep keeps a
+# separate manifest.
+ACTIVE_HISTORY_BATCH: ContextVar[HistoryBatch | None] = ContextVar("active_history_batch", default=None)
 BUILTIN_FONT_URLS = {
     "emblemaone": {
         "filename": "EmblemaOne-Regular.ttf",
@@ -113,25 +122,71 @@ def _title_entry_texts(value: Any) -> dict[str, str]:
     return texts
 
 
+def title_config_version(config: dict[str, Any]) -> str:
+    payload = {
+        "title_config": config.get("title_config") or {},
+        "distinguish_same_name_libraries": bool(config.get("distinguish_same_name_libraries", False)),
+    }
+    serialized = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+
+class TitleConfigIndex:
+    """Title entries keyed by compacted library name, compiled once per title config version."""
+
+    def __init__(self, title_config: dict[str, Any]) -> None:
+        self.by_library: dict[str, Any] = {}
+        self.keys: list[tuple[str, Any]] = []
+        for key, value in title_config.items():
+            normalized = _compact_title_config_key(key)
+            self.by_library.setdefault(normalized, value)
+            self.keys.append((normalized, value))
+        self._scoped: dict[tuple[str, str], tuple[Any] | None] = {}
+
+    def scoped(self, server_name: str, library_name: str) -> tuple[Any] | None:
+        """Return the first entry whose key names both the server and the library."""
+        key = (_compact_title_config_key(server_name), _compact_title_config_key(library_name))
+        if key not in self._scoped:
+            self._scoped[key] = next(
+                ((value,) for candidate, value in self.keys if key[0] in candidate and key[1] in candidate),
+                None,
+            )
+        return self._scoped[key]
+
+    def library(self, library_name: str) -> Any:
+        return self.by_library.get(_compact_title_config_key(library_name))
+
+
+_TITLE_CONFIG_INDEXES: dict[str, TitleConfigIndex] = {}
+
+
+def title_config_index(config: dict[str, Any]) -> TitleConfigIndex:
+    title_config = config.get("title_config")
+    if not isinstance(title_config, dict):
+        title_config = {}
+    version = title_config_version(config)
+    index = _TITLE_CONFIG_INDEXES.get(version)
+    if index is None:
+        index = TitleConfigIndex(title_config)
+        # Only the current config (plus an unsaved preview draft) is ever live.
+        if len(_TITLE_CONFIG_INDEXES) >= 4:
+            _TITLE_CONFIG_INDEXES.pop(next(iter(_TITLE_CONFIG_INDEXES)))
+        _TITLE_CONFIG_INDEXES[version] = index
+    return index
+
+
 def library_title_payload(config: dict[str, Any], library_name: str, server_name: str = "") -> tuple[str, str, dict[str, str]]:
     title_config = config.get("title_config") or {}
     if isinstance(title_config, str):
         title_config = {}
+    index = title_config_index(config)
     raw = title_config.get(library_name) or {}
     if bool(config.get("distinguish_same_name_libraries", False)) and server_name:
-        normalized_server = _compact_title_config_key(server_name)
-        normalized_library = _compact_title_config_key(library_name)
-        for key, value in title_config.items():
-            normalized_key = _compact_title_config_key(key)
-            if normalized_server in normalized_key and normalized_library in normalized_key:
-                raw = value
-                break
+        scoped = index.scoped(server_name, library_name)
+        if scoped is not None:
+            raw = scoped[0]
     if not raw:
-        normalized_library = _compact_title_config_key(library_name)
-        for key, value in title_config.items():
-            if _compact_title_config_key(key) == normalized_library:
-                raw = value
-                break
+        raw = index.library(library_name) or {}
     if isinstance(raw, list):
         return (
             str(raw[0] if raw else library_name),
@@ -144,17 +199,15 @@ def library_title_payload(config: dict[str, Any], library_name: str, server_name
 
 
 def library_title_background(config: dict[str, Any], library_name: str, server_name: str = "") -> str | None:
-    title_config = config.get("title_config") if isinstance(config.get("title_config"), dict) else {}
-    normalized_library = _compact_title_config_key(library_name)
-    normalized_server = _compact_title_config_key(server_name)
-    for key, value in title_config.items():
-        candidate = _compact_title_config_key(key)
-        matches = candidate == normalized_library
-        if bool(config.get("distinguish_same_name_libraries", False)) and normalized_server:
-            matches = normalized_server in candidate and normalized_library in candidate
-        if matches and isinstance(value, dict):
-            background = value.get("background")
-            return str(background) if isinstance(background, str) and background else None
+    index = title_config_index(config)
+    if bool(config.get("distinguish_same_name_libraries", False)) and _compact_title_config_key(server_name):
+        scoped = index.scoped(server_name, library_name)
+        value = scoped[0] if scoped is not None else None
+    else:
+        value = index.library(library_name)
+    if isinstance(value, dict):
+        background = value.get("background")
+        return str(background) if isinstance(background, str) and background else None
     return None
 
 
@@ -261,10 +314,18 @@ def remove_history_item(path: Path) -> None:
 class CoverService:
     def __init__(self) -> None:
         self.config = load_config()
-        self.history_batch: HistoryBatch | None = None
+        self._library_locks: dict[str, asyncio.Lock] = {}
         self.preview_fonts = PreviewFontService(DATA_DIR, APP_LOGGER)
         self._preview_font_paths: set[str] = set()
 
+    @property
+    def history_batch(self) -> HistoryBatch | None:
+        return ACTIVE_HISTORY_BATCH.get()
+
+    @history_batch.setter
+    def history_batch(self, batch: HistoryBatch | None) -> None:
+        ACTIVE_HISTORY_BATCH.set(batch)
+
     def reload(self) -> dict[str, Any]:
         self.config = load_config()
         return self.config
@@ -826,6 +887,20 @@ class CoverService:
                     return client, library
         raise ValueError(f"Library not found: {library_name}")
 
+    async def serialized_library(self, library_name: str, generation: Awaitable[dict[str, Any]]) -> dict[str, Any]:
+        """Await one library generation while no other run renders the same library.
+
+        Output files and the media cache are keyed by library name, so two runs
+        touching the same name (or same-name libraries on two servers) must not
+        interleave their download, render and upload steps.
+        """
+        key = slugify(library_name)
+        lock = self._library_locks.get(key)
+        if lock is None:
+            lock = self._library_locks[key] = asyncio.Lock()
+        async with lock:
+            return await generation
+
     async def generate(self, library_name: str | None = None, style: str | None = None, trigger: str = "manual") -> list[dict[str, Any]]:
         if self.local_mode():
             if library_name:
@@ -845,10 +920,10 @@ class CoverService:
                 has_explicit_scope = bool(self.config.get("include_libraries"))
                 if has_explicit_scope and str(target.get("value")) not in {str(item.get("value")) for item in selected}:
                     raise ValueError(f"本地媒体库不在当前生成范围内: {target.get('name')}")
-                return [await self.generate_local_library(str(target["name"]), style)]
+                return [await self.serialized_library(str(target["name"]), self.generate_local_library(str(target["name"]), style))]
             libraries = self.selected_generation_libraries(self.local_libraries())
             if libraries:
-                return [await self.generate_local_library(str(library["name"]), style) for library in libraries]
+                return [await self.serialized_library(str(library["name"]), self.generate_local_library(str(library["name"]), style)) for library in libraries]
             return [await self.generate_from_local(style)]
 
         if self.mock_enabled():
@@ -856,19 +931,19 @@ class CoverService:
                 library = mock_library_by_name(library_name)
                 if not library:
                     raise ValueError(f"Mock library not found: {library_name}")
-                return [await self.generate_mock_library(library, style)]
-            return [await self.generate_mock_library(library, style) for library in MOCK_LIBRARIES]
+                return [await self.serialized_library(library["name"], self.generate_mock_library(library, style))]
+            return [await self.serialized_library(library["name"], self.generate_mock_library(library, style)) for library in MOCK_LIBRARIES]
 
         if library_name:
             client, library = await self.find_library(library_name)
-            return [await self.generate_library(client, library, style, trigger=trigger)]
+            return [await self.serialized_library(library.name, self.generate_library(client, library, style, trigger=trigger))]
 
         libraries = self.selected_generation_libraries(await self.libraries())
         if libraries:
             output = []
             for library_info in libraries:
                 client, library = await self.find_library(str(library_info.get("value") or library_info["name"]))
-                output.append(await self.generate_library(client, library, style, trigger=trigger))
+                output.append(await self.serialized_library(library.name, self.generate_library(client, library, style, trigger=trigger)))
             return output
 
         return [await self.generate_from_local(style)]
@@ -892,12 +967,17 @@ class CoverService:
         media_cache_dir.mkdir(parents=True, exist_ok=True)
 
         image_paths: list[Path] = self.local_images(library.name, image_limit, include_mock=False)
+        if image_paths:
+            CACHE_REQUESTS.inc(len(image_paths), cache="source_image", result="hit")
+        fetched_at = downloaded_at = task_started
         # A monitor run always reflects the newest scanned item. Manual and
         # scheduled runs intentionally keep the user's configured sort order.
         sort_by = "DateCreated" if trigger == "monitor" else str(style_config.get("sort_by") or self.config.get("sort_by") or "DateCreated")
         source_item_id = ""
         if len(image_paths) < image_limit:
+            report_stage("fetch", library=library.name, server=client.server_name, style=style_name)
             items = await client.get_items(library.id, image_limit, sort_by)
+            fetched_at = time.perf_counter()
             download_jobs: list[tuple[str, Path]] = []
             for index, item in enumerate(items, start=1):
                 image_url = client.item_image_url(item, image_source)
@@ -928,13 +1008,16 @@ class CoverService:
                     }
             used_paths = {path.resolve() for path in image_paths if path.exists()}
             start_index = len(image_paths)
+            report_stage("download", library=library.name, server=client.server_name, style=style_name, total=len(download_jobs))
             for index, (image_url, downloaded_path) in enumerate(download_jobs, start=start_index + 1):
                 if len(image_paths) >= image_limit:
                     break
                 path = media_cache_dir / f"{index:02d}.jpg"
+                CACHE_REQUESTS.inc(cache="source_image", result="miss")
                 try:
                     downloaded = await client.download_image(image_url, path)
                 except Exception as error:
+                    FAILURES.inc(operation="download", server=client.server_name)
                     APP_LOGGER.warning("图片下载失败 library=%s index=%s: %s", library.name, index, error)
                     continue
                 resolved = downloaded.resolve()
@@ -942,6 +1025,7 @@ class CoverService:
                     continue
                 used_paths.add(resolved)
                 image_paths.append(downloaded)
+            downloaded_at = time.perf_counter()
         if not image_paths:
             raise ValueError(f"No image sources available for {library.name}")
 
@@ -955,18 +1039,35 @@ class CoverService:
         render_config["library_item_counts"] = item_counts
         render_config["library_item_count"] = item_counts.get("episodes", 0)
         output_path = output_dir / f"{slugify(library.name)}_{style_name}{self.output_suffix(render_config, style_name)}"
+        report_stage("render", library=library.name, server=client.server_name, style=style_name, sources=len(image_paths))
+        render_started = time.perf_counter()
         await asyncio.to_thread(self.renderer().render, image_paths, str(render_config.get("resolved_title") or title), str(render_config.get("resolved_subtitle") or subtitle), style_name, render_config, output_path)
         rendered_at = time.perf_counter()
         uploaded = False
         upload_error = ""
         if bool(self.config.get("upload_after_generate", True)):
+            report_stage("upload", library=library.name, server=client.server_name, style=style_name)
             try:
                 result = await client.upload_library_cover(library.id, output_path)
                 uploaded = bool(result.get("uploaded", True))
             except Exception as exc:
                 upload_error = str(exc)
+                FAILURES.inc(operation="upload", server=client.server_name)
                 APP_LOGGER.warning("媒体库封面更新失败 server=%s library=%s: %s", client.server_name, library.name, exc)
         uploaded_at = time.perf_counter()
+        if bool(self.config.get("upload_after_generate", True)):
+            UPLOADS.inc(server=client.server_name, result="success" if uploaded else "failure")
+            if uploaded:
+                UPLOADED_BYTES.inc(output_path.stat().st_size, server=client.server_name)
+        for stage, started_at, finished_at in (
+            ("fetch", task_started, fetched_at),
+            ("download", fetched_at, downloaded_at),
+            ("render", render_started, rendered_at),
+            ("upload", rendered_at, uploaded_at),
+            ("total", task_started, uploaded_at),
+        ):
+            if finished_at > started_at:
+                GENERATION_STAGE_SECONDS.observe(finished_at - started_at, stage=stage, style=style_name, server=client.server_name)
         APP_LOGGER.info(
             "生成阶段耗时 server=%s library=%s source_ms=%.1f render_ms=%.1f upload_ms=%.1f total_ms=%.1f",
             client.server_name, library.name,
@@ -991,6 +1092,79 @@ class CoverService:
         self.record_batch_result(result, client.server_id, client.server_name, client.kind, library.id, library.name)
         return result
 
+    async def render_job(
+        self,
+        style_name: str,
+        images: list[bytes],
+        title: str,
+        subtitle: str = "",
+        overrides: dict[str, Any] | None = None,
+        layout: dict[str, Any] | None = None,
+        library_name: str = "",
+        server_name: str = "",
+    ) -> tuple[bytes, str]:
+        """Render one cover from uploaded source images and return (bytes, suffix).
+
+        Used by the batch render endpoint that the MoviePilot plugin offloads
+        to. The request supplies already-resolved titles and any style values
+        it wants to pin; everything else comes from this instance's config and
+        font library.
+        """
+        overrides = dict(overrides or {})
+        style_config = {**dict(self.config.get("style_config") or {}), **overrides}
+        render_config = self.render_config(style_config, library_name or title, style_name, server_name, layout)
+        # Explicit request values win over the per-style animated settings
+        # that render_config() applies from this instance's configuration.
+        render_config.update(overrides)
+        if "blur_size" in overrides:
+            render_config["blur"] = overrides["blur_size"]
+        if "main_title_font_size" in overrides:
+            render_config["main_font_size"] = overrides["main_title_font_size"]
+        font_index = self.font_library_index()
+        font_paths = dict(render_config.get("font_paths") or {})
+        for role in ("main_title", "subtitle", "custom_text"):
+            preset = str(overrides.get(f"{role}_font_preset") or "").strip()
+            resolved_font = self.resolve_font_reference(preset, font_index) if preset else ""
+            if resolved_font:
+                font_paths[role] = resolved_font
+        resolved = self.resolve_render_payload(
+            title,
+            subtitle,
+            {},
+            render_config.get("custom_static_layout") if isinstance(render_config.get("custom_static_layout"), dict) else None,
+            font_paths,
+        )
+        render_config["resolved_title"] = resolved["title"]
+        render_config["resolved_subtitle"] = resolved["subtitle"]
+        render_config["custom_texts"] = resolved["custom_texts"]
+        render_config["font_paths"] = resolved["font_paths"]
+        render_config["font_resolution"] = resolved["diagnostics"]
+        render_config["font"] = resolved["font_paths"].get("main_title", "")
+        if isinstance(resolved.get("layout"), dict):
+            render_config["custom_static_layout"] = resolved["layout"]
+        work_root = DATA_DIR / "tmp" / "render_jobs"
+        work_root.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=work_root) as raw_dir:
+            work_dir = Path(raw_dir)
+            image_paths: list[Path] = []
+            for index, data in enumerate(images, start=1):
+                path = work_dir / f"{index:02d}.img"
+                path.write_bytes(data)
+                image_paths.append(path)
+            output_path = work_dir / f"cover{self.output_suffix(render_config, style_name)}"
+            render_started = time.perf_counter()
+            rendered = await asyncio.to_thread(
+                self.renderer().render,
+                image_paths,
+                str(render_config.get("resolved_title") or title),
+                str(render_config.get("resolved_subtitle") or subtitle),
+                style_name,
+                render_config,
+                output_path,
+            )
+            GENERATION_STAGE_SECONDS.observe(time.perf_counter() - render_started, stage="render", style=style_name, server=server_name or "remote")
+            return rendered.read_bytes(), rendered.suffix
+
     async def generate_from_local(self, style: str | None = None) -> dict[str, Any]:
         style_config = dict(self.config.get("style_config") or {})
         scheme_id = self.resolve_scheme_for_library("local:local")
@@ -1003,7 +1177,10 @@ class CoverService:
         render_config["library_item_count"] = len(image_paths)
         render_config["library_item_counts"] = {mode: len(image_paths) for mode in ("episodes", "titles", "seasons")}
         output_path = output_dir / f"local_{style_name}{self.output_suffix(render_config, style_name)}"
+        report_stage("render", library="本地封面", server="local", style=style_name, sources=len(image_paths))
+        render_started = time.perf_counter()
         await asyncio.to_thread(self.renderer().render, image_paths, str(render_config.get("resolved_title") or "本地封面"), str(render_config.get("resolved_subtitle") or "Local Library"), style_name, render_config, output_path)
+        GENERATION_STAGE_SECONDS.observe(time.perf_counter() - render_started, stage="render", style=style_name, server="local")
         result = {
             "library": "local",
             "library_id": "",
@@ -1037,7 +1214,10 @@ class CoverService:
         render_config["library_item_count"] = len(image_paths)
         render_config["library_item_counts"] = {mode: len(image_paths) for mode in ("episodes", "titles", "seasons")}
         output_path = output_dir / f"{slugify(library_name)}_{style_name}{self.output_suffix(render_config, style_name)}"
+        report_stage("render", library=library_name, server="local", style=style_name, sources=len(image_paths))
+        render_started = time.perf_counter()
         await asyncio.to_thread(self.renderer().render, image_paths, str(render_config.get("resolved_title") or title), str(render_config.get("resolved_subtitle") or subtitle), style_name, render_config, output_path)
+        GENERATION_STAGE_SECONDS.observe(time.perf_counter() - render_started, stage="render", style=style_name, server="local")
         result = {
             "library": library_name,
             "library_id": slugify(library_name),
@@ -1173,6 +1353,7 @@ class CoverService:
         render_config["library_item_counts"] = {mode: int(item_counts.get(mode, fallback_count)) for mode in ("episodes", "titles", "seasons")}
         render_config["library_item_count"] = render_config["library_item_counts"]["episodes"]
         output_path = output_dir / f"{slugify(library['name'])}_{style_name}{self.output_suffix(render_config, style_name)}"
+        report_stage("render", library=library["name"], server="mock", style=style_name, sources=len(image_paths))
         await asyncio.to_thread(self.renderer().render, image_paths, str(render_config.get("resolved_title") or title), str(render_config.get("resolved_subtitle") or subtitle or "Mock Library"), style_name, render_config, output_path)
         result = {
             "library": library["name"],
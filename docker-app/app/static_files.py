@@ -0,0 +1,164 @@
+"""Static file serving with strong ETags, cache policies and precompressed variants.
+
+``python -m app.static_files <dir>`` writes ``.br``/``.gz`` siblings for
+compressible assets at image build time; ``CachedStaticFiles`` serves them
+to clients that accept the encoding and answers conditional GETs with 304.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".html", ".svg", ".json", ".webmanifest", ".txt", ".map", ".ttf", ".otf"}
+MIN_COMPRESS_BYTES = 1024
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+PRIVATE_REVALIDATE_CACHE = "private, no-cache"
+# Vite names bundles "<name>-<8 char hash>.<ext>". Only apply this to Vite's
+# output directory: ordinary names like "NotoSans-SemiBold.ttf" match too.
+HASHED_ASSET = re.compile(r"-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+ETAG_CACHE_SIZE = 4096
+
+_etag_lock = threading.Lock()
+_etag_cache: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+
+
+def strong_etag(path: str | Path, stat_result: os.stat_result) -> str:
+    """Content-hash ETag, remembered per (path, size, mtime)."""
+    key = (str(path), stat_result.st_size, stat_result.st_mtime_ns)
+    with _etag_lock:
+        cached = _etag_cache.get(key)
+        if cached:
+            _etag_cache.move_to_end(key)
+            return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as stream:
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(chunk)
+    etag = f'"{digest.hexdigest()[:32]}"'
+    with _etag_lock:
+        _etag_cache[key] = etag
+        while len(_etag_cache) > ETAG_CACHE_SIZE:
+            _etag_cache.popitem(last=False)
+    return etag
+
+
+def accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q=") and quality[2:].strip() in {"0", "0.0", "0.00", "0.000"}:
+            continue
+        if name.strip():
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def hashed_asset_cache(path: str) -> str:
+    return IMMUTABLE_CACHE if HASHED_ASSET.search(path) else REVALIDATE_CACHE
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with content ETags, Cache-Control and .br/.gz variants.
+
+    ``cache_control`` maps the served file path to a Cache-Control value.
+    """
+
+    def __init__(self, *args, cache_control: Callable[[str], str] | str = REVALIDATE_CACHE, precompressed: bool = True, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control if callable(cache_control) else (lambda _path, value=cache_control: value)
+        self.precompressed = precompressed
+
+    def lookup_path(self, path: str) -> tuple[str, os.stat_result | None]:
+        # Starlette runs lookups in a worker thread; hashing here keeps large
+        # files off the event loop, and file_response then hits the ETag cache.
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            strong_etag(full_path, stat_result)
+        return full_path, stat_result
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        path = str(full_path)
+        headers = {"cache-control": self.cache_control(path), "etag": strong_etag(path, stat_result)}
+        media_type = mimetypes.guess_type(path)[0] or "text/plain"
+        serve_path, serve_stat = path, stat_result
+        if self.precompressed and Path(path).suffix.lower() in COMPRESSIBLE_SUFFIXES:
+            headers["vary"] = "Accept-Encoding"
+            accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+            for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+                if encoding not in accepted:
+                    continue
+                try:
+                    variant_stat = os.stat(path + suffix)
+                except OSError:
+                    continue
+                if variant_stat.st_mtime < stat_result.st_mtime:
+                    continue
+                serve_path, serve_stat = path + suffix, variant_stat
+                headers["content-encoding"] = encoding
+                # Representations differ by encoding, so must their ETags.
+                headers["etag"] = f'{headers["etag"][:-1]}-{encoding}"'
+                break
+        response = FileResponse(serve_path, status_code=status_code, stat_result=serve_stat, media_type=media_type, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def precompress(directory: Path) -> int:
+    """Write .br and .gz siblings that are smaller than their source."""
+    written = 0
+    for path in sorted(directory.rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < MIN_COMPRESS_BYTES:
+            continue
+        variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((".br", brotli.compress(data, quality=11)))
+        for suffix, compressed in variants:
+            target = path.with_name(path.name + suffix)
+            if len(compressed) < len(data):
+                target.write_bytes(compressed)
+                written += 1
+            else:
+                target.unlink(missing_ok=True)
+    return written
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) != 1:
+        print("usage: python -m app.static_files <static-dir>", file=sys.stderr)
+        return 2
+    written = precompress(Path(args[0]))
+    print(f"precompressed {written} variant(s) in {args[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -87,6 +87,11 @@ export const dockerApi: PluginApi = {
   get: (path, params) => request('GET', path, params),
   post: (path, data) => request('POST', path, data),
   delete: (path, data) => request('DELETE', path, data),
+  // EventSource cannot send headers, so the stream authenticates with the
+  // session cookie set at login.
+  events: (path, params) => (typeof EventSource === 'undefined'
+    ? null
+    : new EventSource(normalizePluginPath(path, params), { withCredentials: true })),
 }
 
 export async function loadDockerConfig(): Promise<Partial<MediaCoverGeneratorConfig>> {
@@ -7,6 +7,7 @@ export interface MediaCoverGeneratorConfig {
   lock_latest_sort?: boolean
   cron: string
   delay: number
+  generation_concurrency?: number
   emby_url?: string
   emby_api_key?: string
   jellyfin_url?: string
@@ -381,6 +382,8 @@ export interface BackendPreviewPayload {
   server: string
   library: string
   style: string
+  quality?: 'draft' | 'full'
+  cache?: 'hit' | 'miss'
 }
 
 export interface SimulationParams {
@@ -450,4 +453,5 @@ export interface PluginApi {
   get<T = any>(path: string, params?: any): Promise<T>
   post<T = any>(path: string, data?: any): Promise<T>
   delete?<T = any>(path: string, data?: any): Promise<T>
+  events?(path: string, params?: Record<string, any>): EventSource | null
 }
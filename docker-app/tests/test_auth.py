@@ -1,8 +1,29 @@
 from __future__ import annotations
 
+import tempfile
+import time
 import unittest
+from pathlib import Path
+from unittest import mock
 
-from app.auth import configure_auth, hash_password, is_auth_configured, issue_token, verify_password, verify_token
+from fastapi.testclient import TestClient
+
+from app.auth import (
+    SessionCache,
+    configure_auth,
+    hash_password,
+    is_auth_configured,
+    issue_token,
+    sign_asset_url,
+    verify_asset_signature,
+    verify_password,
+    verify_token,
+)
+from app.main import app
+
+
+def data_mount():
+    return next(route.app for route in app.routes if getattr(route, "name", "") == "data")
 
 
 class AuthTests(unittest.TestCase):
@@ -29,6 +50,44 @@ class AuthTests(unittest.TestCase):
         config["auth"]["token_secret"] = "rotated"
         self.assertIsNone(verify_token(config, token))
 
+    def test_session_cache_skips_reverification_until_identity_changes(self) -> None:
+        config = configure_auth({}, "admin", "correct horse battery staple")
+        token = issue_token(config, "admin")
+        cache = SessionCache(max_entries=2)
+        self.assertEqual(cache.verify(config, token), "admin")
+        with mock.patch("app.auth.token_claims") as claims:
+            self.assertEqual(cache.verify(config, token), "admin")
+            claims.assert_not_called()
+        rotated = {**config, "auth": {**config["auth"], "token_secret": "rotated"}}
+        self.assertIsNone(cache.verify(rotated, token))
+        self.assertIsNone(cache.verify(config, "not-a-token"))
+
+    def test_signed_asset_urls_are_stable_and_expire(self) -> None:
+        config = configure_auth({}, "admin", "correct horse battery staple")
+        now = time.time()
+        url = sign_asset_url(config, "/data/history/batches/b1/%E5%8A%A8%E6%BC%AB.jpg", now=now)
+        self.assertEqual(url, sign_asset_url(config, "/data/history/batches/b1/%E5%8A%A8%E6%BC%AB.jpg", now=now + 1))
+        query = dict(part.split("=", 1) for part in url.split("?", 1)[1].split("&"))
+        self.assertGreaterEqual(int(query["exp"]) - now, 24 * 3600)
+        self.assertTrue(verify_asset_signature(config, "/data/history/batches/b1/动漫.jpg", query["exp"], query["sig"]))
+        self.assertFalse(verify_asset_signature(config, "/data/history/batches/b1/other.jpg", query["exp"], query["sig"]))
+        self.assertFalse(verify_asset_signature(config, "/data/history/batches/b1/动漫.jpg", str(int(now) - 1), query["sig"]))
+        self.assertEqual(sign_asset_url({}, "/data/output/a.jpg"), "/data/output/a.jpg")
+
+    def test_middleware_serves_signed_data_urls_without_a_session(self) -> None:
+        config = configure_auth({}, "admin", "correct horse battery staple")
+        with tempfile.TemporaryDirectory() as raw_dir:
+            (Path(raw_dir) / "tmp").mkdir()
+            (Path(raw_dir) / "tmp" / "cover.jpg").write_bytes(b"jpeg")
+            path = "/data/tmp/cover.jpg"
+            client = TestClient(app)
+            with mock.patch.object(data_mount(), "all_directories", [raw_dir]), mock.patch("app.main.config_snapshot", return_value=config):
+                self.assertEqual(client.get(path).status_code, 401)
+                self.assertEqual(client.get(f"{path}?exp=9999999999&sig=forged").status_code, 401)
+                response = client.get(sign_asset_url(config, path))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"jpeg")
+
 
 if __name__ == "__main__":
     unittest.main()
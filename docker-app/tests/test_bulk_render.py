@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from app.cover.bulk import main
+
+
+class BulkRenderTests(unittest.TestCase):
+    def test_renders_each_library_folder_and_writes_timing_report(self) -> None:
+        with tempfile.TemporaryDirectory() as raw:
+            root = Path(raw)
+            for library, color in (("动漫", "#4f8cff"), ("音乐", "#ff8c4f")):
+                folder = root / "input" / library
+                folder.mkdir(parents=True)
+                for index in range(3):
+                    Image.new("RGB", (400, 600), color).save(folder / f"{index:02d}.jpg")
+            (root / "input" / "空").mkdir()
+
+            code = main([
+                "--input", str(root / "input"),
+                "--output", str(root / "output"),
+                "--jobs", "1",
+                "--style", "single_2",
+                "--library", "动漫",
+            ])
+
+            self.assertEqual(code, 0)
+            report = json.loads((root / "output" / "render_report.json").read_text(encoding="utf-8"))
+            self.assertEqual((report["libraries"], report["rendered"], report["failed"]), (1, 1, 0))
+            entry = report["results"][0]
+            self.assertEqual((entry["library"], entry["style"], entry["source_count"]), ("动漫", "single_2", 3))
+            self.assertTrue(Path(entry["output"]).is_file())
+            self.assertGreater(entry["seconds"], 0)
+            self.assertFalse(list((root / "output").glob("音乐_*")))
+
+
+if __name__ == "__main__":
+    unittest.main()
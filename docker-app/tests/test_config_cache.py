@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import yaml
+
+from app import config as config_module
+
+
+class ConfigCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        root = Path(temp.name)
+        for patcher in (
+            mock.patch.object(config_module, "DATA_DIR", root),
+            mock.patch.object(config_module, "CONFIG_PATH", root / "config.yaml"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        config_module.invalidate_config_cache()
+        self.addCleanup(config_module.invalidate_config_cache)
+
+    def test_unchanged_file_is_parsed_once_and_snapshots_are_read_only(self) -> None:
+        config_module.save_config({"cron": "0 3 * * *"})
+        with mock.patch.object(config_module.yaml, "safe_load", wraps=yaml.safe_load) as parse:
+            first = config_module.config_snapshot()
+            second = config_module.config_snapshot()
+            copy = config_module.load_config()
+        self.assertEqual(parse.call_count, 0)
+        self.assertIs(first, second)
+        with self.assertRaises(TypeError):
+            first["cron"] = ""
+        with self.assertRaises(TypeError):
+            first["style_config"]["style"] = "animated_1"
+        copy["style_config"]["style"] = "animated_1"
+        copy["include_libraries"].append("movies")
+        self.assertEqual(config_module.config_snapshot()["style_config"]["style"], "single_1")
+        self.assertEqual(config_module.config_snapshot()["include_libraries"], ())
+
+    def test_external_edit_is_detected_by_stat(self) -> None:
+        config_module.save_config({"cron": "0 3 * * *"})
+        self.assertEqual(config_module.config_snapshot()["cron"], "0 3 * * *")
+        path = config_module.CONFIG_PATH
+        raw = yaml.safe_load(path.read_text(encoding="utf-8"))
+        raw["cron"] = "*/5 * * * *"
+        path.write_text(yaml.safe_dump(raw, allow_unicode=True, sort_keys=False), encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(config_module.config_snapshot()["cron"], "*/5 * * * *")
+        self.assertEqual(config_module.load_config()["cron"], "*/5 * * * *")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+from app.fake_media_server import FakeServerOptions, running_fake_server
+from app.media_client import MediaServerClient
+
+
+class FakeMediaServerTests(unittest.TestCase):
+    def test_media_client_pages_downloads_and_uploads_against_fake_server(self) -> None:
+        with tempfile.TemporaryDirectory() as raw, running_fake_server(FakeServerOptions(items_per_library=10_000, seed=1, image_dir=Path(raw) / "sources")) as (base_url, server):
+            client = MediaServerClient(base_url, "fake-api-key")
+
+            async def scenario() -> None:
+                libraries = await client.get_libraries()
+                self.assertEqual([library.name for library in libraries], ["动漫", "音乐", "电影"])
+                shows = libraries[0]
+                counts = await client.get_library_item_counts(shows.id)
+                self.assertEqual(counts, {"episodes": 10_000, "titles": 1_000, "seasons": 0})
+                items = await client.get_items(shows.id, limit=25)
+                self.assertEqual(len(items), 25)
+                jobs = [(client.item_image_url(item, max_width=320), Path(raw) / f"{index}.jpg") for index, item in enumerate(items[:3])]
+                paths = await client.download_images(jobs, concurrency=3)
+                self.assertTrue(all(paths))
+                with Image.open(paths[0]) as image:
+                    self.assertEqual(image.width, 320)
+                self.assertTrue((await client.upload_library_cover(shows.id, paths[0]))["ok"])
+
+            asyncio.run(scenario())
+            plugin_style = httpx.get(f"{base_url}/emby/Items/", params={"api_key": "fake-api-key", "ParentId": "mock-movie", "StartIndex": 9_990, "Limit": 20, "IncludeItemTypes": "Movie,Series"})
+            self.assertEqual(len(plugin_style.json()["Items"]), 10)
+            stats = server.stats()
+            self.assertEqual(stats["uploads"], {"mock-anime": 1})
+            self.assertEqual(stats["requests"]["image"], 3)
+
+    def test_error_rate_and_api_key_are_enforced(self) -> None:
+        with running_fake_server(FakeServerOptions(error_rate=1.0, seed=1)) as (base_url, server):
+            self.assertEqual(httpx.get(f"{base_url}/Library/VirtualFolders", params={"api_key": "wrong"}).status_code, 401)
+            self.assertEqual(httpx.get(f"{base_url}/Library/VirtualFolders", params={"api_key": "fake-api-key"}).status_code, 503)
+            self.assertEqual(server.stats()["errors"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
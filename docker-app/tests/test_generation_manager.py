@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import unittest
+from typing import Any
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.generation_events import GenerationEventLog, report_stage
+from app.main import GenerationManager, app, generation_manager
+from app.metrics import FAILURES
+
+
+class FakeCoverService:
+    def __init__(self, libraries: list[str], concurrency: int) -> None:
+        self.config = {"generation_concurrency": concurrency, "log_retention_days": 7}
+        self.names = libraries
+        self.running = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    def reload(self) -> dict[str, Any]:
+        return self.config
+
+    def local_mode(self) -> bool:
+        return False
+
+    def begin_history_batch(self, trigger: str) -> None:
+        return None
+
+    def finalize_history_batch(self, status: str) -> None:
+        return None
+
+    async def libraries(self) -> list[dict[str, Any]]:
+        return [{"name": name, "value": f"server:{name}", "server_name": "fake"} for name in self.names]
+
+    def selected_generation_libraries(self, libraries: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return libraries
+
+    async def generate(self, library_name: str | None, style: str | None = None, trigger: str = "manual") -> list[dict[str, Any]]:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+            if library_name == "server:broken":
+                raise ValueError("no sources")
+            report_stage("render", library=str(library_name), server="fake", style="static_1")
+            return [{"library": library_name, "trigger": trigger}]
+        finally:
+            self.running -= 1
+
+
+class GenerationManagerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_full_sweep_fans_out_and_isolates_library_failures(self) -> None:
+        service = FakeCoverService(["movies", "broken", "shows", "anime", "docs"], concurrency=2)
+        manager = GenerationManager(service)
+        failures = FAILURES.value(operation="generate", server="fake")
+        await manager.start()
+        await asyncio.sleep(0.01)
+        self.assertEqual(service.peak, 2)
+        service.release.set()
+        await asyncio.gather(*(run.task for run in list(manager.runs.values())))
+
+        snapshot = manager.snapshot()
+        self.assertFalse(snapshot["is_generating"])
+        self.assertEqual((snapshot["generation_current"], snapshot["generation_total"]), (5, 5))
+        self.assertEqual(snapshot["generation_label"], "部分失败")
+        self.assertEqual(len(snapshot["generation_items"]), 4)
+        statuses = {entry["name"]: entry["status"] for entry in snapshot["generation_runs"][0]["libraries"]}
+        self.assertEqual(statuses["broken"], "failed")
+        self.assertEqual(sum(status == "done" for status in statuses.values()), 4)
+        self.assertEqual(FAILURES.value(operation="generate", server="fake"), failures + 1)
+
+    async def test_single_library_run_starts_during_a_full_sweep(self) -> None:
+        service = FakeCoverService(["movies", "shows"], concurrency=1)
+        manager = GenerationManager(service)
+        await manager.start(trigger="schedule")
+        await manager.start(library_name="server:shows", trigger="monitor")
+        await manager.start(library_name="server:shows", trigger="monitor")
+        self.assertEqual(len(manager.runs), 2)
+        await asyncio.sleep(0.01)
+        self.assertEqual(service.running, 2)
+
+        sweep, single = sorted(manager.runs.values(), key=lambda run: run.scope)
+        await manager.stop()
+        service.release.set()
+        await asyncio.gather(sweep.task, single.task)
+        self.assertEqual([entry["status"] for entry in sweep.libraries], ["done", "cancelled"])
+        self.assertEqual(sweep.label, "已停止")
+        self.assertEqual(single.items, [{"library": "server:shows", "trigger": "monitor"}])
+        self.assertEqual(manager.runs, {})
+
+    async def test_stopping_one_run_leaves_the_others_running(self) -> None:
+        service = FakeCoverService(["movies", "shows"], concurrency=1)
+        manager = GenerationManager(service)
+        await manager.start(trigger="schedule")
+        await manager.start(library_name="server:shows", trigger="monitor")
+        sweep, single = sorted(manager.runs.values(), key=lambda run: run.scope)
+        await asyncio.sleep(0.01)
+
+        await manager.stop(single.run_id)
+        self.assertTrue(single.stop_requested)
+        self.assertFalse(sweep.stop_requested)
+        service.release.set()
+        await asyncio.gather(sweep.task, single.task)
+        self.assertEqual([entry["status"] for entry in sweep.libraries], ["done", "done"])
+        self.assertEqual(len(sweep.items), 2)
+
+    async def test_events_trace_the_run_in_sequence(self) -> None:
+        service = FakeCoverService(["movies", "broken"], concurrency=2)
+        manager = GenerationManager(service)
+        await manager.start()
+        service.release.set()
+        await asyncio.gather(*(run.task for run in list(manager.runs.values())))
+
+        events = manager.events.since(0)
+        self.assertEqual([event["seq"] for event in events], list(range(1, len(events) + 1)))
+        self.assertEqual(events[0]["type"], "run_started")
+        self.assertEqual(events[1]["type"], "run_planned")
+        self.assertEqual(events[1]["libraries"], ["movies", "broken"])
+        stages = [event for event in events if event["type"] == "item_stage"]
+        self.assertEqual([(event["library"], event["stage"]) for event in stages], [("movies", "render")])
+        finished = {event["library"]: event for event in events if event["type"] == "item_finished"}
+        self.assertEqual(finished["movies"]["items"], [{"library": "server:movies", "trigger": "manual"}])
+        self.assertEqual((finished["broken"]["status"], finished["broken"]["error"]), ("failed", "no sources"))
+        self.assertEqual(events[-1]["type"], "run_finished")
+        self.assertFalse(events[-1]["is_generating"])
+        self.assertEqual((events[-1]["generation_current"], events[-1]["generation_total"]), (2, 2))
+        self.assertEqual(manager.snapshot()["generation_seq"], events[-1]["seq"])
+
+
+class GenerationEventLogTests(unittest.TestCase):
+    def test_resume_reports_gaps_older_than_the_window(self) -> None:
+        log = GenerationEventLog(max_events=3)
+        for index in range(5):
+            log.publish("item_stage", index=index)
+        self.assertEqual([event["index"] for event in log.since(3)], [3, 4])
+        self.assertEqual(log.since(2)[0]["seq"], 3)
+        self.assertIsNone(log.since(1))
+        self.assertEqual(log.since(5), [])
+        # A cursor from before a restart is ahead of the new sequence.
+        self.assertIsNone(log.since(9))
+
+    def test_stream_resumes_from_last_event_id(self) -> None:
+        client = TestClient(app)
+        with mock.patch("app.main.is_auth_configured", return_value=True), mock.patch("app.main.authenticated_username", return_value="admin"):
+            first = client.get("/api/generation/events", params={"until_idle": "true"})
+            self.assertEqual(first.status_code, 200)
+            self.assertTrue(first.headers["content-type"].startswith("text/event-stream"))
+            self.assertIn("event: snapshot\n", first.text)
+            seq = generation_manager.events.seq
+            generation_manager.events.publish("item_stage", library="movies", stage="render", is_generating=False)
+            resumed = client.get("/api/generation/events", params={"until_idle": "true"}, headers={"Last-Event-ID": str(seq)})
+        self.assertNotIn("event: snapshot", resumed.text)
+        self.assertIn(f"id: {seq + 1}\nevent: item_stage\n", resumed.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from app.history_store import HistoryStore
+
+
+class HistoryCoverIndexTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.store = HistoryStore(self.root)
+        self.source = self.root / "cover.jpg"
+        Image.new("RGB", (64, 36), (80, 120, 160)).save(self.source)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def add_batch(self, created_at: str, libraries: list[str]) -> str:
+        batch = self.store.create_history_batch("manual", "server")
+        batch.created_at = created_at
+        for name in libraries:
+            batch.add_result({"output": str(self.source), "style": "static_1", "uploaded": True}, server_id="emby", server_name="Emby", server_type="emby", library_id=name, library_name=name)
+        self.store.finalize_history_batch(batch)
+        return batch.batch_id
+
+    def test_cursor_pages_are_stable_when_new_batches_arrive(self) -> None:
+        self.add_batch("2026-01-01T00:00:00.000Z", ["movies", "shows"])
+        self.add_batch("2026-01-02T00:00:00.000Z", ["movies", "anime"])
+        first = self.store.list_history_covers(limit=3)
+        self.assertEqual(first["total"], 4)
+        self.assertEqual([item["library_name"] for item in first["items"]], ["movies", "anime", "movies"])
+        self.add_batch("2026-01-03T00:00:00.000Z", ["docs"])
+        second = self.store.list_history_covers(cursor=first["next_cursor"], limit=3)
+        self.assertEqual([item["library_name"] for item in second["items"]], ["shows"])
+        self.assertEqual(second["next_cursor"], "")
+
+    def test_library_and_date_filters(self) -> None:
+        self.add_batch("2026-01-01T00:00:00.000Z", ["movies", "shows"])
+        self.add_batch("2026-01-05T00:00:00.000Z", ["movies"])
+        movies = self.store.list_history_covers(library="movies")
+        self.assertEqual([item["created_at"] for item in movies["items"]], ["2026-01-05T00:00:00.000Z", "2026-01-01T00:00:00.000Z"])
+        ranged = self.store.list_history_covers(since="2026-01-01T00:00:00.000Z", until="2026-01-02T00:00:00.000Z")
+        self.assertEqual(ranged["total"], 2)
+        with self.assertRaises(ValueError):
+            self.store.list_history_covers(cursor="not-a-cursor")
+
+    def test_legacy_index_is_rebuilt_and_deleted_files_are_dropped(self) -> None:
+        batch_id = self.add_batch("2026-01-01T00:00:00.000Z", ["movies"])
+        index = json.loads(self.store.index_path.read_text(encoding="utf-8"))
+        self.store.index_path.write_text(json.dumps({"schema_version": 1, "batches": index["batches"]}), encoding="utf-8")
+        cover = self.store.list_history_covers()["items"][0]
+        self.assertTrue(cover["thumbnail"].endswith("thumbnail.webp"))
+        path = self.store.batches / batch_id / cover["file"]
+        path.unlink()
+        self.assertEqual(self.store.discard_covers([path, self.root / "elsewhere.jpg"]), 1)
+        self.assertEqual(self.store.list_history_covers()["total"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app.config import config_snapshot
+from app.fake_media_server import FakeServerOptions, running_fake_server
+from app.main import app
+from app.media_client import MediaServerClient
+from app.metrics import CACHE_REQUESTS, GENERATION_STAGE_SECONDS, UPLOADED_BYTES, Counter, Histogram, render_metrics
+from app.services import CoverService
+
+
+class MetricsTests(unittest.TestCase):
+    def test_exposition_format(self) -> None:
+        counter = Counter("demo_total", "Demo counter.", ("server",))
+        counter.inc(server='a"b')
+        counter.inc(2, server='a"b')
+        histogram = Histogram("demo_seconds", "Demo histogram.", ("stage",), buckets=(0.5, 1))
+        histogram.observe(0.2, stage="render")
+        histogram.observe(0.7, stage="render")
+        text = render_metrics([counter, histogram])
+        self.assertIn("# TYPE demo_total counter\n", text)
+        self.assertIn('demo_total{server="a\\"b"} 3\n', text)
+        self.assertIn('demo_seconds_bucket{stage="render",le="0.5"} 1\n', text)
+        self.assertIn('demo_seconds_bucket{stage="render",le="1"} 2\n', text)
+        self.assertIn('demo_seconds_bucket{stage="render",le="+Inf"} 2\n', text)
+        self.assertIn('demo_seconds_count{stage="render"} 2\n', text)
+        with self.assertRaises(ValueError):
+            counter.inc(server="a", extra="b")
+
+    def test_endpoint_requires_api_token(self) -> None:
+        client = TestClient(app)
+        self.assertEqual(client.get("/metrics").status_code, 403)
+        token = config_snapshot()["api_token"]
+        response = client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# TYPE yahaha_generation_stage_seconds histogram", response.text)
+        self.assertIn('yahaha_generation_queue_depth{state="pending"} 0', response.text)
+
+    def test_generate_library_records_stage_timings_and_upload_bytes(self) -> None:
+        with tempfile.TemporaryDirectory() as raw, running_fake_server(FakeServerOptions(items_per_library=40, seed=3, image_dir=Path(raw) / "sources")) as (base_url, server):
+            service = CoverService()
+            service.config = {**service.config, "covers_output": str(Path(raw) / "output"), "covers_input": "", "local_mode": False, "upload_after_generate": True}
+            client = MediaServerClient(base_url, "fake-api-key", name="fake")
+            library = next(item for item in asyncio.run(client.get_libraries()) if item.id == "mock-movie")
+            before_misses = CACHE_REQUESTS.value(cache="source_image", result="miss")
+            before_bytes = UPLOADED_BYTES.value(server="fake")
+            result = asyncio.run(service.generate_library(client, library))
+            self.assertTrue(result["uploaded"])
+            style = result["style"]
+            for stage in ("fetch", "download", "render", "upload", "total"):
+                self.assertGreaterEqual(GENERATION_STAGE_SECONDS.count(stage=stage, style=style, server="fake"), 1, stage)
+            self.assertGreater(CACHE_REQUESTS.value(cache="source_image", result="miss"), before_misses)
+            self.assertEqual(UPLOADED_BYTES.value(server="fake") - before_bytes, Path(result["output"]).stat().st_size)
+            self.assertEqual(server.stats()["uploads"], {"mock-movie": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.cover import RENDER_CANCEL, CoverRenderer, RenderCancelled
+from app.main import app
+from app.preview_cache import DRAFT_RESOLUTION, PREVIEW_RESOLUTION, PreviewRenderCache, PreviewSessions, draft_render_config, preview_key, preview_resolution
+
+
+class PreviewKeyTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.image = self.root / "01.jpg"
+        Image.new("RGB", (32, 18), (10, 20, 30)).save(self.image)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_key_ignores_dict_order_and_tracks_inputs(self) -> None:
+        first = preview_key("single_1", "电影", "Movies", {"blur": 10, "custom_static_layout": {"a": 1, "b": 2}}, [self.image])
+        reordered = preview_key("single_1", "电影", "Movies", {"custom_static_layout": {"b": 2, "a": 1}, "blur": 10}, [self.image])
+        self.assertEqual(first, reordered)
+        self.assertNotEqual(first, preview_key("single_1", "电影", "Movies", {"blur": 11, "custom_static_layout": {"a": 1, "b": 2}}, [self.image]))
+        self.assertNotEqual(first, preview_key("single_2", "电影", "Movies", {"blur": 10, "custom_static_layout": {"a": 1, "b": 2}}, [self.image]))
+        stat_result = self.image.stat()
+        os.utime(self.image, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1_000_000))
+        self.assertNotEqual(first, preview_key("single_1", "电影", "Movies", {"blur": 10, "custom_static_layout": {"a": 1, "b": 2}}, [self.image]))
+
+    def test_store_lookup_and_prune(self) -> None:
+        cache = PreviewRenderCache(self.root / "renders", max_entries=2)
+        self.assertIsNone(cache.lookup("a", ".jpg"))
+        for index, key in enumerate(("a", "b", "c")):
+            scratch = cache.scratch_path(key, ".jpg")
+            scratch.write_bytes(b"x" * (index + 1))
+            os.utime(scratch, ns=(index * 10**9, index * 10**9))
+            cache.store(key, scratch)
+        self.assertIsNone(cache.lookup("a", ".jpg"))
+        self.assertEqual(cache.lookup("c", ".jpg"), cache.path_for("c", ".jpg"))
+        self.assertEqual(sorted(path.name for path in cache.root.iterdir()), ["b.jpg", "c.jpg"])
+
+    def test_preview_resolution_caps_large_sizes(self) -> None:
+        self.assertEqual(preview_resolution("1080p"), PREVIEW_RESOLUTION)
+        self.assertEqual(preview_resolution("4k"), PREVIEW_RESOLUTION)
+        self.assertEqual(preview_resolution("2560x1440"), PREVIEW_RESOLUTION)
+        self.assertEqual(preview_resolution("480p"), "480p")
+        self.assertEqual(preview_resolution("640x360"), "640x360")
+
+
+class DraftPreviewTests(unittest.TestCase):
+    def test_draft_config_drops_grain_and_scales_blur(self) -> None:
+        config = {"resolution": "720p", "blur": 40, "background": {"grain": 0.5, "effects": {"shadow": {"blur": 20}}}}
+        draft = draft_render_config(config, "single_1")
+        self.assertTrue(draft["draft"])
+        self.assertEqual(draft["resolution"], DRAFT_RESOLUTION)
+        self.assertEqual(draft["blur"], 20)
+        self.assertEqual(draft["background"], {"grain": 0, "effects": {"shadow": {"blur": 10}}})
+        self.assertEqual(config["blur"], 40)
+        layout = draft_render_config({"resolution": "720p", "blur": 40, "custom_static_layout": {"layers": [{"blur": 8, "grain": 0.3}]}}, "custom_static")
+        self.assertEqual(layout["blur"], 40)
+        self.assertEqual(layout["custom_static_layout"]["layers"], [{"blur": 8, "grain": 0}])
+        animated = draft_render_config({"animation_resolution": "320x180", "blur": 40}, "animated_1")
+        self.assertNotIn("resolution", animated)
+        self.assertEqual(animated["blur"], 40)
+
+    def test_newer_request_cancels_the_previous_one(self) -> None:
+        sessions = PreviewSessions()
+        first = sessions.begin("editor")
+        other = sessions.begin("other")
+        second = sessions.begin("editor")
+        self.assertTrue(first.is_set())
+        self.assertFalse(other.is_set())
+        # A stale finish must not unregister the request that replaced it.
+        sessions.finish("editor", first)
+        sessions.begin("editor")
+        self.assertTrue(second.is_set())
+
+    def test_renderer_stops_when_cancelled_and_drafts_one_frame(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            source = root / "01.jpg"
+            Image.new("RGB", (64, 36), (200, 40, 40)).save(source)
+            renderer = CoverRenderer(root / "fonts")
+            config = {"animation_resolution": "64x36", "animation_fps": 2, "animation_duration": 1}
+            cancel = threading.Event()
+            cancel.set()
+            token = RENDER_CANCEL.set(cancel)
+            try:
+                with self.assertRaises(RenderCancelled):
+                    renderer.render([source], "T", "", "animated_1", config, root / "out.png")
+            finally:
+                RENDER_CANCEL.reset(token)
+            output = renderer.render([source], "T", "", "animated_1", {**config, "draft": True}, root / "draft.png")
+            with Image.open(output) as image:
+                self.assertEqual(getattr(image, "n_frames", 1), 1)
+
+
+class PreviewEndpointTests(unittest.TestCase):
+    def test_repeated_preview_is_served_from_cache(self) -> None:
+        client = TestClient(app)
+        config = {"mock_enabled": True, "local_mode": False, "style_config": {"style": "single_1", "resolution": "1080p"}}
+        with mock.patch("app.main.is_auth_configured", return_value=True), mock.patch("app.main.authenticated_username", return_value="admin"), \
+                mock.patch("app.main.load_config", return_value=config), mock.patch("app.main.first_library_name", new=mock.AsyncMock(return_value="电影")):
+            first = client.post("/api/plugin/MediaCoverGenerator/preview", json={"style": "single_1"}).json()
+            second = client.post("/api/plugin/MediaCoverGenerator/preview", json={"style": "single_1"}).json()
+        self.assertEqual(first["code"], 0, first)
+        self.assertEqual(second["data"]["cache"], "hit")
+        self.assertEqual(first["data"]["src"], second["data"]["src"])
+        self.assertTrue(second["data"]["src"].startswith("/data/tmp/preview_renders/"))
+        self.assertEqual(second["data"]["quality"], "full")
+
+    def test_draft_preview_is_a_separate_smaller_render(self) -> None:
+        client = TestClient(app)
+        config = {"mock_enabled": True, "local_mode": False, "style_config": {"style": "single_1", "resolution": "1080p"}}
+        with mock.patch("app.main.is_auth_configured", return_value=True), mock.patch("app.main.authenticated_username", return_value="admin"), \
+                mock.patch("app.main.load_config", return_value=config), mock.patch("app.main.first_library_name", new=mock.AsyncMock(return_value="电影")):
+            draft = client.post("/api/plugin/MediaCoverGenerator/preview", json={"style": "single_1", "quality": "draft", "session": "t"}).json()
+            full = client.post("/api/plugin/MediaCoverGenerator/preview", json={"style": "single_1", "session": "t"}).json()
+            draft_file = client.get(draft["data"]["src"])
+        self.assertEqual(draft["data"]["quality"], "draft")
+        self.assertNotEqual(draft["data"]["src"], full["data"]["src"])
+        with Image.open(io.BytesIO(draft_file.content)) as image:
+            self.assertEqual(image.size, (640, 360))
+
+
+if __name__ == "__main__":
+    unittest.main()
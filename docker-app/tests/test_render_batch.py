@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import base64
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app import config as config_module
+from app import services
+from app.config import config_snapshot
+from app.cover.presets import create_preset_layout
+from app.main import app
+
+
+def encoded_source(color: str) -> str:
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 960), color).save(buffer, format="JPEG")
+    return base64.b64encode(buffer.getvalue()).decode("ascii")
+
+
+class RenderBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        root = Path(temp.name)
+        for patcher in (
+            mock.patch.object(config_module, "DATA_DIR", root),
+            mock.patch.object(config_module, "CONFIG_PATH", root / "config.yaml"),
+            mock.patch.object(services, "DATA_DIR", root),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        config_module.invalidate_config_cache()
+        self.addCleanup(config_module.invalidate_config_cache)
+        self.client = TestClient(app)
+        self.headers = {"Authorization": f"Bearer {config_snapshot()['api_token']}"}
+
+    def test_batch_renders_each_job_with_requested_style_values(self) -> None:
+        response = self.client.post(
+            "/api/v1/render/batch",
+            headers=self.headers,
+            json={"jobs": [
+                {
+                    "style": "static_1",
+                    "title": "动画电影",
+                    "subtitle": "Anime Films",
+                    "config": {"resolution": "720p", "output_format": "png"},
+                    "layout": create_preset_layout("static_1"),
+                    "images": [encoded_source("#4f8cff")],
+                },
+                {"style": "static_1", "title": "空", "images": []},
+            ]},
+        )
+        self.assertEqual(response.status_code, 200)
+        first, second = response.json()["data"]["results"]
+        self.assertTrue(first["ok"])
+        self.assertEqual((first["style"], first["format"]), ("single_1", "png"))
+        with Image.open(io.BytesIO(base64.b64decode(first["data"]))) as image:
+            self.assertEqual(image.size, (1280, 720))
+        self.assertFalse(second["ok"])
+        self.assertTrue(second["error"])
+
+    def test_batch_requires_the_api_token(self) -> None:
+        response = self.client.post(
+            "/api/v1/render/batch",
+            headers={"Authorization": "Bearer wrong"},
+            json={"jobs": []},
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import unittest
+
+from app.cover.benchmark import BenchmarkCase, build_cases, compare_to_baseline, run_benchmark
+
+
+class RenderBenchmarkTests(unittest.TestCase):
+    def test_case_matrix_covers_styles_resolutions_frames_and_formats(self) -> None:
+        cases = build_cases()
+        ids = {case.case_id for case in cases}
+        self.assertIn("multi_1/4k/png", ids)
+        self.assertIn("animated_3/640x360/96f/gif", ids)
+        self.assertEqual(len(cases), 4 * 3 * 2 + 4 * 2 * 2 * 2)
+        self.assertEqual(len(build_cases(quick=True)), 8)
+        self.assertEqual([case.case_id for case in build_cases(["animated_2"], ["320x180"], ["gif"], [24])], ["animated_2/320x180/24f/gif"])
+
+    def test_regressions_beyond_tolerance_are_flagged(self) -> None:
+        baseline = {"cases": {"a": {"wall_seconds": 1.0, "peak_rss_mb": 100.0}, "b": {"wall_seconds": 2.0, "peak_rss_mb": 100.0}}}
+        current = {"cases": {
+            "a": {"wall_seconds": 1.2, "peak_rss_mb": 140.0},
+            "b": {"error": "ValueError: boom"},
+            "c": {"wall_seconds": 9.0, "peak_rss_mb": 900.0},
+        }}
+        regressions = compare_to_baseline(current, baseline, 0.25)
+        self.assertEqual([(item["case"], item["metric"]) for item in regressions], [("a", "peak_rss_mb"), ("b", "error")])
+
+    def test_case_runs_in_a_child_process_and_records_metrics(self) -> None:
+        report = run_benchmark([BenchmarkCase("single_1", "360p", "jpg")])
+        result = report["cases"]["single_1/360p/jpg"]
+        self.assertNotIn("error", result)
+        self.assertGreater(result["wall_seconds"], 0)
+        self.assertGreater(result["peak_rss_mb"], 0)
+        self.assertGreater(result["output_bytes"], 0)
+
+    def test_animated_case_renders(self) -> None:
+        report = run_benchmark([BenchmarkCase("animated_3", "320x180", "gif", 12)])
+        result = report["cases"]["animated_3/320x180/12f/gif"]
+        self.assertNotIn("error", result)
+        self.assertGreater(result["output_bytes"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app import main, run_logs
+from app.main import app
+from app.run_logs import RunLog, read_log_range
+
+
+def write_log(path: Path, count: int) -> None:
+    lines = []
+    for index in range(count):
+        level = "ERROR" if index % 10 == 0 else "INFO"
+        lines.append(f"2026-01-01 10:00:{index % 60:02d},123 {level} message {index}\n")
+        if level == "ERROR":
+            lines.append("Traceback (most recent call last):\n  ValueError: broken\n")
+    path.write_text("".join(lines) + "2026-01-01 10:01:00,000 INFO partial", encoding="utf-8")
+
+
+class ReadLogRangeTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "run.log"
+        write_log(self.path, 100)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_pages_forward_by_byte_cursor(self) -> None:
+        pages = []
+        cursor = 0
+        while True:
+            page = read_log_range(self.path, cursor, limit=300)
+            pages.append(page["content"])
+            self.assertLessEqual(len(page["content"].encode()), 300)
+            cursor = page["next_offset"]
+            if page["eof"]:
+                break
+        text = "".join(pages)
+        self.assertEqual(text, self.path.read_text(encoding="utf-8").rsplit("\n", 1)[0] + "\n")
+        self.assertNotIn("partial", text)
+        self.assertLess(cursor, page["size"])
+
+    def test_tail_starts_on_a_record_boundary(self) -> None:
+        page = read_log_range(self.path, None, limit=200)
+        self.assertTrue(page["content"].startswith("2026-01-01"))
+        self.assertTrue(page["content"].endswith("message 99\n"))
+        self.assertTrue(page["eof"])
+
+    def test_level_filter_keeps_tracebacks_with_their_record(self) -> None:
+        page = read_log_range(self.path, 0, level="error")
+        records = page["content"].split("2026-01-01")[1:]
+        self.assertEqual(len(records), 10)
+        self.assertTrue(all("ERROR" in record and "ValueError: broken" in record for record in records))
+        self.assertTrue(page["eof"])
+
+    def test_filtered_scan_is_bounded_and_resumable(self) -> None:
+        found = []
+        cursor, calls = 0, 0
+        while True:
+            page = read_log_range(self.path, cursor, keyword="MESSAGE 9", scan_limit=512)
+            calls += 1
+            found.append(page["content"])
+            cursor = page["next_offset"]
+            if page["eof"]:
+                break
+        self.assertGreater(calls, 5)
+        self.assertEqual("".join(found).count("message 9"), 11)
+
+    def test_offset_past_end_restarts(self) -> None:
+        page = read_log_range(self.path, 10**9, limit=100)
+        self.assertTrue(page["reset"])
+        self.assertEqual(page["offset"], 0)
+
+
+class LogEndpointTests(unittest.TestCase):
+    def setUp(self) -> None:
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.root = Path(temp.name)
+        for patcher in (mock.patch.object(run_logs, "DATA_DIR", self.root), mock.patch.object(main, "DATA_DIR", self.root)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_tail_streams_a_finished_run_and_ends(self) -> None:
+        run_log = RunLog("tailtest")
+        run_log.info("tail line one")
+        run_log.warning("tail line two")
+        run_log.close()
+        name = str(run_log.path.relative_to(self.root / "logs"))
+        client = TestClient(app)
+        with mock.patch("app.main.is_auth_configured", return_value=True), mock.patch("app.main.authenticated_username", return_value="admin"):
+            response = client.get(f"/api/logs/tail/{name}", params={"offset": 0})
+            filtered = client.get(f"/api/logs/content/{name}", params={"offset": 0, "level": "warning"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("event: log\n", response.text)
+        self.assertIn("tail line one", response.text)
+        self.assertTrue(response.text.rstrip().split("\n\n")[-1].startswith("id: "))
+        self.assertIn("event: end\n", response.text)
+        self.assertNotIn("tail line one", filtered.json()["content"])
+        self.assertIn("tail line two", filtered.json()["content"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import gzip
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import static_files
+from app.main import app
+from app.static_files import IMMUTABLE_CACHE, REVALIDATE_CACHE, CachedStaticFiles, hashed_asset_cache, precompress
+
+
+class CachedStaticFilesTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "index-CIJJQOLy.js").write_text("console.log('yahaha');\n" * 200, encoding="utf-8")
+        (self.root / "logo.svg").write_text("<svg/>", encoding="utf-8")
+        self.assertEqual(precompress(self.root), 2)
+        site = FastAPI()
+        site.mount("/assets", CachedStaticFiles(directory=self.root, cache_control=hashed_asset_cache), name="assets")
+        self.client = TestClient(site)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_serves_precompressed_variant_for_accepted_encoding(self) -> None:
+        brotli_response = self.client.get("/assets/index-CIJJQOLy.js", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(brotli_response.headers["content-encoding"], "br")
+        self.assertEqual(brotli_response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(brotli_response.headers["cache-control"], IMMUTABLE_CACHE)
+        self.assertTrue(brotli_response.headers["content-type"].startswith("text/javascript"))
+        self.assertIn("yahaha", brotli_response.text)
+        gzip_response = self.client.get("/assets/index-CIJJQOLy.js", headers={"Accept-Encoding": "gzip, br;q=0"})
+        self.assertEqual(gzip_response.headers["content-encoding"], "gzip")
+        self.assertNotEqual(gzip_response.headers["etag"], brotli_response.headers["etag"])
+        plain = self.client.get("/assets/index-CIJJQOLy.js", headers={"Accept-Encoding": "identity"})
+        self.assertNotIn("content-encoding", plain.headers)
+        self.assertEqual(gzip.decompress((self.root / "index-CIJJQOLy.js.gz").read_bytes()).decode(), plain.text)
+
+    def test_conditional_get_returns_not_modified(self) -> None:
+        first = self.client.get("/assets/logo.svg")
+        self.assertEqual(first.headers["cache-control"], "no-cache")
+        again = self.client.get("/assets/logo.svg", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(again.status_code, 304)
+        (self.root / "logo.svg").write_text("<svg></svg>", encoding="utf-8")
+        changed = self.client.get("/assets/logo.svg", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(changed.status_code, 200)
+
+    def test_etag_is_hashed_off_the_event_loop(self) -> None:
+        hashing_threads = []
+        response_threads = []
+        real_etag = static_files.strong_etag
+        real_response = CachedStaticFiles.file_response
+
+        def record_etag(path, stat_result):
+            hashing_threads.append(threading.get_ident())
+            return real_etag(path, stat_result)
+
+        def record_response(instance, *args, **kwargs):
+            response_threads.append(threading.get_ident())
+            return real_response(instance, *args, **kwargs)
+
+        (self.root / "large.bin").write_bytes(b"x" * 4096)
+        with mock.patch("app.static_files.strong_etag", side_effect=record_etag), mock.patch.object(CachedStaticFiles, "file_response", record_response):
+            response = self.client.get("/assets/large.bin")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["etag"])
+        # The first call (the one that hashes) runs in the lookup worker thread.
+        self.assertNotEqual(hashing_threads[0], response_threads[0])
+
+    def test_only_vite_assets_are_cached_as_immutable(self) -> None:
+        mounts = {getattr(route, "name", ""): route.app for route in app.routes}
+        self.assertEqual(mounts["static"].cache_control("/app/static/fonts/NotoSans-SemiBold.ttf"), REVALIDATE_CACHE)
+        self.assertEqual(mounts["static"].cache_control("/app/static/assets/index-CIJJQOLy.css"), REVALIDATE_CACHE)
+        self.assertEqual(hashed_asset_cache("/app/static/assets/index-CIJJQOLy.css"), IMMUTABLE_CACHE)
+
+    def test_data_images_revalidate_privately(self) -> None:
+        (self.root / "cover.jpg").write_bytes(b"jpeg-bytes")
+        client = TestClient(app)
+        data_mount = next(route.app for route in app.routes if getattr(route, "name", "") == "data")
+        with mock.patch.object(data_mount, "all_directories", [str(self.root)]), mock.patch("app.main.is_auth_configured", return_value=True), mock.patch("app.main.authenticated_username", return_value="admin"):
+            first = client.get("/data/cover.jpg")
+            again = client.get("/data/cover.jpg", headers={"If-None-Match": first.headers["etag"]})
+        self.assertEqual(first.headers["cache-control"], "private, no-cache")
+        self.assertNotIn("content-encoding", first.headers)
+        self.assertEqual(again.status_code, 304)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import tempfile
 import unittest
+from unittest import mock
 import asyncio
 from pathlib import Path
 
@@ -79,6 +80,15 @@ class TitleConfigTests(unittest.TestCase):
         self.assertEqual(texts, {"slogan": "自定义文本", "any_key": "任意文本"})
         self.assertEqual(library_title_background(config, "动画电影", "emby"), "#5f7185")
 
+    def test_compiled_index_matches_compacted_names_and_follows_config_edits(self) -> None:
+        normalized, _ = normalize_title_config({"Anime Films!": {"title": "动画", "background": "#123456"}})
+        config = {"title_config": normalized}
+        self.assertEqual(library_title_payload(config, "anime films")[0], "动画")
+        self.assertEqual(library_title_background(config, "ANIME-FILMS"), "#123456")
+        config["title_config"]["Anime Films!"]["title"] = "动漫"
+        self.assertEqual(library_title_payload(config, "anime films")[0], "动漫")
+        self.assertEqual(library_title_payload(config, "电影")[0], "电影")
+
 
 class RendererLayoutTests(unittest.TestCase):
     def test_all_static_presets_use_complete_canvas_schema(self) -> None:
@@ -239,6 +249,23 @@ class PreviewFontTests(unittest.TestCase):
             self.assertEqual(info["font_family"], f"YahahaPreview_{asset['font_id']}_{asset['source_sha256']}")
             self.assertEqual(info["source_type"], "original")
 
+    def test_font_digest_is_reused_until_the_source_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as raw_dir:
+            root = Path(raw_dir)
+            source = root / "custom.ttf"
+            source.write_bytes(b"first-version")
+            service = PreviewFontService(root)
+            first = next(iter(service.assets([source]).values()))
+            original = service.originals_root / first["font_id"] / "original.ttf"
+            self.assertTrue(original.is_file())
+            with mock.patch("app.font_preview._sha256_file", side_effect=AssertionError("re-hashed")):
+                self.assertEqual(next(iter(PreviewFontService(root).assets([source]).values()))["source_sha256"], first["source_sha256"])
+            replacement = root / "replacement.ttf"
+            replacement.write_bytes(b"second-version!")
+            replacement.replace(source)
+            second = next(iter(PreviewFontService(root).assets([source]).values()))
+            self.assertNotEqual(second["source_sha256"], first["source_sha256"])
+
 
 if __name__ == "__main__":
     unittest.main()
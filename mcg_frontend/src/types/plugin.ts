@@ -16,6 +16,11 @@ export interface YahahaCoverStudioConfig {
   covers_output: string
   save_recent_covers: boolean
   history_retention_batches?: number
+  render_worker_enabled?: boolean
+  render_worker_max_jobs?: number
+  render_worker_rss_mb?: number
+  remote_render_url?: string
+  remote_render_token?: string
   covers_history_limit_per_library: number
   covers_page_history_limit: number
   title_config: string
@@ -361,6 +366,8 @@ export interface BackendPreviewPayload {
   server: string
   library: string
   style: string
+  quality?: 'draft' | 'full'
+  cache?: 'hit' | 'miss'
 }
 
 export interface SimulationParams {
@@ -23,7 +23,7 @@ import pytz
 import yaml
 
 from fastapi import Body, Request
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
@@ -40,19 +40,23 @@ from app.schemas.types import EventType
 from app.schemas import ServiceInfo
 from app.utils.http import RequestUtils
 from app.utils.url import UrlUtils
-from app.plugins.yahahacoverstudio.style.style_static_template import (
-    create_style_static_1,
-    create_style_static_2,
-    create_style_static_3,
-    create_style_static_4,
-)
-from app.plugins.yahahacoverstudio.style.style_static_custom import create_style_static_custom, measure_text_layer
-from app.plugins.yahahacoverstudio.style.style_animated_1 import create_style_animated_1
-from app.plugins.yahahacoverstudio.style.style_animated_2 import create_style_animated_2
-from app.plugins.yahahacoverstudio.style.style_animated_3 import create_style_animated_3
-from app.plugins.yahahacoverstudio.style.style_animated_4 import create_style_animated_4
+from app.plugins.yahahacoverstudio.style.registry import release_style_engines, render_style, style_function
 from app.plugins.yahahacoverstudio.utils.image_manager import ResolutionConfig, ImageResourceManager
-from app.plugins.yahahacoverstudio.history_store import HistoryStore
+from app.plugins.yahahacoverstudio.history_store import HistoryStore, ThumbnailWorker
+from app.plugins.yahahacoverstudio.utils.render_worker import RenderWorker, RenderWorkerError, RenderWorkerUnavailable
+from app.plugins.yahahacoverstudio.utils.remote_render import RemoteRenderClient, RemoteRenderUnavailable
+from app.plugins.yahahacoverstudio.utils import metrics
+from app.plugins.yahahacoverstudio.utils.backend_planner import BACKEND_PLANNER
+from app.plugins.yahahacoverstudio.utils.scaled_images import SCALED_IMAGES
+from app.plugins.yahahacoverstudio.utils.preview_cache import (
+    DRAFT_RESOLUTION,
+    PREVIEW_MAX_RESOLUTION,
+    PreviewCache,
+    PreviewOverride,
+    PreviewSessions,
+    draft_render_kwargs,
+    preview_key,
+)
 from app.plugins.yahahacoverstudio.font_preview import PreviewFontService
 from app.plugins.yahahacoverstudio.font_resolution import ResolvedRenderText, resolve_render_text_and_font
 from app.plugins.yahahacoverstudio.title_config import normalize_title_config
@@ -68,9 +72,8 @@ except Exception as import_err:
             try:
                 if not font_path.exists() or font_path.stat().st_size == 0:
                     return False
-                from PIL import ImageFont
-                ImageFont.truetype(str(font_path), 12)
-                return True
+                from app.plugins.yahahacoverstudio.utils.font_cache import is_valid_font_file
+                return is_valid_font_file(font_path)
             except Exception as err:
                 logger.warning(f"字体文件验证失败: {font_path}, 错误: {err}")
                 return False
@@ -107,8 +110,7 @@ except Exception as import_err:
                 if attempt < self.max_retries - 1:
                     time.sleep(2 ** attempt)
             return False
-from app.plugins.yahahacoverstudio.utils.performance_helper import PerformanceMonitor, ProgressTracker, memory_efficient_operation
-from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.performance_helper import memory_efficient_operation
 
 
 class CoverUpdateOutcome(str, Enum):
@@ -163,6 +165,13 @@ class YahahaCoverStudio(_PluginBase):
     _current_updating_items = set()
     _generation_thread = None
     _history_batch = None
+    _thumbnail_worker = None
+    _render_worker = None
+    _preview_cache = PreviewCache()
+    _preview_render_state = threading.local()
+    _preview_sessions = PreviewSessions()
+    _cover_history_index: Optional[Dict[Tuple[str, str], List[Dict[str, Any]]]] = None
+    _cover_history_lock = threading.Lock()
     _generation_run_lock = threading.Lock()
     _generation_state_lock = threading.Lock()
     _is_generating = False
@@ -183,7 +192,8 @@ class YahahaCoverStudio(_PluginBase):
     _title_config_strict = False
     _distinguish_same_name_libraries = False
     _current_config = {}
-    _cover_style = 'static_1'
+    _title_config_index: Optional[Dict[str, Any]] = None
+    _cover_style = PreviewOverride(_preview_render_state, 'static_1')
     _cover_style_base = 'static_1'
     _cover_style_variant = 'static'
     _font_path = ''
@@ -211,7 +221,7 @@ class YahahaCoverStudio(_PluginBase):
     _custom_height = 1080
     _image_count_mode = 'auto'
     _image_count = 9
-    _resolution_config = None
+    _resolution_config = PreviewOverride(_preview_render_state)
     _animation_duration = 8
     _animation_scroll = 'alternate'
     _animation_fps = 24
@@ -232,9 +242,14 @@ class YahahaCoverStudio(_PluginBase):
     _covers_history_limit_per_library = 10
     _covers_page_history_limit = 50
     _history_retention_batches = 30
+    _render_worker_enabled = False
+    _render_worker_max_jobs = 50
+    _render_worker_rss_mb = 1024
+    _remote_render_url = ""
+    _remote_render_token = ""
     _page_tab = "generate-tab"
-    _custom_static_layout = None
-    _custom_static_layouts: List[Dict[str, Any]] = []
+    _custom_static_layout = PreviewOverride(_preview_render_state)
+    _custom_static_layouts: List[Dict[str, Any]] = PreviewOverride(_preview_render_state, [])
     _custom_static_active_id: Optional[str] = None
     _preview_font_enabled = True
     _font_subset_enabled = True
@@ -269,7 +284,12 @@ class YahahaCoverStudio(_PluginBase):
         self._covers_path = data_path / 'input'
         self._font_path = data_path / 'fonts'
         self._preview_font_service = PreviewFontService(data_path, logger)
+        BACKEND_PLANNER.configure(data_path / "render_backend_stats.json")
+        SCALED_IMAGES.configure(data_path / "scaled_images")
         self._preview_font_paths = {}
+        self._cover_history_index = None
+        if self._thumbnail_worker is None:
+            self._thumbnail_worker = ThumbnailWorker()
         custom_static_state_loaded = False
         self._animated_settings = {}
         if config:
@@ -416,6 +436,11 @@ class YahahaCoverStudio(_PluginBase):
                 int,
             )
             self._history_retention_batches = self.__clamp_value(config.get("history_retention_batches", 30), 1, 1000, 30, "history_retention_batches[init]", int)
+            self._render_worker_enabled = bool(config.get("render_worker_enabled", False))
+            self._render_worker_max_jobs = self.__clamp_value(config.get("render_worker_max_jobs", 50), 1, 1000, 50, "render_worker_max_jobs[init]", int)
+            self._render_worker_rss_mb = self.__clamp_value(config.get("render_worker_rss_mb", 1024), 128, 16384, 1024, "render_worker_rss_mb[init]", int)
+            self._remote_render_url = str(config.get("remote_render_url", "") or "").strip()
+            self._remote_render_token = str(config.get("remote_render_token", "") or "").strip()
             self._page_tab = config.get("page_tab", "generate-tab")
 
             raw_layout = config.get("custom_static_layout")
@@ -532,6 +557,7 @@ class YahahaCoverStudio(_PluginBase):
 
         # 停止现有任务
         self.stop_service()
+        self.__sync_render_worker()
 
         cleanup_triggered = False
         if self._clean_images:
@@ -876,7 +902,7 @@ class YahahaCoverStudio(_PluginBase):
 
     def __run_background_generation(self, target_style: Optional[str] = None):
         old_style = self._cover_style
-        history_store = HistoryStore(self.get_data_path()) if self._save_recent_covers else None
+        history_store = HistoryStore(self.get_data_path(), thumbnailer=self._thumbnail_worker) if self._save_recent_covers else None
         self._history_batch = history_store.create("manual", "remote") if history_store else None
         try:
             if target_style:
@@ -1322,6 +1348,11 @@ class YahahaCoverStudio(_PluginBase):
             "covers_history_limit_per_library": self._covers_history_limit_per_library,
             "covers_page_history_limit": self._covers_page_history_limit,
             "history_retention_batches": self._history_retention_batches,
+            "render_worker_enabled": self._render_worker_enabled,
+            "render_worker_max_jobs": self._render_worker_max_jobs,
+            "render_worker_rss_mb": self._render_worker_rss_mb,
+            "remote_render_url": self._remote_render_url,
+            "remote_render_token": self._remote_render_token,
             "custom_static_layout": json.dumps(self._custom_static_layout, ensure_ascii=False)
             if self._custom_static_layout is not None
             else "",
@@ -2005,7 +2036,7 @@ class YahahaCoverStudio(_PluginBase):
                 font_path = self.__resolve_template_font_path(font_family, text_value)
             if not text_value or not font_path:
                 continue
-            measured = measure_text_layer(
+            measured = style_function("measure_text_layer")(
                 layer=layer,
                 text=text_value,
                 font_path=font_path,
@@ -2657,6 +2688,12 @@ class YahahaCoverStudio(_PluginBase):
                 int,
             )
             self._history_retention_batches = self.__clamp_value(raw.get("history_retention_batches", self._history_retention_batches), 1, 1000, 30, "history_retention_batches[save]", int)
+            self._render_worker_enabled = as_bool(raw.get("render_worker_enabled"), bool(self._render_worker_enabled))
+            self._render_worker_max_jobs = self.__clamp_value(raw.get("render_worker_max_jobs", self._render_worker_max_jobs), 1, 1000, 50, "render_worker_max_jobs[save]", int)
+            self._render_worker_rss_mb = self.__clamp_value(raw.get("render_worker_rss_mb", self._render_worker_rss_mb), 128, 16384, 1024, "render_worker_rss_mb[save]", int)
+            self._remote_render_url = str(raw.get("remote_render_url") or "").strip()
+            self._remote_render_token = str(raw.get("remote_render_token") or "").strip()
+            self.__sync_render_worker()
             self.__update_config()
             logger.info("【YahahaCoverStudio】Vue 设置页配置已保存")
             return {"code": 0, "msg": "配置已保存", "data": {"config": raw}}
@@ -2980,7 +3017,9 @@ class YahahaCoverStudio(_PluginBase):
 
         cover_history = payload.get("cover_history")
         if isinstance(cover_history, list):
-            self.save_data("cover_history", cover_history)
+            with self._cover_history_lock:
+                self.save_data("cover_history", cover_history)
+                self._cover_history_index = None
 
         self._update_now = False
         self.__update_config()
@@ -3267,6 +3306,15 @@ class YahahaCoverStudio(_PluginBase):
             logger.error(f"【YahahaCoverStudio】保存自定义静态布局失败: {e}", exc_info=True)
             return {"code": 1, "msg": f"保存失败: {e}"}
 
+    def api_metrics(self):
+        """以 Prometheus 文本格式返回插件运行指标"""
+        with self._generation_state_lock:
+            running = bool(self._is_generating)
+            current, total = self._generation_current, self._generation_total
+        metrics.GENERATION_QUEUE_DEPTH.set(max(0, total - current) if running else 0, state="pending")
+        metrics.GENERATION_QUEUE_DEPTH.set(1 if running and current > 0 else 0, state="running")
+        return PlainTextResponse(metrics.render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
     def api_measure_custom_static_layout(
         self,
         data: Optional[dict] = None,
@@ -3664,6 +3712,13 @@ class YahahaCoverStudio(_PluginBase):
         }]
         """
         return [
+            {
+                "path": "/metrics",
+                "endpoint": self.api_metrics,
+                "auth": "apikey",
+                "methods": ["GET"],
+                "summary": "Prometheus 运行指标",
+            },
             {
                 "path": "/set_custom_static_layout",
                 "endpoint": self.api_set_custom_static_layout,
@@ -4466,6 +4521,8 @@ class YahahaCoverStudio(_PluginBase):
                 return {"code": 1, "msg": "未找到可用的媒体库用于预览，请检查媒体库设置"}
 
             for preview_target in preview_targets:
+                if cancel.is_set():
+                    return superseded
                 service = preview_target["service"]
                 library = preview_target["library"]
                 library_name = preview_target["library_name"]
@@ -5582,12 +5639,30 @@ class YahahaCoverStudio(_PluginBase):
         kwargs: Optional[Any] = None,
         layout: Optional[dict] = None,
     ):
-        """生成当前风格的预览封面，仅返回 base64 图片，不修改媒体库封面"""
-        old_style = self._cover_style
-        old_layout = self._custom_static_layout
-        old_templates = self._custom_static_layouts
+        """生成当前风格的预览封面，仅返回 base64 图片，不修改媒体库封面
+
+        quality 为 draft 时返回低分辨率草图；同一 session 的新请求会取代旧请求，被取代的请求返回 superseded。
+        预览使用的风格、布局与分辨率只写入当前线程的覆盖表，并发的预览与生成任务互不影响。
+        """
+        resolution_config = self._resolution_config
+        base_templates = self._custom_static_layouts
+        state = self._preview_render_state
+        payload = self.__extract_request_payload(data=data, kwargs=kwargs)
+        quality = "draft" if str(payload.get("quality") or "") == "draft" else "full"
+        session = str(payload.get("session") or "default")
+        cancel = self._preview_sessions.begin(session)
+        superseded = {"code": 1, "msg": "预览已被新的请求取代", "data": {"superseded": True}}
         try:
-            payload = self.__extract_request_payload(data=data, kwargs=kwargs)
+            state.overrides = {}
+            state.active = True
+            state.draft = quality == "draft"
+            state.cancel = cancel
+            state.blur_scale = 1.0
+            # 预览按屏幕尺寸渲染，草图再降到 360p
+            limit = DRAFT_RESOLUTION if state.draft else PREVIEW_MAX_RESOLUTION
+            if resolution_config is not None and (resolution_config.width > limit[0] or resolution_config.height > limit[1]):
+                self._resolution_config = ResolutionConfig(limit)
+                state.blur_scale = limit[0] / min(resolution_config.width, PREVIEW_MAX_RESOLUTION[0])
             target_style = (style or payload.get("style") or "").strip()
             layout_payload = layout if layout is not None else payload.get("layout")
             allowed_styles = {
@@ -5612,7 +5687,7 @@ class YahahaCoverStudio(_PluginBase):
                 normalized_layout = self.__normalize_custom_static_template(layout_payload)
                 self._custom_static_layouts = [
                     template
-                    for template in (old_templates or [])
+                    for template in (base_templates or [])
                     if not (
                         isinstance(template, dict)
                         and (
@@ -5667,6 +5742,8 @@ class YahahaCoverStudio(_PluginBase):
                     image_data = self.__generate_from_server(service, preview_target["library"], title)
 
                 if not image_data:
+                    if cancel.is_set():
+                        return superseded
                     logger.info(f"媒体库 {server}：{library_name} 无法生成预览，继续尝试下一个媒体库")
                     continue
 
@@ -5689,6 +5766,7 @@ class YahahaCoverStudio(_PluginBase):
                         "server": server,
                         "library": library_name,
                         "style": self._cover_style,
+                        "quality": quality,
                     },
                 }
 
@@ -5699,9 +5777,11 @@ class YahahaCoverStudio(_PluginBase):
             logger.error(f"【YahahaCoverStudio】预览生成异常: {e}", exc_info=True)
             return {"code": 1, "msg": f"预览生成失败: {e}"}
         finally:
-            self._cover_style = old_style
-            self._custom_static_layout = old_layout
-            self._custom_static_layouts = old_templates
+            state.active = False
+            state.draft = False
+            state.cancel = None
+            state.overrides = None
+            self._preview_sessions.finish(session, cancel)
 
     def api_clean_images(self):
         try:
@@ -7518,6 +7598,11 @@ class YahahaCoverStudio(_PluginBase):
             "covers_history_limit_per_library": 10,
             "covers_page_history_limit": 50,
             "history_retention_batches": 30,
+            "render_worker_enabled": False,
+            "render_worker_max_jobs": 50,
+            "render_worker_rss_mb": 1024,
+            "remote_render_url": "",
+            "remote_render_token": "",
             "page_tab": "generate-tab",
             "style_naming_v2": True,
         }
@@ -8588,9 +8673,66 @@ class YahahaCoverStudio(_PluginBase):
             return valid_paths[:required_items] if required_items > 1 else valid_paths[0]
         return valid_paths[0]
 
+    def __sync_render_worker(self):
+        """按配置创建、调整或关闭渲染子进程"""
+        if self._render_worker_enabled:
+            if self._render_worker is None:
+                self._render_worker = RenderWorker(self._render_worker_max_jobs, self._render_worker_rss_mb)
+            else:
+                self._render_worker.configure(self._render_worker_max_jobs, self._render_worker_rss_mb)
+        elif self._render_worker is not None:
+            self._render_worker.shutdown()
+            self._render_worker = None
+
+    def __render_style(self, style: str, *args, **kwargs):
+        """渲染指定风格；预览请求先按渲染参数的规范化哈希查询预览缓存"""
+        state = self._preview_render_state
+        if not getattr(state, "active", False):
+            return self.__dispatch_render(style, *args, **kwargs)
+        if getattr(state, "draft", False):
+            kwargs = draft_render_kwargs(style, kwargs, getattr(state, "blur_scale", 1.0))
+        key = preview_key(style, args, kwargs)
+        image_data = self._preview_cache.get(key)
+        if image_data:
+            logger.info(f"预览命中缓存: {style}")
+            return image_data
+        cancel = getattr(state, "cancel", None)
+        if cancel is not None and cancel.is_set():
+            logger.info(f"预览请求已被新的请求取代，跳过渲染: {style}")
+            return None
+        image_data = self.__dispatch_render(style, *args, **kwargs)
+        if isinstance(image_data, str):
+            self._preview_cache.put(key, image_data)
+        return image_data
+
+    def __dispatch_render(self, style: str, *args, **kwargs):
+        """依次尝试远程渲染服务、渲染子进程（均为可选），最后在当前进程中执行风格引擎"""
+        if self._remote_render_url and self._remote_render_token:
+            fonts = {
+                "main_title": self._main_title_font_preset,
+                "subtitle": self._subtitle_font_preset,
+                "custom_text": self._custom_text_font_preset,
+            }
+            try:
+                return RemoteRenderClient(self._remote_render_url, self._remote_render_token).render(style, args, kwargs, fonts)
+            except RemoteRenderUnavailable as err:
+                logger.warning(f"{err}，改为本地渲染")
+        worker = self._render_worker if self._render_worker_enabled else None
+        if worker is None:
+            return render_style(style, *args, **kwargs)
+        try:
+            return worker.render(style, args, kwargs)
+        except RenderWorkerUnavailable as err:
+            logger.warning(f"{err}，改为在当前进程中渲染")
+            return render_style(style, *args, **kwargs)
+        except RenderWorkerError as err:
+            logger.error(f"渲染子进程执行 {style} 失败: {err}")
+            return None
+
     @memory_efficient_operation
     def __generate_image_from_path(self, server, library_name, title, image_path=None, config_bg_color=None, source_root=None):
         logger.info(f"媒体库 {server}：{library_name} 正在生成封面图 ...")
+        render_started = time.perf_counter()
 
         if isinstance(image_path, (list, tuple)):
             image_paths = [str(path) for path in image_path if path]
@@ -8734,49 +8876,50 @@ class YahahaCoverStudio(_PluginBase):
             'config_color': config_bg_color
         }
         preset_image_input = image_paths if len(image_paths) > 1 else primary_image_path
+        image_data = None
 
         # 传递分辨率配置给图像生成函数
         if self._cover_style == 'static_1':
-            image_data = create_style_static_1(preset_image_input, title, static_template_font_paths or preset_font_path,
-                                                font_size=font_size,
-                                                font_offset=font_offset,
-                                                blur_size=blur_size,
-                                                color_ratio=color_ratio,
-                                                resolution_config=self._resolution_config,
-                                                bg_color_config=bg_color_config,
-                                                layout_config=static_preset_layout)
+            image_data = self.__render_style("static_1", preset_image_input, title, static_template_font_paths or preset_font_path,
+                                             font_size=font_size,
+                                             font_offset=font_offset,
+                                             blur_size=blur_size,
+                                             color_ratio=color_ratio,
+                                             resolution_config=self._resolution_config,
+                                             bg_color_config=bg_color_config,
+                                             layout_config=static_preset_layout)
         elif self._cover_style == 'static_2':
-            image_data = create_style_static_2(preset_image_input, title, static_template_font_paths or preset_font_path,
-                                                font_size=font_size,
-                                                font_offset=font_offset,
-                                                blur_size=blur_size,
-                                                color_ratio=color_ratio,
-                                                resolution_config=self._resolution_config,
-                                                bg_color_config=bg_color_config,
-                                                layout_config=static_preset_layout)
+            image_data = self.__render_style("static_2", preset_image_input, title, static_template_font_paths or preset_font_path,
+                                             font_size=font_size,
+                                             font_offset=font_offset,
+                                             blur_size=blur_size,
+                                             color_ratio=color_ratio,
+                                             resolution_config=self._resolution_config,
+                                             bg_color_config=bg_color_config,
+                                             layout_config=static_preset_layout)
         elif self._cover_style == 'static_4':
-            image_data = create_style_static_4(preset_image_input, title, static_template_font_paths or preset_font_path,
-                                                font_size=font_size,
-                                                font_offset=font_offset,
-                                                blur_size=blur_size,
-                                                color_ratio=color_ratio,
-                                                resolution_config=self._resolution_config,
-                                                bg_color_config=bg_color_config,
-                                                layout_config=static_preset_layout)
+            image_data = self.__render_style("static_4", preset_image_input, title, static_template_font_paths or preset_font_path,
+                                             font_size=font_size,
+                                             font_offset=font_offset,
+                                             blur_size=blur_size,
+                                             color_ratio=color_ratio,
+                                             resolution_config=self._resolution_config,
+                                             bg_color_config=bg_color_config,
+                                             layout_config=static_preset_layout)
         elif self._cover_style == 'static_3':
             if image_paths:
                 required_items = self.__get_required_items()
                 static_3_input = image_paths[:max(1, required_items)]
                 logger.info("static_3: 使用已准备素材直接渲染，数量 %s", len(static_3_input))
-                image_data = create_style_static_3(static_3_input, title, static_template_font_paths or preset_font_path,
-                                                    font_size=font_size,
-                                                    font_offset=font_offset,
-                                                    is_blur=self._multi_1_blur,
-                                                    blur_size=blur_size,
-                                                    color_ratio=color_ratio,
-                                                    resolution_config=self._resolution_config,
-                                                    bg_color_config=bg_color_config,
-                                                    layout_config=static_preset_layout)
+                image_data = self.__render_style("static_3", static_3_input, title, static_template_font_paths or preset_font_path,
+                                                 font_size=font_size,
+                                                 font_offset=font_offset,
+                                                 is_blur=self._multi_1_blur,
+                                                 blur_size=blur_size,
+                                                 color_ratio=color_ratio,
+                                                 resolution_config=self._resolution_config,
+                                                 bg_color_config=bg_color_config,
+                                                 layout_config=static_preset_layout)
             else:
                 # 使用安全的文件名
                 safe_library_name = self.__sanitize_filename(library_name)
@@ -8789,15 +8932,15 @@ class YahahaCoverStudio(_PluginBase):
                 logger.info(f"static_3: 准备图片目录 {library_dir}")
                 if self.prepare_library_images(library_dir, required_items=9):
                     logger.info("static_3: 图片目录准备完成，开始生成封面")
-                    image_data = create_style_static_3(library_dir, title, static_template_font_paths or preset_font_path,
-                                                        font_size=font_size,
-                                                        font_offset=font_offset,
-                                                        is_blur=self._multi_1_blur,
-                                                        blur_size=blur_size,
-                                                        color_ratio=color_ratio,
-                                                        resolution_config=self._resolution_config,
-                                                        bg_color_config=bg_color_config,
-                                                        layout_config=static_preset_layout)
+                    image_data = self.__render_style("static_3", library_dir, title, static_template_font_paths or preset_font_path,
+                                                     font_size=font_size,
+                                                     font_offset=font_offset,
+                                                     is_blur=self._multi_1_blur,
+                                                     blur_size=blur_size,
+                                                     color_ratio=color_ratio,
+                                                     resolution_config=self._resolution_config,
+                                                     bg_color_config=bg_color_config,
+                                                     layout_config=static_preset_layout)
                 else:
                     logger.warning(f"static_3: 图片目录准备失败 {library_dir}")
         elif self._cover_style == 'static_custom':
@@ -8810,7 +8953,8 @@ class YahahaCoverStudio(_PluginBase):
             if not image_slots and self.__get_custom_static_required_items() > 0:
                 logger.warning("static_custom: 未找到素材图片，将按布局背景与非素材图层继续生成")
 
-            image_data = create_style_static_custom(
+            image_data = self.__render_style(
+                "static_custom",
                 image_slots=image_slots,
                 title=title,
                 font_path=custom_template_font_paths or custom_font_path,
@@ -8837,21 +8981,21 @@ class YahahaCoverStudio(_PluginBase):
             logger.info(f"正在准备库图片目录: {library_dir}")
             if self.prepare_library_images(library_dir, required_items=9):
                 logger.info("库图片准备完成，开始调用 create_style_animated_3")
-                image_data = create_style_animated_3(library_dir, title, preset_font_path,
-                                                    font_size=font_size,
-                                                    font_offset=font_offset,
-                                                    is_blur=self._multi_1_blur,
-                                                    blur_size=blur_size,
-                                                    color_ratio=color_ratio,
-                                                    resolution_config=self._resolution_config,
-                                                    bg_color_config=bg_color_config,
-                                                    animation_duration=animated_runtime_settings["animation_duration"],
-                                                    animation_scroll=animated_runtime_settings["animation_scroll"],
-                                                    animation_fps=animated_runtime_settings["animation_fps"],
-                                                    animation_format=animated_runtime_settings["animation_format"],
-                                                    animation_resolution=anim_res,
-                                                    animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
-                                                    stop_event=self._event)
+                image_data = self.__render_style("animated_3", library_dir, title, preset_font_path,
+                                                 font_size=font_size,
+                                                 font_offset=font_offset,
+                                                 is_blur=self._multi_1_blur,
+                                                 blur_size=blur_size,
+                                                 color_ratio=color_ratio,
+                                                 resolution_config=self._resolution_config,
+                                                 bg_color_config=bg_color_config,
+                                                 animation_duration=animated_runtime_settings["animation_duration"],
+                                                 animation_scroll=animated_runtime_settings["animation_scroll"],
+                                                 animation_fps=animated_runtime_settings["animation_fps"],
+                                                 animation_format=animated_runtime_settings["animation_format"],
+                                                 animation_resolution=anim_res,
+                                                 animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
+                                                 stop_event=self._event)
         elif self._cover_style == 'animated_1':
             # 动态封面强制使用 320x180 分辨率以保证性能
             anim_res = '320x180'
@@ -8871,22 +9015,22 @@ class YahahaCoverStudio(_PluginBase):
             logger.info(f"正在准备库图片目录: {library_dir}")
             if self.prepare_library_images(library_dir, required_items=animated_2_image_count):
                 logger.info("库图片准备完成，开始调用 create_style_animated_1")
-                image_data = create_style_animated_1(library_dir, title, preset_font_path,
-                                                    font_size=font_size,
-                                                    font_offset=font_offset,
-                                                    is_blur=self._multi_1_blur,
-                                                    blur_size=blur_size,
-                                                    color_ratio=color_ratio,
-                                                    resolution_config=self._resolution_config,
-                                                    bg_color_config=bg_color_config,
-                                                    animation_duration=animated_runtime_settings["animation_duration"],
-                                                    animation_fps=animated_runtime_settings["animation_fps"],
-                                                    animation_format=animated_runtime_settings["animation_format"],
-                                                    animation_resolution=anim_res,
-                                                    animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
-                                                    image_count=animated_2_image_count,
-                                                    departure_type=animated_runtime_settings["animated_2_departure_type"],
-                                                    stop_event=self._event)
+                image_data = self.__render_style("animated_1", library_dir, title, preset_font_path,
+                                                 font_size=font_size,
+                                                 font_offset=font_offset,
+                                                 is_blur=self._multi_1_blur,
+                                                 blur_size=blur_size,
+                                                 color_ratio=color_ratio,
+                                                 resolution_config=self._resolution_config,
+                                                 bg_color_config=bg_color_config,
+                                                 animation_duration=animated_runtime_settings["animation_duration"],
+                                                 animation_fps=animated_runtime_settings["animation_fps"],
+                                                 animation_format=animated_runtime_settings["animation_format"],
+                                                 animation_resolution=anim_res,
+                                                 animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
+                                                 image_count=animated_2_image_count,
+                                                 departure_type=animated_runtime_settings["animated_2_departure_type"],
+                                                 stop_event=self._event)
         elif self._cover_style == 'animated_2':
             # 动态封面强制使用 320x180 分辨率以保证性能
             anim_res = '320x180'
@@ -8903,21 +9047,21 @@ class YahahaCoverStudio(_PluginBase):
             logger.info(f"正在准备库图片目录: {library_dir}")
             if self.prepare_library_images(library_dir, required_items=9):
                 logger.info("库图片准备完成，开始调用 create_style_animated_2")
-                image_data = create_style_animated_2(library_dir, title, preset_font_path,
-                                                    font_size=font_size,
-                                                    font_offset=font_offset,
-                                                    is_blur=self._multi_1_blur,
-                                                    blur_size=blur_size,
-                                                    color_ratio=color_ratio,
-                                                    resolution_config=self._resolution_config,
-                                                    bg_color_config=bg_color_config,
-                                                    animation_duration=animated_runtime_settings["animation_duration"],
-                                                    animation_fps=animated_runtime_settings["animation_fps"],
-                                                    animation_format=animated_runtime_settings["animation_format"],
-                                                    animation_resolution=anim_res,
-                                                    animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
-                                                    image_count=int(animated_runtime_settings["animated_2_image_count"]),
-                                                    stop_event=self._event)
+                image_data = self.__render_style("animated_2", library_dir, title, preset_font_path,
+                                                 font_size=font_size,
+                                                 font_offset=font_offset,
+                                                 is_blur=self._multi_1_blur,
+                                                 blur_size=blur_size,
+                                                 color_ratio=color_ratio,
+                                                 resolution_config=self._resolution_config,
+                                                 bg_color_config=bg_color_config,
+                                                 animation_duration=animated_runtime_settings["animation_duration"],
+                                                 animation_fps=animated_runtime_settings["animation_fps"],
+                                                 animation_format=animated_runtime_settings["animation_format"],
+                                                 animation_resolution=anim_res,
+                                                 animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
+                                                 image_count=int(animated_runtime_settings["animated_2_image_count"]),
+                                                 stop_event=self._event)
         elif self._cover_style == 'animated_4':
             anim_res = '320x180'
             logger.info(f"强制动图生成分辨率为: {anim_res}")
@@ -8935,21 +9079,25 @@ class YahahaCoverStudio(_PluginBase):
             logger.info(f"正在准备库图片目录: {library_dir}")
             if self.prepare_library_images(library_dir, required_items=animated_2_image_count):
                 logger.info("库图片准备完成，开始调用 create_style_animated_4")
-                image_data = create_style_animated_4(library_dir, title, preset_font_path,
-                                                    font_size=font_size,
-                                                    font_offset=font_offset,
-                                                    is_blur=self._multi_1_blur,
-                                                    blur_size=blur_size,
-                                                    color_ratio=color_ratio,
-                                                    resolution_config=self._resolution_config,
-                                                    bg_color_config=bg_color_config,
-                                                    animation_duration=animated_runtime_settings["animation_duration"],
-                                                    animation_fps=animated_runtime_settings["animation_fps"],
-                                                    animation_format=animated_runtime_settings["animation_format"],
-                                                    animation_resolution=anim_res,
-                                                    animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
-                                                    image_count=animated_2_image_count,
-                                                    stop_event=self._event)
+                image_data = self.__render_style("animated_4", library_dir, title, preset_font_path,
+                                                 font_size=font_size,
+                                                 font_offset=font_offset,
+                                                 is_blur=self._multi_1_blur,
+                                                 blur_size=blur_size,
+                                                 color_ratio=color_ratio,
+                                                 resolution_config=self._resolution_config,
+                                                 bg_color_config=bg_color_config,
+                                                 animation_duration=animated_runtime_settings["animation_duration"],
+                                                 animation_fps=animated_runtime_settings["animation_fps"],
+                                                 animation_format=animated_runtime_settings["animation_format"],
+                                                 animation_resolution=anim_res,
+                                                 animation_reduce_colors=animated_runtime_settings["animation_reduce_colors"],
+                                                 image_count=animated_2_image_count,
+                                                 stop_event=self._event)
+        if image_data:
+            metrics.GENERATION_STAGE_SECONDS.observe(time.perf_counter() - render_started, stage="render", style=self._cover_style, server=str(server))
+        elif image_data is not False:
+            metrics.FAILURES.inc(operation="render", server=str(server))
         return image_data
     
     def __generate_from_server(self, service, library, title):
@@ -9067,15 +9215,8 @@ class YahahaCoverStudio(_PluginBase):
         """
         返回指定媒体库最近一次用于生成封面的首张素材记录。
         """
-        history = self.get_data('cover_history') or []
-        library_id = str(library_id)
-        candidates = [
-            item for item in history
-            if item.get("server") == server and str(item.get("library_id")) == library_id
-        ]
-        if not candidates:
-            return None
-        return max(candidates, key=lambda item: float(item.get("timestamp") or 0))
+        ring = self.__load_cover_history_index().get((server, str(library_id))) or []
+        return ring[0] if ring else None
         
     def __handle_boxset_library(self, service, library, title):
 
@@ -9196,11 +9337,15 @@ class YahahaCoverStudio(_PluginBase):
                       f'&StartIndex={offset}&IncludeItemTypes={include_types}' \
                       f'&Recursive=True&SortOrder=Descending'
 
+                fetch_started = time.perf_counter()
                 res = service.instance.get_data(url=url)
+                metrics.GENERATION_STAGE_SECONDS.observe(time.perf_counter() - fetch_started, stage="fetch", style=self._cover_style, server=service.name)
                 if res:
                     data = res.json()
                     return data.get("Items", [])
+                metrics.FAILURES.inc(operation="fetch", server=service.name)
             except Exception as err:
+                metrics.FAILURES.inc(operation="fetch", server=service.name)
                 logger.error(f"获取媒体项失败：{str(err)}")
             return []
                 
@@ -9306,11 +9451,7 @@ class YahahaCoverStudio(_PluginBase):
         else:
             library_id = library.get("ItemId")
         # 更新id
-        self.update_cover_history(
-            server=service.name, 
-            library_id=library_id, 
-            item_id=updated_item_id
-        )
+        self.record_cover_history(service.name, library_id, [updated_item_id])
 
         return image_data
     
@@ -9389,12 +9530,7 @@ class YahahaCoverStudio(_PluginBase):
         else:
             library_id = library.get("ItemId")
         # 更新ids
-        for item_id in reversed(updated_item_ids):
-            self.update_cover_history(
-                server=service.name,
-                library_id=library_id,
-                item_id=item_id
-            )
+        self.record_cover_history(service.name, library_id, updated_item_ids)
 
         return image_data
     
@@ -9524,28 +9660,57 @@ class YahahaCoverStudio(_PluginBase):
             logger.warning(f"标题配置错误: {error}")
         return parsed
 
+    @staticmethod
+    def __compact_title_config_key(value: Any) -> str:
+        return re.sub(r"[^\w\u4e00-\u9fff]+", "", str(value or ""), flags=re.UNICODE).casefold()
+
+    def __compiled_title_config(self) -> Dict[str, Any]:
+        """
+        标题配置按版本编译一次：YAML 解析与键名压缩都不在渲染路径上重复执行。
+        """
+        version = f"{self.__title_config_version()}:{int(bool(self._title_config_strict))}"
+        compiled = self._title_config_index
+        if compiled and compiled.get("version") == version:
+            return compiled
+        title_config = self._current_config or (self.__load_title_config(self._title_config) if self._title_config else {})
+        if not isinstance(title_config, dict):
+            title_config = {}
+        by_library: Dict[str, Any] = {}
+        keys: List[Tuple[str, Any]] = []
+        for config_key, config_values in title_config.items():
+            compact_key = self.__compact_title_config_key(config_key)
+            by_library.setdefault(compact_key, config_values)
+            keys.append((compact_key, config_values))
+        compiled = {"version": version, "names": list(title_config.keys()), "by_library": by_library, "keys": keys, "scoped": {}}
+        self._title_config_index = compiled
+        return compiled
+
     def __find_title_config_values(self, library_name: Any, server_name: Any = "") -> Optional[Dict[str, Any]]:
         raw_library_name = str(library_name or "").strip()
-        title_config = self._current_config or (self.__load_title_config(self._title_config) if self._title_config else {})
-        if not raw_library_name or not isinstance(title_config, dict):
+        if not raw_library_name:
             return None
-
-        def compact(value: Any) -> str:
-            return re.sub(r"[^\w\u4e00-\u9fff]+", "", str(value or ""), flags=re.UNICODE).casefold()
+        compiled = self.__compiled_title_config()
+        library_key = self.__compact_title_config_key(raw_library_name)
 
         if self._distinguish_same_name_libraries and str(server_name or "").strip():
-            server_key = compact(server_name)
-            library_key = compact(raw_library_name)
-            for config_key, config_values in title_config.items():
-                candidate = compact(config_key)
-                if server_key and library_key and server_key in candidate and library_key in candidate:
-                    return config_values if isinstance(config_values, dict) else None
-
-        library_key = compact(raw_library_name)
-        for config_key, config_values in title_config.items():
-            if compact(config_key) == library_key:
+            server_key = self.__compact_title_config_key(server_name)
+            scoped_key = (server_key, library_key)
+            scoped = compiled["scoped"]
+            if scoped_key not in scoped:
+                scoped[scoped_key] = next(
+                    (
+                        (config_values,)
+                        for candidate, config_values in compiled["keys"]
+                        if server_key and library_key and server_key in candidate and library_key in candidate
+                    ),
+                    None,
+                )
+            if scoped[scoped_key] is not None:
+                config_values = scoped[scoped_key][0]
                 return config_values if isinstance(config_values, dict) else None
-        return None
+
+        config_values = compiled["by_library"].get(library_key)
+        return config_values if isinstance(config_values, dict) else None
 
     def __get_title_from_config(self, library_name, server_name: Any = ""):
         """
@@ -9556,15 +9721,10 @@ class YahahaCoverStudio(_PluginBase):
         zh_title = normalized_library_name
         en_title = ''
         bg_color = None
-        title_config = {}
-        if self._current_config:
-            title_config = self._current_config
-        elif self._title_config:
-            title_config = self.__load_title_config(self._title_config)
 
         # 添加调试信息
         logger.debug(f"查找媒体库名称: '{normalized_library_name}' (原始值: {library_name}, 类型: {type(library_name)})")
-        logger.debug(f"可用的配置键: {list(title_config.keys())}")
+        logger.debug(f"可用的配置键: {self.__compiled_title_config()['names']}")
 
         if not normalized_library_name:
             logger.debug("媒体库名称为空，使用空标题")
@@ -9583,12 +9743,6 @@ class YahahaCoverStudio(_PluginBase):
     def __get_custom_texts_from_config(self, library_name, server_name: Any = "") -> Dict[str, str]:
         raw_library_name = str(library_name or "")
         normalized_library_name = raw_library_name.strip()
-        title_config = {}
-        if self._current_config:
-            title_config = self._current_config
-        elif self._title_config:
-            title_config = self.__load_title_config(self._title_config)
-
         matched_values = self.__find_title_config_values(normalized_library_name, server_name)
         if not isinstance(matched_values, dict):
             return {}
@@ -9878,13 +10032,19 @@ class YahahaCoverStudio(_PluginBase):
                 try:
                     if Path(cache_meta_path).read_text(encoding="utf-8").strip() == cache_key:
                         logger.debug("复用已缓存图片: %s", filepath)
+                        metrics.CACHE_REQUESTS.inc(cache="source_image", result="hit")
                         return filepath
                 except Exception as cache_err:
                     logger.debug("读取图片缓存标记失败，将重新下载: %s", cache_err)
 
+            metrics.CACHE_REQUESTS.inc(cache="source_image", result="miss")
+            server_name = service.name if service and '[HOST]' in imageurl else "external"
+            download_started = time.perf_counter()
             # 重试机制
             for attempt in range(1, retries + 1):
                 image_content = None
+                if attempt > 1:
+                    metrics.RETRIES.inc(operation="download", server=server_name)
 
                 if '[HOST]' in imageurl:
                     if not service:
@@ -9906,6 +10066,7 @@ class YahahaCoverStudio(_PluginBase):
                         Path(cache_meta_path).write_text(cache_key, encoding="utf-8")
                     except Exception as cache_err:
                         logger.debug("写入图片缓存标记失败: %s", cache_err)
+                    metrics.GENERATION_STAGE_SECONDS.observe(time.perf_counter() - download_started, stage="download", style=self._cover_style, server=server_name)
                     return filepath
 
                 # 如果失败，记录并等待后重试
@@ -9913,6 +10074,7 @@ class YahahaCoverStudio(_PluginBase):
                 if attempt < retries:
                     time.sleep(delay)
 
+            metrics.FAILURES.inc(operation="download", server=server_name)
             logger.error(f"图片下载失败（重试 {retries} 次）：{imageurl}")
             return None
 
@@ -10013,6 +10175,7 @@ class YahahaCoverStudio(_PluginBase):
                 except Exception as save_err:
                     logger.error(f"保存发送前图片失败: {str(save_err)}")
             
+            upload_started = time.perf_counter()
             res = service.instance.post_data(
                 url=url,
                 data=image_base64,
@@ -10022,12 +10185,18 @@ class YahahaCoverStudio(_PluginBase):
             )
             
             uploaded = bool(res and res.status_code in [200, 204])
+            metrics.GENERATION_STAGE_SECONDS.observe(time.perf_counter() - upload_started, stage="upload", style=scheme_id or self._cover_style, server=service.name)
+            metrics.UPLOADS.inc(server=service.name, result="success" if uploaded else "failure")
+            if uploaded:
+                metrics.UPLOADED_BYTES.inc(len(image_base64) * 3 // 4 - image_base64[-2:].count("="), server=service.name)
+            else:
+                metrics.FAILURES.inc(operation="upload", server=service.name)
             if image_bytes:
                 self.__save_image_to_local(image_bytes, service.name, library['Name'], extension)
                 if self._history_batch:
                     try:
                         library_id = library.get("Id") if service.type == "emby" else library.get("ItemId")
-                        HistoryStore(self.get_data_path()).add_bytes(self._history_batch, image_bytes, service.name, service.name, str(library_id or library["Name"]), library["Name"], scheme_id or self._cover_style, extension, uploaded)
+                        HistoryStore(self.get_data_path(), thumbnailer=self._thumbnail_worker).add_bytes(self._history_batch, image_bytes, service.name, service.name, str(library_id or library["Name"]), library["Name"], scheme_id or self._cover_style, extension, uploaded)
                     except Exception as history_err:
                         logger.error(f"【YahahaCoverStudio】记录历史批次失败: {history_err}", exc_info=True)
             if uploaded:
@@ -10057,60 +10226,64 @@ class YahahaCoverStudio(_PluginBase):
                 continue
 
         if save:
-            self.save_data('cover_history', cleaned)
+            with self._cover_history_lock:
+                self.save_data('cover_history', cleaned)
+                self._cover_history_index = None
 
         return cleaned
 
-
-    def update_cover_history(self, server, library_id, item_id):
-        now = time.time()
-        item_id = str(item_id)
+    def __load_cover_history_index(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """
+        按 (server, library_id) 分组的素材记录，每组按时间倒序，首项即最新。
+        插件数据只在首次访问时读取一次，之后的更新只触及对应媒体库。
+        """
+        with self._cover_history_lock:
+            return self.__cover_history_index_locked()
+
+    def __cover_history_index_locked(self) -> Dict[Tuple[str, str], List[Dict[str, Any]]]:
+        """调用方需持有 _cover_history_lock"""
+        if self._cover_history_index is None:
+            index: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+            for item in self.clean_cover_history(save=False):
+                index[(item["server"], item["library_id"])].append(item)
+            for ring in index.values():
+                ring.sort(key=lambda x: x["timestamp"], reverse=True)
+            self._cover_history_index = dict(index)
+        return self._cover_history_index
+
+    def record_cover_history(self, server, library_id, item_ids, limit: int = 9):
+        """
+        一次写入本次生成使用的全部素材 ID，item_ids[0] 记为最新。
+        """
         library_id = str(library_id)
+        ordered: List[str] = []
+        for item_id in item_ids or []:
+            item_id = str(item_id)
+            if item_id not in ordered:
+                ordered.append(item_id)
+        if not ordered:
+            return []
 
-        history_item = {
-            "server": server,
-            "library_id": library_id,
-            "item_id": item_id,
-            "timestamp": now
-        }
-
-        # 原始数据
-        history = self.get_data('cover_history') or []
-
-        # 用于分组管理：(server, library_id) => list of items
-        grouped = defaultdict(list)
-        for item in history:
-            key = (item["server"], str(item["library_id"]))
-            grouped[key].append(item)
-
-        key = (server, library_id)
-        items = grouped[key]
-
-        # 查找是否已有该 item_id
-        existing = next((i for i in items if str(i["item_id"]) == item_id), None)
-
-        if existing:
-            # 若已存在且是最新的，跳过
-            if existing["timestamp"] >= max(i["timestamp"] for i in items):
-                return
-            else:
-                existing["timestamp"] = now
-        else:
-            items.append(history_item)
-
-        # 排序 + 截取前9
-        grouped[key] = sorted(items, key=lambda x: x["timestamp"], reverse=True)[:9]
-
-        # 重新整合所有分组的数据
-        new_history = []
-        for item_list in grouped.values():
-            new_history.extend(item_list)
+        # 读取、修改与保存在同一把锁内完成，避免基于已失效的索引覆盖其他线程写入的记录
+        with self._cover_history_lock:
+            index = self.__cover_history_index_locked()
+            key = (server, library_id)
+            ring = index.get(key) or []
+            if [str(item["item_id"]) for item in ring[:len(ordered)]] == ordered:
+                return list(ring)
+
+            now = time.time()
+            fresh = [
+                {"server": server, "library_id": library_id, "item_id": item_id, "timestamp": now - position * 0.001}
+                for position, item_id in enumerate(ordered)
+            ]
+            kept = [item for item in ring if str(item["item_id"]) not in ordered]
+            index[key] = (fresh + kept)[:limit]
+            self.save_data('cover_history', [item for items in index.values() for item in items])
+            return list(index[key])
 
-        self.save_data('cover_history', new_history)
-        return [ 
-            item for item in new_history
-            if str(item.get("library_id")) == str(library_id)
-        ]
+    def update_cover_history(self, server, library_id, item_id):
+        return self.record_cover_history(server, library_id, [item_id])
 
     def prepare_library_images(self, library_dir: str, required_items: int = 9):
         """
@@ -10613,5 +10786,10 @@ class YahahaCoverStudio(_PluginBase):
                     self._scheduler.shutdown()
                     self._event.clear()
                 self._scheduler = None
+            if self._thumbnail_worker:
+                self._thumbnail_worker.shutdown()
+            if self._render_worker:
+                self._render_worker.shutdown()
+            release_style_engines()
         except Exception as e:
             logger.error(f"停止服务失败: {str(e)}")
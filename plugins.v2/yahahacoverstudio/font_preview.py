@@ -33,11 +33,22 @@ def collect_characters(config: dict[str, Any]) -> str:
     return "".join(sorted({char for char in raw if not unicodedata.category(char).startswith("C") or char == "\n"}))
 
 
+def _link_or_copy(source: Path, target: Path) -> None:
+    """Hardlink the original when source and cache share a filesystem."""
+    temp = target.with_name(f".{target.name}.tmp")
+    temp.unlink(missing_ok=True)
+    try: os.link(source, temp)
+    except OSError: shutil.copy2(source, temp)
+    os.replace(temp, target)
+
+
 class PreviewFontService:
     def __init__(self, data_dir: Path, logger: Any = None):
         self.root = data_dir / "fonts"
         self.subsets = self.root / "subsets"
         self.originals = self.root / "originals"
+        self.digests_path = self.root / "digests.json"
+        self.digests: dict[str, dict[str, Any]] | None = None
         self.logger = logger
         self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="yahaha-font-subset")
         self.locks: dict[tuple[str, str], threading.Lock] = {}
@@ -46,11 +57,13 @@ class PreviewFontService:
 
     def assets(self, paths: list[Path]) -> dict[str, dict[str, Any]]:
         result = {}
+        changed = False
         for path in paths:
             try:
                 path = path.resolve()
                 if not path.is_file(): continue
-                digest = hashlib.sha256(path.read_bytes()).hexdigest()
+                digest, computed = self._digest(path)
+                changed = changed or computed
                 font_id = f"font_{digest[:12]}"
                 item = {"font_id": font_id, "path": path, "sha": digest, "format": path.suffix.lower().lstrip(".") or "ttf"}
                 result[font_id] = item
@@ -58,13 +71,44 @@ class PreviewFontService:
                 original_copy = self.originals / font_id / f"original{path.suffix.lower()}"
                 original_copy.parent.mkdir(parents=True, exist_ok=True)
                 if not original_copy.exists() or original_copy.stat().st_size != path.stat().st_size:
-                    shutil.copy2(path, original_copy)
+                    _link_or_copy(path, original_copy)
                 if not meta.exists():
                     meta.parent.mkdir(parents=True, exist_ok=True)
                     meta.write_text(json.dumps({"font_id": font_id, "display_name": path.stem, "source_filename": path.name, "source_sha256": digest, "source_format": item["format"], "uploaded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}, ensure_ascii=False), encoding="utf-8")
             except Exception as error: self._log("warning", "读取预览字体失败: %s", error)
+        if changed: self._save_digests()
         return result
 
+    def _digest(self, path: Path) -> tuple[str, bool]:
+        """Hash a font only when its (inode, size, mtime_ns) differs from the cached entry."""
+        stat = path.stat()
+        signature = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+        with self.guard:
+            cached = self._digests().get(str(path))
+            if isinstance(cached, dict) and cached.get("signature") == signature and cached.get("sha256"): return str(cached["sha256"]), False
+        digest = hashlib.sha256()
+        with path.open("rb") as stream:
+            for chunk in iter(lambda: stream.read(1024 * 1024), b""): digest.update(chunk)
+        with self.guard: self._digests()[str(path)] = {"signature": signature, "sha256": digest.hexdigest()}
+        return digest.hexdigest(), True
+
+    def _digests(self) -> dict[str, dict[str, Any]]:
+        if self.digests is None:
+            try:
+                value = json.loads(self.digests_path.read_text(encoding="utf-8"))
+                self.digests = value["entries"] if isinstance(value, dict) and value.get("schema_version") == 2 and isinstance(value.get("entries"), dict) else {}
+            except Exception: self.digests = {}
+        return self.digests
+
+    def _save_digests(self) -> None:
+        with self.guard:
+            self.digests = {key: value for key, value in self._digests().items() if Path(key).is_file()}
+            payload = json.dumps({"schema_version": 2, "entries": self.digests}, ensure_ascii=False, sort_keys=True)
+        try:
+            self.root.mkdir(parents=True, exist_ok=True); tmp = self.digests_path.with_suffix(".tmp")
+            tmp.write_text(payload, encoding="utf-8"); os.replace(tmp, self.digests_path)
+        except Exception as error: self._log("warning", "写入预览字体摘要缓存失败: %s", error)
+
     def info(self, font_id: str, assets: dict[str, dict[str, Any]], config: dict[str, Any], url_for: Callable[[str, str, str], str]) -> dict[str, Any] | None:
         item = assets.get(font_id)
         if not item: return None
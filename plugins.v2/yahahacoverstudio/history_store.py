@@ -4,9 +4,11 @@ from __future__ import annotations
 import hashlib
 import json
 import os
+import queue
 import re
 import secrets
 import shutil
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -33,13 +35,75 @@ def _write(path: Path, value: dict[str, Any]) -> None:
     temp.replace(path)
 
 
+def _write_thumbnail(batch: dict[str, Any], file: Path) -> dict[str, Any]:
+    updates: dict[str, Any] = {}
+    try:
+        with Image.open(file) as source:
+            updates["width"], updates["height"] = source.size
+            thumb = source.convert("RGB")
+            thumb.thumbnail((480, 270))
+            thumb_path = file.with_name("thumbnail.webp")
+            thumb.save(thumb_path, "WEBP", quality=78, method=4)
+            updates["thumbnail"] = str(thumb_path.relative_to(batch["_directory"]))
+    except Exception:
+        pass
+    return updates
+
+
+class ThumbnailWorker:
+    """Bounded background queue that writes history thumbnails off the generation path."""
+
+    def __init__(self, max_pending: int = 8):
+        self._jobs: queue.Queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, store: "HistoryStore", batch: dict[str, Any], item: dict[str, Any], file: Path) -> None:
+        # Enqueue under the lock so a job can never land behind shutdown's sentinel;
+        # a submit after shutdown starts a fresh thread for it.
+        with self._lock:
+            if not self._thread or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True, name="YahahaCoverStudioThumbnail")
+                self._thread.start()
+            # A full queue blocks the producer, so a slow disk cannot grow memory unbounded.
+            self._jobs.put((store, batch, item, file))
+
+    def drain(self) -> None:
+        self._jobs.join()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread and thread.is_alive():
+                self._jobs.put(None)
+                thread.join()
+
+    def _run(self) -> None:
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                store, batch, item, file = job
+                updates = _write_thumbnail(batch, file)
+                if updates:
+                    with batch["_lock"]:
+                        item.update(updates)
+                        store._save(batch)
+            except Exception:
+                pass
+            finally:
+                self._jobs.task_done()
+
+
 class HistoryStore:
-    def __init__(self, data_dir: Path, version: str = "2.2.9"):
+    def __init__(self, data_dir: Path, version: str = "2.2.9", thumbnailer: ThumbnailWorker | None = None):
         self.root = data_dir / "history"
         self.tmp = self.root / ".tmp"
         self.batches = self.root / "batches"
         self.index = self.root / "index.json"
         self.version = version
+        self.thumbnailer = thumbnailer
         self.tmp.mkdir(parents=True, exist_ok=True)
         self.batches.mkdir(parents=True, exist_ok=True)
 
@@ -48,7 +112,7 @@ class HistoryStore:
         batch_id = f"{stamp.strftime('%Y%m%dT%H%M%S')}.{stamp.microsecond // 1000:03d}Z_{secrets.token_hex(3)}"
         directory = self.tmp / batch_id
         directory.mkdir()
-        batch = {"schema_version": 1, "batch_id": batch_id, "created_at": _now(), "trigger": trigger if trigger in {"manual", "schedule", "monitor", "api"} else "api", "mode": mode, "app_version": self.version, "status": "running", "summary": {"total": 0, "success": 0, "failed": 0, "uploaded": 0}, "items": [], "_directory": directory}
+        batch = {"schema_version": 1, "batch_id": batch_id, "created_at": _now(), "trigger": trigger if trigger in {"manual", "schedule", "monitor", "api"} else "api", "mode": mode, "app_version": self.version, "status": "running", "summary": {"total": 0, "success": 0, "failed": 0, "uploaded": 0}, "items": [], "_directory": directory, "_lock": threading.RLock()}
         self._save(batch)
         return batch
 
@@ -61,20 +125,18 @@ class HistoryStore:
         file.write_bytes(content)
         digest = hashlib.sha256(content).hexdigest()
         item = {"server_id": server_key, "server_name": server_name, "server_type": "media_server", "library_id": library_key, "library_name": library_name, "library_key": f"{server_key}:{library_key}", "template_id": template_id, "status": "success", "upload_status": "success" if uploaded else "failed", "file": str(file.relative_to(batch["_directory"])), "thumbnail": None, "mime_type": f"image/{'jpeg' if ext == 'jpg' else ext}", "width": None, "height": None, "size": len(content), "sha256": digest, "generated_at": _now(), "error": None}
-        try:
-            with Image.open(file) as source:
-                item["width"], item["height"] = source.size
-                thumb = source.convert("RGB")
-                thumb.thumbnail((480, 270))
-                thumb_path = directory / "thumbnail.webp"
-                thumb.save(thumb_path, "WEBP", quality=78, method=4)
-                item["thumbnail"] = str(thumb_path.relative_to(batch["_directory"]))
-        except Exception:
-            pass
-        batch["items"].append(item)
-        self._save(batch)
+        if not self.thumbnailer:
+            item.update(_write_thumbnail(batch, file))
+        with batch["_lock"]:
+            batch["items"].append(item)
+            self._save(batch)
+        if self.thumbnailer:
+            self.thumbnailer.submit(self, batch, item, file)
 
     def finalize(self, batch: dict[str, Any], status: str = "success") -> None:
+        # Thumbnails patch the manifest in .tmp, so they must land before the move.
+        if self.thumbnailer:
+            self.thumbnailer.drain()
         batch["status"] = status
         self._save(batch)
         final = self.batches / batch["batch_id"]
@@ -84,7 +146,7 @@ class HistoryStore:
     def _save(self, batch: dict[str, Any]) -> None:
         items = batch["items"]
         batch["summary"] = {"total": len(items), "success": sum(item["status"] == "success" for item in items), "failed": sum(item["status"] == "failed" for item in items), "uploaded": sum(item["upload_status"] == "success" for item in items)}
-        payload = {key: value for key, value in batch.items() if key != "_directory"}
+        payload = {key: value for key, value in batch.items() if not key.startswith("_")}
         _write(Path(batch["_directory"]) / "manifest.json", payload)
 
     def rebuild_index(self) -> None:
@@ -0,0 +1,100 @@
+"""
+风格引擎注册表
+风格模块（及其依赖的 numpy、模板渲染器等）在首次分发到该风格时才导入，从未使用的风格不占用 MoviePilot 共享进程的内存。
+长时间未使用的引擎会清理其进程内缓存（模板计划、字体对象等）；模块本身保留，避免重新导入时重置模块状态。
+"""
+import importlib
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from app.log import logger
+
+
+_PACKAGE = "app.plugins.yahahacoverstudio"
+# 超过该时长未被分发的引擎会在下一次渲染结束后清理缓存
+ENGINE_IDLE_SECONDS = 900
+
+# 风格 -> (模块, 函数)
+_ENGINES: Dict[str, Tuple[str, str]] = {
+    "static_1": ("style.style_static_template", "create_style_static_1"),
+    "static_2": ("style.style_static_template", "create_style_static_2"),
+    "static_3": ("style.style_static_template", "create_style_static_3"),
+    "static_4": ("style.style_static_template", "create_style_static_4"),
+    "static_custom": ("style.style_static_custom", "create_style_static_custom"),
+    "measure_text_layer": ("style.style_static_custom", "measure_text_layer"),
+    "animated_1": ("style.style_animated_1", "create_style_animated_1"),
+    "animated_2": ("style.style_animated_2", "create_style_animated_2"),
+    "animated_3": ("style.style_animated_3", "create_style_animated_3"),
+    "animated_4": ("style.style_animated_4", "create_style_animated_4"),
+}
+
+# 引擎专用的进程内缓存：引擎模块 -> ((模块, 清理函数), ...)；只有使用它的引擎全部空闲时才清理
+_ENGINE_CACHES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "style.style_static_template": (("template_renderer", "clear_template_plans"),),
+    "style.style_static_custom": (("template_renderer", "clear_template_plans"),),
+}
+# 所有引擎共用的缓存，只在全部引擎都空闲时清理
+_SHARED_CACHES: Tuple[Tuple[str, str], ...] = (("utils.font_cache", "clear_font_cache"),)
+
+_lock = threading.Lock()
+_last_used: Dict[str, float] = {}
+_in_flight: Dict[str, int] = {}
+
+
+def style_function(name: str) -> Callable[..., Any]:
+    """按风格名导入并返回引擎函数"""
+    if name not in _ENGINES:
+        raise KeyError(f"未知封面风格: {name}")
+    module_name, attr = _ENGINES[name]
+    module = importlib.import_module(f"{_PACKAGE}.{module_name}")
+    with _lock:
+        _last_used[module_name] = time.monotonic()
+    return getattr(module, attr)
+
+
+def render_style(name: str, *args: Any, **kwargs: Any) -> Any:
+    """分发到指定风格引擎；渲染结束后顺带释放长时间未使用的引擎"""
+    engine = style_function(name)
+    module_name = _ENGINES[name][0]
+    with _lock:
+        _in_flight[module_name] = _in_flight.get(module_name, 0) + 1
+    try:
+        return engine(*args, **kwargs)
+    finally:
+        with _lock:
+            _in_flight[module_name] -= 1
+            _last_used[module_name] = time.monotonic()
+        release_style_engines(ENGINE_IDLE_SECONDS)
+
+
+def release_style_engines(idle_seconds: float = 0) -> int:
+    """
+    清理空闲超过 idle_seconds 的引擎使用的进程内缓存，返回清理的缓存数量
+
+    正在渲染或仍在空闲期内的引擎所用的缓存始终保留；模块不会从 sys.modules 中移除，
+    只清理已经导入的模块中的缓存，不会为了清理而导入模块。
+    """
+    now = time.monotonic()
+    with _lock:
+        keep = {module for module in _last_used if _in_flight.get(module) or now - _last_used[module] < idle_seconds}
+        idle = set(_last_used) - keep
+        for module in idle:
+            _last_used.pop(module, None)
+    if not idle:
+        return 0
+    caches = {cache for module in idle for cache in _ENGINE_CACHES.get(module, ())}
+    caches -= {cache for module in keep for cache in _ENGINE_CACHES.get(module, ())}
+    if not keep:
+        caches.update(_SHARED_CACHES)
+    count = 0
+    for module_name, function_name in sorted(caches):
+        module = sys.modules.get(f"{_PACKAGE}.{module_name}")
+        if module is None:
+            continue
+        getattr(module, function_name)()
+        count += 1
+    if count:
+        logger.debug(f"已清理 {count} 个空闲封面风格引擎的缓存")
+    return count
@@ -9,10 +9,11 @@ from collections import Counter
 from pathlib import Path
 
 import numpy as np
-from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageOps
 
 from app.log import logger
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 
 
 def darken_color(color, factor=0.7):
@@ -213,8 +214,8 @@ def _build_text_layer(target_w, target_h, title, font_path, font_size, font_offs
     title_zh, title_en = title
 
     # 参考 style_animated_1：按分辨率比例缩放字体
-    main_title_font = ImageFont.truetype(main_title_font_path, max(1, int(main_title_font_size * scale)))
-    subtitle_font = ImageFont.truetype(subtitle_font_path, max(1, int(subtitle_font_size * scale)))
+    main_title_font = load_font(main_title_font_path, max(1, int(main_title_font_size * scale)))
+    subtitle_font = load_font(subtitle_font_path, max(1, int(subtitle_font_size * scale)))
 
     left_area_center_x = int(target_w * 0.25)
     left_area_center_y = int(target_h * 0.5)
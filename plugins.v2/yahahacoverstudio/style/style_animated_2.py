@@ -7,7 +7,7 @@ import tempfile
 import time
 from pathlib import Path
 
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
 
 from app.log import logger
 from app.plugins.yahahacoverstudio.style.style_static_2 import (
@@ -17,6 +17,7 @@ from app.plugins.yahahacoverstudio.style.style_static_2 import (
     find_dominant_vibrant_colors,
 )
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 
 
 def _clamp(v, lo, hi):
@@ -116,8 +117,8 @@ def _build_text_layer(canvas_size, title, font_path, font_size, font_offset, bg_
 
     # 小分辨率动图按比例放大字体，避免文字过小
     scale = height / 1080.0
-    main_title_font = ImageFont.truetype(main_title_font_path, max(1, int(main_title_font_size * scale)))
-    subtitle_font = ImageFont.truetype(subtitle_font_path, max(1, int(subtitle_font_size * scale)))
+    main_title_font = load_font(main_title_font_path, max(1, int(main_title_font_size * scale)))
+    subtitle_font = load_font(subtitle_font_path, max(1, int(subtitle_font_size * scale)))
 
     text_layer = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
     shadow_layer = Image.new("RGBA", canvas_size, (0, 0, 0, 0))
@@ -2,7 +2,7 @@ import base64
 from collections import Counter
 import io
 from pathlib import Path
-from PIL import Image, ImageFilter, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageFilter, ImageDraw, ImageOps
 import numpy as np
 import os
 import math
@@ -13,6 +13,7 @@ import subprocess
 import tempfile
 import shutil
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 
 """ 
 代码修改自 https://github.com/HappyQuQu/jellyfin-library-poster/blob/main/gen_poster.py
@@ -105,7 +106,7 @@ def draw_text_on_image(
     shadow_layer = Image.new('RGBA', img_copy.size, (0, 0, 0, 0))
     draw = ImageDraw.Draw(text_layer)
     shadow_draw = ImageDraw.Draw(shadow_layer)
-    font = ImageFont.truetype(font_path, font_size)
+    font = load_font(font_path, font_size)
     
     # 如果需要添加阴影
     if shadow:
@@ -182,7 +183,7 @@ def draw_multiline_text_on_image(
     img_copy = image.copy()
     text_layer = Image.new('RGBA', img_copy.size, (255, 255, 255, 0))
     draw = ImageDraw.Draw(text_layer)
-    font = ImageFont.truetype(font_path, font_size)
+    font = load_font(font_path, font_size)
 
     # 按空格分割文本
     lines = text.split(" ")
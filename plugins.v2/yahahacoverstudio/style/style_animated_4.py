@@ -8,7 +8,7 @@ import time
 from pathlib import Path
 
 import numpy as np
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
 
 from app.log import logger
 from app.plugins.yahahacoverstudio.style.style_static_2 import (
@@ -16,6 +16,7 @@ from app.plugins.yahahacoverstudio.style.style_static_2 import (
     find_dominant_vibrant_colors,
 )
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 
 
 def _clamp(v, lo, hi):
@@ -109,8 +110,8 @@ def _build_text_layer(canvas_size, title, font_path, font_size, font_offset, tin
     draw = ImageDraw.Draw(text_layer)
     sdraw = ImageDraw.Draw(shadow_layer)
 
-    main_title_font = ImageFont.truetype(main_title_font_path, int(max(1, float(main_title_font_size))))
-    subtitle_font = ImageFont.truetype(subtitle_font_path, int(max(1, float(subtitle_font_size))))
+    main_title_font = load_font(main_title_font_path, int(max(1, float(main_title_font_size))))
+    subtitle_font = load_font(subtitle_font_path, int(max(1, float(subtitle_font_size))))
 
     cx = canvas_size[0] // 2
     cy = canvas_size[1] // 2
@@ -7,7 +7,7 @@ from pathlib import Path
 import math
 
 import numpy as np
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
 
 from app.log import logger
 from app.plugins.yahahacoverstudio.utils.image_manager import (
@@ -17,6 +17,7 @@ from app.plugins.yahahacoverstudio.utils.performance_helper import (
     OptimizedImageProcessor, PerformanceMonitor, memory_efficient_operation
 )
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 
 
 # ========== 配置 ==========
@@ -508,8 +509,8 @@ def create_style_static_1(image_path, title, font_path, font_size=(170,75), font
             left_area_center_y = canvas_size[1] // 2
 
             # 使用动态字体大小
-            main_title_font = ImageFont.truetype(main_title_font_path, int(main_title_font_size))
-            subtitle_font = ImageFont.truetype(subtitle_font_path, int(subtitle_font_size))
+            main_title_font = load_font(main_title_font_path, int(main_title_font_size))
+            subtitle_font = load_font(subtitle_font_path, int(subtitle_font_size))
 
             # 文字颜色和阴影颜色
             text_color = (255, 255, 255, 229)  # 85% 不透明度
@@ -7,10 +7,11 @@ from io import BytesIO
 from pathlib import Path
 
 import numpy as np
-from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageOps
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
 
 from app.log import logger
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 
 # ========== 配置 ==========
 canvas_size = (1920, 1080)
@@ -360,8 +361,8 @@ def create_style_static_2(image_path, title, font_path, font_size=(170,75), font
         # main_title_font_size = int(canvas_size[1] * 0.17 * float(zh_font_size_ratio))
         # subtitle_font_size = int(canvas_size[1] * 0.07 * float(en_font_size_ratio))
         
-        main_title_font = ImageFont.truetype(main_title_font_path, main_title_font_size)
-        subtitle_font = ImageFont.truetype(subtitle_font_path, subtitle_font_size)
+        main_title_font = load_font(main_title_font_path, main_title_font_size)
+        subtitle_font = load_font(subtitle_font_path, subtitle_font_size)
             
         # 文字颜色和阴影颜色
         text_color = (255, 255, 255, 229)  # 85% 不透明度
@@ -2,7 +2,7 @@ import base64
 from collections import Counter
 import io
 from pathlib import Path
-from PIL import Image, ImageFilter, ImageDraw, ImageFont, ImageOps
+from PIL import Image, ImageFilter, ImageDraw, ImageOps
 import numpy as np
 import os
 import math
@@ -11,6 +11,7 @@ import colorsys
 import traceback
 from app.log import logger
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 
 """ 
 代码修改自 https://github.com/HappyQuQu/jellyfin-library-poster/blob/main/gen_poster.py
@@ -107,7 +108,7 @@ def draw_text_on_image(
     shadow_draw = ImageDraw.Draw(shadow_layer)
     font_size = int(max(1, round(float(font_size))))
     shadow_offset = int(max(1, round(float(shadow_offset))))
-    font = ImageFont.truetype(font_path, font_size)
+    font = load_font(font_path, font_size)
     
     # 如果需要添加阴影
     if shadow:
@@ -189,7 +190,7 @@ def draw_multiline_text_on_image(
     font_size = int(max(1, round(float(font_size))))
     shadow_offset = int(max(1, round(float(shadow_offset))))
     line_spacing = int(round(float(line_spacing)))
-    font = ImageFont.truetype(font_path, font_size)
+    font = load_font(font_path, font_size)
 
     # 按空格分割文本
     lines = text.split(" ")
@@ -1136,8 +1137,8 @@ def create_style_static_3(library_dir, title, font_path, font_size=(170,75), fon
             else:
                 font_size = base_font_size
 
-            main_title_font = ImageFont.truetype(main_title_font_path, int(max(1, round(main_title_font_size))))
-            subtitle_font = ImageFont.truetype(subtitle_font_path, int(font_size))
+            main_title_font = load_font(main_title_font_path, int(max(1, round(main_title_font_size))))
+            subtitle_font = load_font(subtitle_font_path, int(font_size))
 
             zh_bbox = draw.textbbox((0, 0), title_zh, font=main_title_font)
             zh_text_w = zh_bbox[2] - zh_bbox[0]
@@ -14,6 +14,7 @@ from app.plugins.yahahacoverstudio.utils.performance_helper import (
     memory_efficient_operation,
 )
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font
 from app.plugins.yahahacoverstudio.template_renderer import render_template_to_base64
 
 
@@ -64,7 +65,7 @@ def _apply_film_grain(image: Image.Image, intensity: Any) -> Image.Image:
 
 def _load_font(font_path: str, size: float) -> ImageFont.FreeTypeFont:
     size_int = max(1, int(round(float(size))))
-    return ImageFont.truetype(font_path, size_int)
+    return load_font(font_path, size_int)
 
 
 def _measure_text(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont) -> Tuple[float, float]:
@@ -1,8 +1,14 @@
 import base64
 import colorsys
+import hashlib
 import html
+import json
 import math
 import mimetypes
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 import re
@@ -12,12 +18,26 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 from PIL import Image, ImageChops, ImageDraw, ImageFilter, ImageFont
 
 from app.log import logger
+from app.plugins.yahahacoverstudio.utils.backend_planner import BACKEND_PLANNER, BACKENDS, BackendUnavailable
 from app.plugins.yahahacoverstudio.utils.color_helper import ColorHelper
+from app.plugins.yahahacoverstudio.utils.font_cache import load_font, text_length
 from app.plugins.yahahacoverstudio.utils.image_manager import ResolutionConfig, managed_image
+from app.plugins.yahahacoverstudio.utils.scaled_images import SCALED_IMAGES
 
 
 EDITOR_BASE_WIDTH = 1920.0
 EDITOR_BASE_HEIGHT = 1080.0
+_PLAN_CACHE_SIZE = 32
+# CairoSVG 光栅化时画布像素到输出像素的缩放，预缩放图片按此计算目标尺寸
+SVG_DEVICE_SCALE = 1.0
+
+_plan_lock = threading.Lock()
+_plans: "OrderedDict[str, TemplatePlan]" = OrderedDict()
+
+
+def clear_template_plans() -> None:
+    with _plan_lock:
+        _plans.clear()
 
 
 def _num(value: Any, fallback: float) -> float:
@@ -78,6 +98,14 @@ def _image_to_file_href(path: str) -> str:
         return _image_to_data_uri(path)
 
 
+def _scaled_image_href(path: str, width: float, height: float, fit: str) -> str:
+    """引用按图层画布尺寸预缩放的副本，源图不够大或缩放失败时引用原图"""
+    if not path or not Path(path).is_file():
+        return ""
+    scaled = SCALED_IMAGES.scaled_path(path, width, height, fit, SVG_DEVICE_SCALE)
+    return scaled.resolve().as_uri() if scaled else _image_to_file_href(path)
+
+
 def _data_uri_to_image(data_uri: str) -> Optional[Image.Image]:
     if not data_uri or not str(data_uri).startswith("data:image/"):
         return None
@@ -318,6 +346,151 @@ def _normalize_layer(layer: Dict[str, Any]) -> Dict[str, Any]:
     return normalized
 
 
+def _sorted_layers(layers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    ordered = sorted(layers, key=lambda item: int(item.get("zIndex", 0)))
+    return [
+        {**layer, "children": _sorted_layers(layer.get("children") or [])} if layer.get("type") == "group" else layer
+        for layer in ordered
+    ]
+
+
+@dataclass(frozen=True)
+class TemplatePlan:
+    """
+    编译后的模板渲染计划
+
+    同一 (布局, 分辨率) 只规范化一次：图层已按 zIndex 排序（组内子图层同样排好）并以背景为界拆分，
+    缩放系数、供后端成本估算使用的模板特征以及可用后端也已算好。计划在多次渲染间共享，渲染函数不得修改其中的字典。
+    """
+
+    key: str
+    template: Dict[str, Any]
+    canvas_width: int
+    canvas_height: int
+    scale_x: float
+    scale_y: float
+    layers: Tuple[Dict[str, Any], ...]
+    under_background: Tuple[Dict[str, Any], ...]
+    over_background: Tuple[Dict[str, Any], ...]
+    has_text_mask: bool
+    features: Dict[str, float]
+    # SVG 路径无法正确渲染的原因（颗粒、媒体数量徽章、文字遮罩、贴图）；非空时只能使用 Pillow
+    svg_unsupported: str = ""
+
+    @property
+    def backends(self) -> Tuple[str, ...]:
+        return ("pillow",) if self.svg_unsupported else BACKENDS
+
+    @property
+    def scale(self) -> float:
+        return min(self.scale_x, self.scale_y)
+
+    def background_blur(self, blur_size: int) -> float:
+        return max(0, int((self.template.get("background") or {}).get("blur", blur_size) or 0)) * self.scale
+
+
+def template_plan_key(layout: Optional[Dict[str, Any]], size: Tuple[int, int]) -> str:
+    encoded = json.dumps({"layout": layout or {}, "size": list(size)}, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _template_features(template: Dict[str, Any], canvas_width: int, canvas_height: int) -> Dict[str, float]:
+    """后端成本模型的输入：图层与效果计数、图片图层在画布上的像素面积"""
+    scale_x = canvas_width / EDITOR_BASE_WIDTH
+    scale_y = canvas_height / EDITOR_BASE_HEIGHT
+    features = {
+        "layers": 0.0,
+        "image_layers": 0.0,
+        "image_megapixels": 0.0,
+        "text_layers": 0.0,
+        "mask_layers": 0.0,
+        "badge_layers": 0.0,
+        "sticker_layers": 0.0,
+        "filtered_layers": 0.0,
+        "grain_layers": 0.0,
+    }
+
+    def visit(layers: List[Dict[str, Any]]) -> None:
+        for layer in layers:
+            features["layers"] += 1
+            layer_type = layer.get("type")
+            if layer_type == "group":
+                visit(layer.get("children") or [])
+                continue
+            if layer_type == "image":
+                features["image_layers"] += 1
+                features["image_megapixels"] += _num(layer.get("width"), 1) * scale_x * _num(layer.get("height"), 1) * scale_y / 1_000_000
+                if layer.get("assetKind") == "sticker" or _has_sticker_ref(layer):
+                    features["sticker_layers"] += 1
+            elif layer_type == "badge":
+                features["badge_layers"] += 1
+            else:
+                features["text_layers"] += 1
+                if layer.get("maskMode") in ("knockout-text", "show-text"):
+                    features["mask_layers"] += 1
+            if _num(layer.get("blur"), 0) > 0 or _num(layer.get("shadowBlur"), 0) > 0:
+                features["filtered_layers"] += 1
+            effects = layer.get("effects") if isinstance(layer.get("effects"), dict) else {}
+            if _num(layer.get("grain", effects.get("grain")), 0) > 0:
+                features["grain_layers"] += 1
+
+    visit(template.get("layers") or [])
+    if _num((template.get("background") or {}).get("grain"), 0) > 0:
+        features["grain_layers"] += 1
+    features["canvas_megapixels"] = canvas_width * canvas_height / 1_000_000
+    features["layer_canvas_megapixels"] = features["layers"] * features["canvas_megapixels"]
+    return features
+
+
+def _svg_unsupported_reason(features: Dict[str, float]) -> str:
+    """SVG 路径缺少徽章渲染（数量与胶囊边框），颗粒与文字遮罩只能近似，贴图依赖 Pillow 解码；这些模板必须走 Pillow"""
+    for feature, reason in (
+        ("grain_layers", "film-grain"),
+        ("badge_layers", "media-count-badge"),
+        ("mask_layers", "text-mask"),
+        ("sticker_layers", "sticker"),
+    ):
+        if features.get(feature):
+            return reason
+    return ""
+
+
+def compile_template_plan(layout: Optional[Dict[str, Any]], resolution_config: ResolutionConfig) -> TemplatePlan:
+    """按 (布局内容哈希, 分辨率) 返回缓存的渲染计划，未命中时编译并放入 LRU"""
+    size = tuple(resolution_config.size)
+    key = template_plan_key(layout, size)
+    with _plan_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+    template = normalize_template(layout)
+    layers = _sorted_layers(template.get("layers") or [])
+    template = {**template, "layers": layers}
+    background_z_index = int(_num((template.get("background") or {}).get("zIndex"), 0))
+    canvas_width, canvas_height = size
+    features = _template_features(template, canvas_width, canvas_height)
+    plan = TemplatePlan(
+        key=key,
+        template=template,
+        canvas_width=canvas_width,
+        canvas_height=canvas_height,
+        scale_x=canvas_width / EDITOR_BASE_WIDTH,
+        scale_y=canvas_height / EDITOR_BASE_HEIGHT,
+        layers=tuple(layers),
+        under_background=tuple(layer for layer in layers if int(layer.get("zIndex", 0)) < background_z_index),
+        over_background=tuple(layer for layer in layers if int(layer.get("zIndex", 0)) >= background_z_index),
+        has_text_mask=_has_text_mask_layer(layers),
+        features=features,
+        svg_unsupported=_svg_unsupported_reason(features),
+    )
+    with _plan_lock:
+        _plans[key] = plan
+        while len(_plans) > _PLAN_CACHE_SIZE:
+            _plans.popitem(last=False)
+    return plan
+
+
 def _layer_transform(layer: Dict[str, Any], scale_x: float, scale_y: float) -> str:
     rotation = _num(layer.get("rotation"), 0)
     if not rotation:
@@ -355,7 +528,7 @@ def _wrap_text(text: str, font_size: float, max_width: float) -> List[str]:
 
 def _measure_text_width(draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont) -> float:
     try:
-        return float(draw.textlength(text, font=font))
+        return text_length(font, text)
     except Exception:
         left, _, right, _ = draw.textbbox((0, 0), text, font=font)
         return float(right - left)
@@ -540,7 +713,7 @@ def _render_background(
     bg_path = image_slots.get(bg_slot) or next((path for _, path in sorted(image_slots.items()) if path and Path(path).is_file()), "")
     bg_href = _blurred_background_data_uri(bg_path, canvas_width, canvas_height, bg_blur) if bg_path else ""
     if not bg_href and bg_path:
-        bg_href = _image_to_data_uri(bg_path)
+        bg_href = _scaled_image_href(bg_path, canvas_width, canvas_height, "cover")
     overlay_opacity = _clamp(_num(background_config.get("colorRatio"), color_ratio), 0, 1)
     bg = f'<rect x="0" y="0" width="{canvas_width}" height="{canvas_height}" fill="{_esc(base_color)}"/>'
     if bg_href:
@@ -557,21 +730,25 @@ def _render_image_layer(
     scale_y: float,
     auto_bg_color: str,
     config_bg_color: str,
+    source_path: str = "",
 ) -> str:
     slot = int(_num((layer.get("source") or {}).get("slot") if isinstance(layer.get("source"), dict) else layer.get("sourceIndex"), 1))
+    x = _num(layer.get("x"), 0) * scale_x
+    y = _num(layer.get("y"), 0) * scale_y
+    width = _num(layer.get("width"), 1) * scale_x
+    height = _num(layer.get("height"), 1) * scale_y
+    fit = layer.get("fit") or "cover"
+    scaled_fit = fit if fit in ("cover", "contain") else "stretch"
     if layer.get("assetKind") == "sticker":
         sticker_path = _sticker_path_for_layer(layer)
-        href = _image_to_file_href(sticker_path) if sticker_path and Path(sticker_path).is_file() else str(layer.get("stickerDataUrl") or "")
+        href = _scaled_image_href(sticker_path, width, height, scaled_fit) if sticker_path and Path(sticker_path).is_file() else str(layer.get("stickerDataUrl") or "")
+    elif source_path and Path(source_path).is_file():
+        href = _scaled_image_href(source_path, width, height, scaled_fit)
     else:
         href = image_data.get(slot)
     if not href:
         return ""
-    x = _num(layer.get("x"), 0) * scale_x
-    y = _num(layer.get("y"), 0) * scale_y
-    width = _num(layer.get("width"), 1) * scale_x
-    height = _num(layer.get("height"), 1) * scale_y
     radius = max(0, _num(layer.get("radius"), 0) * min(scale_x, scale_y))
-    fit = layer.get("fit") or "cover"
     aspect = "xMidYMid slice" if fit == "cover" else "xMidYMid meet" if fit == "contain" else "none"
     filter_id = _filter_id(layer)
     filter_attr = f' filter="url(#{filter_id})"' if filter_id else ""
@@ -694,7 +871,7 @@ def _render_image_layer_as_image(
     has_source_image = bool(sticker_image is not None or (source_path and Path(source_path).is_file()))
     should_rasterize = bool(has_source_image and (rotation or shadow_blur or shadow_x or shadow_y or layer_blur or layer_grain or has_custom_crop_focus or has_polygon_mask))
     if not should_rasterize:
-        return _render_image_layer(layer, image_data, scale_x, scale_y, auto_bg_color, config_bg_color)
+        return _render_image_layer(layer, image_data, scale_x, scale_y, auto_bg_color, config_bg_color, "" if is_sticker else str(source_path or ""))
 
     try:
         x = _num(layer.get("x"), 0) * scale_x
@@ -763,7 +940,7 @@ def _render_image_layer_as_image(
         return f'<image href="{_esc(_png_data_uri(combined))}" x="0" y="0" width="{canvas_width}" height="{canvas_height}" preserveAspectRatio="none"/>'
     except Exception as err:
         logger.warning("template svg: Pillow 图片阴影图层渲染失败，回退 SVG image: %s", err)
-        return _render_image_layer(layer, image_data, scale_x, scale_y, auto_bg_color, config_bg_color)
+        return _render_image_layer(layer, image_data, scale_x, scale_y, auto_bg_color, config_bg_color, "" if is_sticker else str(source_path or ""))
 
 
 def _render_text_layer(
@@ -831,7 +1008,7 @@ def _render_text_layer_as_image(
         width = _num(layer.get("width"), 1) * scale_x
         height = _num(layer.get("height"), 1) * scale_y
         font_size = max(1, _num(layer.get("fontSize"), 60) * min(scale_x, scale_y))
-        font = ImageFont.truetype(font_path, max(1, int(round(font_size))))
+        font = load_font(font_path, max(1, int(round(font_size))))
         lines = _wrap_text_with_font(text, font, max(1, width))
         line_height = font_size * 1.1
         total_height = line_height * len(lines)
@@ -905,8 +1082,7 @@ def _render_layer(
 ) -> str:
     layer_type = layer.get("type")
     if layer_type == "group":
-        children = sorted(layer.get("children") or [], key=lambda item: int(item.get("zIndex", 0)))
-        body = "".join(_render_layer(child, image_slots, image_data, title, scale_x, scale_y, canvas_width, canvas_height, font_paths, auto_bg_color, config_bg_color) for child in children)
+        body = "".join(_render_layer(child, image_slots, image_data, title, scale_x, scale_y, canvas_width, canvas_height, font_paths, auto_bg_color, config_bg_color) for child in layer.get("children") or [])
         return f'<g{_layer_transform(layer, scale_x, scale_y)} opacity="{_clamp(_num(layer.get("opacity"), 1), 0, 1)}">{body}</g>'
     if layer_type == "image":
         return _render_image_layer_as_image(layer, image_slots, image_data, scale_x, scale_y, canvas_width, canvas_height, auto_bg_color, config_bg_color)
@@ -922,12 +1098,12 @@ def render_template_svg(
     color_ratio: float,
     bg_color_config: Optional[Dict[str, Any]] = None,
     font_paths: FontPathInput = None,
+    plan: Optional["TemplatePlan"] = None,
 ) -> str:
-    template = normalize_template(layout_config)
-    canvas_width, canvas_height = resolution_config.size
-    scale_x = canvas_width / EDITOR_BASE_WIDTH
-    scale_y = canvas_height / EDITOR_BASE_HEIGHT
-    scale = min(scale_x, scale_y)
+    plan = plan or compile_template_plan(layout_config, resolution_config)
+    template = plan.template
+    canvas_width, canvas_height = plan.canvas_width, plan.canvas_height
+    scale_x, scale_y = plan.scale_x, plan.scale_y
 
     first_image_path = next((path for _, path in sorted(image_slots.items()) if path and Path(path).is_file()), "")
     image_data = {slot: _image_to_file_href(path) for slot, path in image_slots.items() if path}
@@ -940,8 +1116,6 @@ def render_template_svg(
             logger.warning("template svg: 获取背景色失败: %s", err)
     config_bg_color = str((bg_color_config or {}).get("config_color") or "")
 
-    layers = sorted(template.get("layers") or [], key=lambda item: int(item.get("zIndex", 0)))
-    bg_blur = max(0, int((template.get("background") or {}).get("blur", blur_size) or 0)) * scale
     bg, background_defs = _render_background(
         template=template,
         image_slots=image_slots,
@@ -949,21 +1123,18 @@ def render_template_svg(
         config_bg_color=config_bg_color,
         canvas_width=canvas_width,
         canvas_height=canvas_height,
-        bg_blur=bg_blur,
+        bg_blur=plan.background_blur(blur_size),
         color_ratio=_clamp(float(color_ratio or 0.8), 0, 1),
     )
-    background_z_index = int(_num((template.get("background") or {}).get("zIndex"), 0))
-    under_background_layers = [layer for layer in layers if int(layer.get("zIndex", 0)) < background_z_index]
-    over_background_layers = [layer for layer in layers if int(layer.get("zIndex", 0)) >= background_z_index]
     under_body = "".join(
         _render_layer(layer, image_slots, image_data, title, scale_x, scale_y, canvas_width, canvas_height, font_paths, auto_bg_color, config_bg_color)
-        for layer in under_background_layers
+        for layer in plan.under_background
     )
     over_body = "".join(
         _render_layer(layer, image_slots, image_data, title, scale_x, scale_y, canvas_width, canvas_height, font_paths, auto_bg_color, config_bg_color)
-        for layer in over_background_layers
+        for layer in plan.over_background
     )
-    text_mask_def = _render_text_alpha_mask_def(layers, title, canvas_width, canvas_height, scale_x, scale_y, font_paths)
+    text_mask_def = _render_text_alpha_mask_def(list(plan.layers), title, canvas_width, canvas_height, scale_x, scale_y, font_paths) if plan.has_text_mask else ""
     body = f"{under_body}{bg}{over_body}"
     masked_body = f'<g mask="url(#mcr-text-mask)">{body}</g>' if text_mask_def else body
     return (
@@ -1299,7 +1470,7 @@ def _draw_template_text_layer(
     font_path = _font_path_for_layer(layer, font_paths)
     try:
         font_size = max(1, _num(layer.get("fontSize"), 60) * min(scale_x, scale_y))
-        font = ImageFont.truetype(font_path, max(1, int(round(font_size)))) if font_path and Path(font_path).is_file() else ImageFont.load_default()
+        font = load_font(font_path, max(1, int(round(font_size)))) if font_path and Path(font_path).is_file() else ImageFont.load_default()
         x = _num(layer.get("x"), 0) * scale_x
         y = _num(layer.get("y"), 0) * scale_y
         width = _num(layer.get("width"), 1) * scale_x
@@ -1380,7 +1551,7 @@ def _draw_template_badge_layer(
 
         font_path = _font_path_for_layer(layer, font_paths)
         font_size = max(1, int(round(_num(layer.get("fontSize"), 46) * scale)))
-        font = ImageFont.truetype(font_path, font_size) if font_path and Path(font_path).is_file() else ImageFont.load_default()
+        font = load_font(font_path, font_size) if font_path and Path(font_path).is_file() else ImageFont.load_default()
         color = _resolve_template_color(layer.get("colorSource") or "custom", layer.get("color") or "#ffffff", auto_bg_color, config_bg_color, "#ffffff")
         fill = _hex_to_rgba(color, 1, "#ffffff")
         text_bbox = draw.textbbox((0, 0), text, font=font)
@@ -1430,67 +1601,6 @@ def _has_text_mask_layer(layers: List[Dict[str, Any]], mode: Optional[str] = Non
     return False
 
 
-def _count_image_layers(layers: List[Dict[str, Any]]) -> int:
-    total = 0
-    for layer in layers:
-        if layer.get("type") == "group":
-            total += _count_image_layers(layer.get("children") or [])
-        elif layer.get("type") == "image":
-            total += 1
-    return total
-
-
-def _has_sticker_layer(layers: List[Dict[str, Any]]) -> bool:
-    for layer in layers:
-        if layer.get("type") == "group":
-            if _has_sticker_layer(layer.get("children") or []):
-                return True
-            continue
-        if layer.get("type") == "image" and (layer.get("assetKind") == "sticker" or _has_sticker_ref(layer)):
-            return True
-    return False
-
-
-def _has_film_grain(layers: List[Dict[str, Any]]) -> bool:
-    for layer in layers:
-        if layer.get("type") == "group":
-            if _has_film_grain(layer.get("children") or []):
-                return True
-            continue
-        effects = layer.get("effects") if isinstance(layer.get("effects"), dict) else {}
-        if _num(layer.get("grain", effects.get("grain")), 0) > 0:
-            return True
-    return False
-
-
-def _has_badge_layer(layers: List[Dict[str, Any]]) -> bool:
-    for layer in layers:
-        if layer.get("type") == "group":
-            if _has_badge_layer(layer.get("children") or []):
-                return True
-        elif layer.get("type") == "badge":
-            return True
-    return False
-
-
-def _should_render_template_with_pillow_first(layout_config: Dict[str, Any]) -> Tuple[bool, str]:
-    template = normalize_template(layout_config)
-    layers = template.get("layers") or []
-    background = template.get("background") if isinstance(template.get("background"), dict) else {}
-    if _num(background.get("grain"), 0) > 0 or _has_film_grain(layers):
-        return True, "film-grain"
-    if _has_badge_layer(layers):
-        return True, "media-count-badge"
-    if _has_text_mask_layer(layers):
-        return True, "text-mask"
-    if _has_sticker_layer(layers):
-        return True, "sticker"
-    image_count = _count_image_layers(layers)
-    if image_count >= 4:
-        return True, f"{image_count}-image-layers"
-    return False, ""
-
-
 def _draw_text_mask_shape(
     shape: Image.Image,
     layer: Dict[str, Any],
@@ -1505,7 +1615,7 @@ def _draw_text_mask_shape(
     try:
         font_path = _font_path_for_layer(layer, font_paths)
         font_size = max(1, _num(layer.get("fontSize"), 60) * min(scale_x, scale_y))
-        font = ImageFont.truetype(font_path, max(1, int(round(font_size)))) if font_path and Path(font_path).is_file() else ImageFont.load_default()
+        font = load_font(font_path, max(1, int(round(font_size)))) if font_path and Path(font_path).is_file() else ImageFont.load_default()
         x = _num(layer.get("x"), 0) * scale_x
         y = _num(layer.get("y"), 0) * scale_y
         width = _num(layer.get("width"), 1) * scale_x
@@ -1630,7 +1740,7 @@ def _draw_template_layer(
 ) -> None:
     if layer.get("type") == "group":
         group_canvas = Image.new("RGBA", canvas.size, (0, 0, 0, 0))
-        for child in sorted(layer.get("children") or [], key=lambda item: int(item.get("zIndex", 0))):
+        for child in layer.get("children") or []:
             _draw_template_layer(group_canvas, child, image_slots, title, scale_x, scale_y, font_paths, auto_bg_color, config_bg_color)
         _paste_layer_canvas(canvas, group_canvas, layer, scale_x, scale_y)
     elif layer.get("type") == "image":
@@ -1653,12 +1763,12 @@ def render_template_to_image_bytes_pillow(
     bg_color_config: Optional[Dict[str, Any]] = None,
     font_paths: FontPathInput = None,
     output_format: str = "png",
+    plan: Optional["TemplatePlan"] = None,
 ) -> bytes:
-    template = normalize_template(layout_config)
-    canvas_width, canvas_height = resolution_config.size
-    scale_x = canvas_width / EDITOR_BASE_WIDTH
-    scale_y = canvas_height / EDITOR_BASE_HEIGHT
-    scale = min(scale_x, scale_y)
+    plan = plan or compile_template_plan(layout_config, resolution_config)
+    template = plan.template
+    canvas_width, canvas_height = plan.canvas_width, plan.canvas_height
+    scale_x, scale_y = plan.scale_x, plan.scale_y
     first_image_path = next((path for _, path in sorted(image_slots.items()) if path and Path(path).is_file()), "")
     auto_bg_color = "#5f7185"
     if first_image_path:
@@ -1675,20 +1785,18 @@ def render_template_to_image_bytes_pillow(
         config_bg_color,
         canvas_width,
         canvas_height,
-        max(0, int((template.get("background") or {}).get("blur", blur_size) or 0)) * scale,
+        plan.background_blur(blur_size),
         _clamp(float(color_ratio or 0.8), 0, 1),
     )
-    layers = sorted(template.get("layers") or [], key=lambda item: int(item.get("zIndex", 0)))
     background = canvas.copy()
     canvas = Image.new("RGBA", (canvas_width, canvas_height), (0, 0, 0, 0))
-    background_z_index = int(_num((template.get("background") or {}).get("zIndex"), 0))
-    for layer in [item for item in layers if int(item.get("zIndex", 0)) < background_z_index]:
+    for layer in plan.under_background:
         _draw_template_layer(canvas, layer, image_slots, title, scale_x, scale_y, font_paths, auto_bg_color, config_bg_color)
     canvas.alpha_composite(background)
-    for layer in [item for item in layers if int(item.get("zIndex", 0)) >= background_z_index]:
+    for layer in plan.over_background:
         _draw_template_layer(canvas, layer, image_slots, title, scale_x, scale_y, font_paths, auto_bg_color, config_bg_color)
 
-    text_alpha_mask = _build_text_alpha_mask(layers, title, canvas_width, canvas_height, scale_x, scale_y, font_paths)
+    text_alpha_mask = _build_text_alpha_mask(list(plan.layers), title, canvas_width, canvas_height, scale_x, scale_y, font_paths) if plan.has_text_mask else None
     if text_alpha_mask is not None:
         canvas.putalpha(ImageChops.multiply(canvas.getchannel("A"), text_alpha_mask))
 
@@ -1705,8 +1813,11 @@ def svg_to_image_bytes(svg: str, output_format: str = "png") -> bytes:
     fmt = (output_format or "png").lower()
     try:
         import cairosvg  # type: ignore
-
-        png_bytes = cairosvg.svg2png(bytestring=svg.encode("utf-8"), unsafe=True)
+    except (ImportError, OSError) as err:
+        # 缺少 libcairo 时 cairocffi 在导入阶段抛出 OSError（dlopen 失败）
+        raise BackendUnavailable(f"CairoSVG 不可用: {err}") from err
+    try:
+        png_bytes = cairosvg.svg2png(bytestring=svg.encode("utf-8"), unsafe=True, scale=SVG_DEVICE_SCALE)
         if fmt in ("jpg", "jpeg"):
             with Image.open(BytesIO(png_bytes)) as image:
                 out = BytesIO()
@@ -1717,6 +1828,20 @@ def svg_to_image_bytes(svg: str, output_format: str = "png") -> bytes:
         raise RuntimeError(f"CairoSVG 转换失败: {err}") from err
 
 
+def _unreadable_sources(image_slots: Dict[int, str]) -> List[str]:
+    """渲染失败后检查素材文件，返回无法打开或校验失败的路径"""
+    unreadable = []
+    for path in image_slots.values():
+        if not path:
+            continue
+        try:
+            with Image.open(path) as image:
+                image.verify()
+        except Exception:
+            unreadable.append(str(path))
+    return unreadable
+
+
 def render_template_to_base64(
     layout_config: Dict[str, Any],
     image_slots: Dict[int, str],
@@ -1728,48 +1853,33 @@ def render_template_to_base64(
     font_paths: FontPathInput = None,
     output_format: str = "png",
 ) -> str:
-    pillow_first, pillow_reason = _should_render_template_with_pillow_first(layout_config)
-    if pillow_first:
+    plan = compile_template_plan(layout_config, resolution_config)
+    render_kwargs = {
+        "layout_config": layout_config,
+        "image_slots": image_slots,
+        "title": title,
+        "resolution_config": resolution_config,
+        "blur_size": blur_size,
+        "color_ratio": color_ratio,
+        "bg_color_config": bg_color_config,
+        "font_paths": font_paths,
+        "plan": plan,
+    }
+    last_error: Optional[Exception] = None
+    if plan.svg_unsupported:
+        logger.info("模板包含 SVG 路径不支持的特性 %s，只使用 Pillow 渲染", plan.svg_unsupported)
+    for backend in BACKEND_PLANNER.plan(plan.key, plan.features, plan.backends):
+        started = time.perf_counter()
         try:
-            logger.info("模板渲染使用 Pillow 快速路径: %s", pillow_reason)
-            image_bytes = render_template_to_image_bytes_pillow(
-                layout_config=layout_config,
-                image_slots=image_slots,
-                title=title,
-                resolution_config=resolution_config,
-                blur_size=blur_size,
-                color_ratio=color_ratio,
-                bg_color_config=bg_color_config,
-                font_paths=font_paths,
-                output_format=output_format,
-            )
-            return base64.b64encode(image_bytes).decode("utf-8")
+            if backend == "pillow":
+                image_bytes = render_template_to_image_bytes_pillow(output_format=output_format, **render_kwargs)
+            else:
+                image_bytes = svg_to_image_bytes(render_template_svg(**render_kwargs), output_format)
         except Exception as err:
-            logger.warning("Pillow 快速路径渲染失败，回退 CairoSVG: %s", err)
-
-    try:
-        svg = render_template_svg(
-            layout_config=layout_config,
-            image_slots=image_slots,
-            title=title,
-            resolution_config=resolution_config,
-            blur_size=blur_size,
-            color_ratio=color_ratio,
-            bg_color_config=bg_color_config,
-            font_paths=font_paths,
-        )
-        image_bytes = svg_to_image_bytes(svg, output_format)
-    except Exception as err:
-        logger.warning("CairoSVG 模板渲染失败，回退 Pillow: %s", err)
-        image_bytes = render_template_to_image_bytes_pillow(
-            layout_config=layout_config,
-            image_slots=image_slots,
-            title=title,
-            resolution_config=resolution_config,
-            blur_size=blur_size,
-            color_ratio=color_ratio,
-            bg_color_config=bg_color_config,
-            font_paths=font_paths,
-            output_format=output_format,
-        )
-    return base64.b64encode(image_bytes).decode("utf-8")
+            logger.warning("模板渲染后端 %s 失败，尝试下一个后端: %s", backend, err)
+            BACKEND_PLANNER.record_failure(plan.key, backend, err, source_error=bool(_unreadable_sources(image_slots)))
+            last_error = err
+            continue
+        BACKEND_PLANNER.record_timing(backend, plan.features, time.perf_counter() - started)
+        return base64.b64encode(image_bytes).decode("utf-8")
+    raise RuntimeError(f"模板渲染失败: {last_error}") from last_error
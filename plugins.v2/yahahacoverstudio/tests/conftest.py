@@ -0,0 +1,34 @@
+"""
+插件单元测试的导入环境
+插件以 app.plugins.yahahacoverstudio 的包名导入；测试只需要渲染与缓存工具模块，
+这里注册精简的包对象，跳过插件入口 __init__ 对 MoviePilot 运行环境的依赖。
+"""
+import logging
+import sys
+import types
+from pathlib import Path
+
+PLUGIN_DIR = Path(__file__).resolve().parents[1]
+
+
+def _register_package(name: str, path: Path = None) -> None:
+    if name in sys.modules:
+        return
+    module = types.ModuleType(name)
+    module.__path__ = [str(path)] if path else []
+    sys.modules[name] = module
+
+
+try:
+    import app.log  # noqa: F401
+except ImportError:
+    _register_package("app")
+    log_module = types.ModuleType("app.log")
+    log_module.logger = logging.getLogger("yahahacoverstudio")
+    sys.modules["app.log"] = log_module
+    sys.modules["app"].log = log_module
+
+_register_package("app.plugins")
+_register_package("app.plugins.yahahacoverstudio", PLUGIN_DIR)
+# 插件目录带 __init__.py，pytest 收集时会以目录名导入该包，这里指向同一个精简包对象
+sys.modules.setdefault(PLUGIN_DIR.name, sys.modules["app.plugins.yahahacoverstudio"])
@@ -0,0 +1,106 @@
+import builtins
+import json
+import time
+from unittest import mock
+
+import pytest
+
+from app.plugins.yahahacoverstudio import template_renderer
+from app.plugins.yahahacoverstudio.utils import backend_planner
+from app.plugins.yahahacoverstudio.utils.backend_planner import BackendPlanner, BackendUnavailable
+
+SVG_FRIENDLY = {"canvas_megapixels": 2.0, "layer_canvas_megapixels": 1.0, "image_megapixels": 0.1, "text_layers": 1}
+PILLOW_FRIENDLY = {"canvas_megapixels": 2.0, "image_megapixels": 40.0}
+
+
+@pytest.fixture
+def planner(tmp_path):
+    return BackendPlanner(tmp_path / "stats.json")
+
+
+def test_plan_orders_backends_by_estimated_cost(planner):
+    assert planner.plan("t", PILLOW_FRIENDLY) == ["pillow", "cairosvg"]
+    assert planner.plan("t", SVG_FRIENDLY) == ["cairosvg", "pillow"]
+    assert planner.plan("t", SVG_FRIENDLY, ("pillow",)) == ["pillow"]
+
+
+def test_failed_backend_is_skipped_persisted_and_expires(planner, tmp_path):
+    planner.record_failure("t", "cairosvg", RuntimeError("CairoSVG 转换失败: bad path"))
+    assert planner.plan("t", SVG_FRIENDLY) == ["pillow"]
+    assert planner.plan("other", SVG_FRIENDLY) == ["cairosvg", "pillow"]
+
+    reloaded = BackendPlanner(tmp_path / "stats.json")
+    assert "bad path" in reloaded.known_failures("t")["cairosvg"]
+    with mock.patch.object(backend_planner.time, "time", return_value=time.time() + backend_planner.FAILURE_TTL_SECONDS + 1):
+        assert reloaded.plan("t", SVG_FRIENDLY) == ["cairosvg", "pillow"]
+
+
+def test_all_backends_failing_still_plans_pillow(planner):
+    planner.record_failure("t", "pillow", ValueError("boom"))
+    planner.record_failure("t", "cairosvg", ValueError("boom"))
+    assert planner.plan("t", SVG_FRIENDLY) == ["pillow"]
+
+
+def test_unloadable_backend_is_marked_unavailable_for_every_template(planner, tmp_path):
+    try:
+        try:
+            raise OSError("no library called \"cairo-2\" was found")
+        except OSError as err:
+            raise BackendUnavailable(f"CairoSVG 不可用: {err}") from err
+    except BackendUnavailable as err:
+        planner.record_failure("t", "cairosvg", err)
+    assert planner.plan("any", SVG_FRIENDLY) == ["pillow"]
+    assert planner.known_failures("t") == {}
+    assert not (tmp_path / "stats.json").exists()
+
+
+def test_source_errors_are_not_recorded(planner):
+    error = RuntimeError("CairoSVG 转换失败")
+    error.__cause__ = OSError("cannot identify image file")
+    planner.record_failure("t", "cairosvg", error, source_error=True)
+    assert planner.plan("t", SVG_FRIENDLY) == ["cairosvg", "pillow"]
+
+
+def test_backend_oserror_without_source_error_is_recorded(planner):
+    error = RuntimeError("CairoSVG 转换失败")
+    error.__cause__ = OSError("font file truncated")
+    planner.record_failure("t", "cairosvg", error)
+    assert planner.plan("t", SVG_FRIENDLY) == ["pillow"]
+
+
+def test_record_timing_calibrates_estimates(planner, tmp_path):
+    prior = planner.prior_cost("pillow", PILLOW_FRIENDLY)
+    planner.record_timing("pillow", PILLOW_FRIENDLY, prior * 2 / 1000)
+    assert planner.estimate("pillow", PILLOW_FRIENDLY) == pytest.approx(prior * 2)
+    saved = json.loads((tmp_path / "stats.json").read_text(encoding="utf-8"))
+    assert saved["calibration"]["pillow"] == {"ratio": pytest.approx(2.0), "samples": 1}
+
+    planner.record_timing("pillow", PILLOW_FRIENDLY, prior * 4 / 1000)
+    expected = (1 - backend_planner.CALIBRATION_ALPHA) * 2 + backend_planner.CALIBRATION_ALPHA * 4
+    assert planner.estimate("pillow", PILLOW_FRIENDLY) == pytest.approx(prior * expected)
+
+    planner.record_timing("cairosvg", SVG_FRIENDLY, 1e6)
+    assert planner.estimate("cairosvg", SVG_FRIENDLY) == pytest.approx(planner.prior_cost("cairosvg", SVG_FRIENDLY) * backend_planner.MAX_RATIO)
+
+
+@pytest.mark.parametrize("import_error", [ImportError("No module named 'cairosvg'"), OSError("cannot load library 'libcairo.so.2'")])
+def test_cairosvg_import_failures_raise_backend_unavailable(import_error):
+    real_import = builtins.__import__
+
+    def fake_import(name, *args, **kwargs):
+        if name == "cairosvg":
+            raise import_error
+        return real_import(name, *args, **kwargs)
+
+    with mock.patch.object(builtins, "__import__", fake_import):
+        with pytest.raises(BackendUnavailable) as raised:
+            template_renderer.svg_to_image_bytes("<svg/>")
+    assert raised.value.__cause__ is import_error
+
+
+def test_unreadable_sources_reports_broken_images(tmp_path):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not an image")
+    good = tmp_path / "good.png"
+    template_renderer.Image.new("RGB", (4, 4)).save(good)
+    assert template_renderer._unreadable_sources({1: str(good), 2: str(broken), 3: ""}) == [str(broken)]
@@ -0,0 +1,31 @@
+from app.plugins.yahahacoverstudio.utils.benchmark import SMOKE_CASES, build_cases, compare_to_baseline
+
+
+def test_case_matrix_covers_styles_resolutions_frames_and_formats():
+    ids = {case.case_id for case in build_cases()}
+    assert "static_custom/4k/png" in ids
+    assert "animated_3/640x360/150f/gif" in ids
+    assert len(ids) == 4 * 3 * 1 + 1 * 3 * 2 + 4 * 2 * 2 * 2
+    assert len(build_cases(quick=True)) == 9
+    assert [case.case_id for case in build_cases(["animated_2"], ["320x180"], ["gif"], [24])] == ["animated_2/320x180/24f/gif"]
+    assert {case.style for case in SMOKE_CASES} == {"static_1", "animated_3"}
+
+
+def test_regressions_beyond_tolerance_are_flagged():
+    baseline = {"cases": {
+        "a": {"wall_seconds": 1.0, "peak_rss_mb": 100.0},
+        "b": {"wall_seconds": 2.0, "peak_rss_mb": 100.0},
+        "c": {"wall_seconds": 1.0, "peak_rss_mb": 100.0},
+        "d": {"error": "RuntimeError: no ffmpeg"},
+    }}
+    current = {"cases": {
+        "a": {"wall_seconds": 1.2, "peak_rss_mb": 140.0},
+        "b": {"error": "ValueError: boom"},
+        "c": {"wall_seconds": 1.5, "peak_rss_mb": 100.0},
+        "d": {"error": "RuntimeError: no ffmpeg"},
+        "new": {"wall_seconds": 9.0, "peak_rss_mb": 900.0},
+    }}
+    regressions = compare_to_baseline(current, baseline, 0.25)
+    assert [(item["case"], item["metric"]) for item in regressions] == [("a", "peak_rss_mb"), ("b", "error"), ("c", "wall_seconds")]
+    assert regressions[2]["ratio"] == 1.5
+    assert compare_to_baseline(current, baseline, 0.6) == [regressions[1]]
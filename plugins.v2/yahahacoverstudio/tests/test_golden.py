@@ -0,0 +1,65 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from PIL import Image, ImageDraw, ImageEnhance
+
+from app.plugins.yahahacoverstudio.utils import golden
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+FONT = Path(__file__).resolve().parents[3] / "fonts" / "chaohei.ttf"
+
+
+@pytest.fixture(scope="module")
+def cover(tmp_path_factory):
+    sources = golden.create_sources(tmp_path_factory.mktemp("sources"))
+    with Image.open(sources[0]) as image:
+        return image.convert("RGB").resize((320, 480))
+
+
+def _encode(image, tmp_path, name):
+    path = tmp_path / name
+    image.save(path, format="PNG")
+    return path.read_bytes()
+
+
+def test_identical_images_pass(cover, tmp_path):
+    assert golden.ssim(cover, cover) == pytest.approx(1.0)
+    assert golden.delta_e(cover, cover) == (0.0, 0.0)
+    data = _encode(cover, tmp_path, "a.png")
+    result = golden.compare_images(data, data, golden.DEFAULT_TOLERANCE)
+    assert result["ok"]
+    assert (result["ssim"], result["delta_e_mean"], result["delta_e_p95"]) == (1.0, 0.0, 0.0)
+
+
+def test_structural_change_fails_ssim(cover, tmp_path):
+    perturbed = cover.copy()
+    draw = ImageDraw.Draw(perturbed)
+    for x in range(0, perturbed.width, 8):
+        draw.line((x, 0, x, perturbed.height), fill=(255, 255, 255), width=2)
+    result = golden.compare_images(_encode(cover, tmp_path, "a.png"), _encode(perturbed, tmp_path, "b.png"), golden.DEFAULT_TOLERANCE)
+    assert not result["ok"]
+    assert "SSIM" in result["reason"]
+
+
+def test_colour_shift_fails_delta_e(cover, tmp_path):
+    shifted = ImageEnhance.Color(cover).enhance(1.6)
+    result = golden.compare_images(_encode(cover, tmp_path, "a.png"), _encode(shifted, tmp_path, "b.png"), golden.DEFAULT_TOLERANCE)
+    assert not result["ok"]
+    assert "ΔE" in result["reason"]
+
+
+def test_size_mismatch_fails(cover, tmp_path):
+    result = golden.compare_images(_encode(cover, tmp_path, "a.png"), _encode(cover.resize((160, 240)), tmp_path, "b.png"), golden.DEFAULT_TOLERANCE)
+    assert not result["ok"]
+    assert "尺寸" in result["reason"]
+
+
+@pytest.mark.skipif(not FONT.is_file(), reason="需要仓库 fonts/chaohei.ttf")
+def test_committed_goldens_match(tmp_path):
+    shutil.copytree(GOLDEN_DIR, tmp_path / "golden")
+    font = str(FONT)
+    report = golden.run_golden(tmp_path / "golden", (font, font, font), case_ids=["static_1", "static_2", "static_3", "static_4"])
+    assert set(report["cases"]) == {"static_1", "static_2", "static_3", "static_4"}
+    failures = {case_id: result.get("reason") for case_id, result in report["cases"].items() if not result["ok"]}
+    assert not failures
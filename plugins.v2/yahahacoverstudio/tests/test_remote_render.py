@@ -0,0 +1,54 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+pytest.importorskip("requests")
+
+from app.plugins.yahahacoverstudio.utils import remote_render
+from app.plugins.yahahacoverstudio.utils.remote_render import RemoteRenderClient, RemoteRenderUnavailable
+
+
+@pytest.fixture
+def client():
+    return RemoteRenderClient("http://render.local", "token")
+
+
+def test_remote_job_failure_raises_so_caller_falls_back(client):
+    with mock.patch.object(client, "render_batch", return_value=[{"ok": False, "error": "bad layout"}]):
+        with pytest.raises(RemoteRenderUnavailable, match="bad layout"):
+            client.render("static_1", (), {"title": ("a", "b")}, {})
+
+
+def test_successful_render_returns_image_data(client):
+    with mock.patch.object(client, "render_batch", return_value=[{"ok": True, "data": "aGk="}]) as render_batch:
+        assert client.render("static_1", (), {"title": ("a", "b"), "stop_event": threading.Event()}, {}) == "aGk="
+    assert "stop_event" not in render_batch.call_args.args[0][0]["config"]
+
+
+def test_stop_event_ends_the_wait_for_a_slow_remote(client, monkeypatch):
+    monkeypatch.setattr(remote_render, "STOP_POLL_SECONDS", 0.01)
+    stop_event = threading.Event()
+    release = threading.Event()
+
+    def slow_batch(jobs):
+        release.wait(5)
+        return [{"ok": True, "data": "late"}]
+
+    threading.Timer(0.05, stop_event.set).start()
+    started = time.monotonic()
+    try:
+        with mock.patch.object(client, "render_batch", side_effect=slow_batch):
+            assert client.render("static_1", (), {"title": ("a", "b"), "stop_event": stop_event}, {}) is False
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2
+
+
+def test_already_stopped_render_is_not_sent(client):
+    stop_event = threading.Event()
+    stop_event.set()
+    with mock.patch.object(client, "render_batch") as render_batch:
+        assert client.render("static_1", (), {"stop_event": stop_event}, {}) is False
+    render_batch.assert_not_called()
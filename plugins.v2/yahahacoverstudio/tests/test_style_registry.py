@@ -0,0 +1,32 @@
+import sys
+import time
+from unittest import mock
+
+from app.plugins.yahahacoverstudio import template_renderer
+from app.plugins.yahahacoverstudio.style import registry
+from app.plugins.yahahacoverstudio.utils import font_cache
+
+
+def test_idle_engines_release_caches_but_stay_imported(monkeypatch):
+    monkeypatch.setattr(registry, "_last_used", {})
+    monkeypatch.setattr(registry, "_in_flight", {})
+    registry.style_function("static_custom")
+    registry.style_function("animated_1")
+    module_names = [name for name in sys.modules if name.startswith(f"{registry._PACKAGE}.")]
+
+    with mock.patch.object(template_renderer, "clear_template_plans") as clear_plans, mock.patch.object(font_cache, "clear_font_cache") as clear_fonts:
+        assert registry.release_style_engines(registry.ENGINE_IDLE_SECONDS) == 0
+        registry._last_used["style.style_static_custom"] = time.monotonic() - registry.ENGINE_IDLE_SECONDS - 1
+        assert registry.release_style_engines(registry.ENGINE_IDLE_SECONDS) == 1
+        clear_plans.assert_called_once_with()
+        # animated_1 is still within its idle window and shares the font cache
+        clear_fonts.assert_not_called()
+
+        registry._in_flight["style.style_animated_1"] = 1
+        assert registry.release_style_engines() == 0
+        registry._in_flight["style.style_animated_1"] = 0
+        assert registry.release_style_engines() == 1
+        clear_fonts.assert_called_once_with()
+
+    assert [name for name in sys.modules if name.startswith(f"{registry._PACKAGE}.")] == module_names
+    assert registry.style_function("static_custom") is sys.modules[f"{registry._PACKAGE}.style.style_static_custom"].create_style_static_custom
@@ -0,0 +1,205 @@
+"""
+模板渲染后端规划
+按模板特征（图层数、滤镜与颗粒、图片像素面积、文字图层与遮罩等）估算 Pillow 与 CairoSVG 的渲染耗时，选择预计更快的后端。
+成本模型只在能正确渲染该模板的后端之间排序：SVG 路径不支持的特性（颗粒、媒体数量徽章、文字遮罩、贴图）由调用方限定为 Pillow。
+估算以内置先验权重为基础，并用本地记录的实测耗时按后端校准；某个模板在某个后端上因后端自身原因失败后会被记住一段时间，期间不再尝试该后端。
+统计保存在插件数据目录的 JSON 文件中，渲染子进程通过环境变量共享同一文件。
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.log import logger
+
+
+BACKENDS = ("pillow", "cairosvg")
+STATS_PATH_ENV = "YAHAHA_RENDER_BACKEND_STATS"
+STATS_VERSION = 2
+# 先验权重：毫秒量级的相对成本，实测数据通过 ratio 修正整体比例。
+# 含颗粒、徽章、文字遮罩或贴图的模板只交给 Pillow，CairoSVG 无需这些特征的权重
+PRIOR_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "pillow": {
+        "base": 10.0,
+        "canvas_megapixels": 30.0,
+        "layer_canvas_megapixels": 12.0,
+        "image_megapixels": 20.0,
+        "filtered_layers": 4.0,
+        "grain_layers": 8.0,
+        "text_layers": 3.0,
+        "mask_layers": 6.0,
+        "sticker_layers": 2.0,
+        "badge_layers": 2.0,
+    },
+    "cairosvg": {
+        "base": 10.0,
+        "canvas_megapixels": 15.0,
+        "layer_canvas_megapixels": 4.0,
+        "image_megapixels": 80.0,
+        "filtered_layers": 6.0,
+        "text_layers": 5.0,
+    },
+}
+CALIBRATION_ALPHA = 0.2
+MIN_RATIO, MAX_RATIO = 0.05, 20.0
+MAX_FAILURES = 500
+# 失败记录的有效期；过期后重新尝试该后端，避免偶发问题永久排除后端
+FAILURE_TTL_SECONDS = 7 * 24 * 3600
+SAVE_EVERY_SAMPLES = 5
+
+
+class BackendUnavailable(RuntimeError):
+    """后端依赖无法加载（缺少 Python 包或动态库），本进程内不再尝试该后端"""
+
+
+class BackendPlanner:
+    """线程安全的后端成本模型与失败记录"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._lock = threading.Lock()
+        self._path = path
+        self._loaded = False
+        self._ratios: Dict[str, Dict[str, float]] = {}
+        self._failures: Dict[str, Dict[str, str]] = {}
+        self._unavailable: Dict[str, str] = {}
+        self._mtime_ns: Optional[int] = None
+
+    def configure(self, path: Optional[Path]) -> None:
+        with self._lock:
+            self._path = Path(path) if path else None
+            self._loaded = False
+            self._mtime_ns = None
+        if path:
+            os.environ[STATS_PATH_ENV] = str(path)
+
+    def _ensure_loaded(self) -> None:
+        """首次使用时读取统计文件；其他进程（主进程或渲染子进程）改写文件后重新读取"""
+        if not self._loaded:
+            self._loaded = True
+            if self._path is None and os.environ.get(STATS_PATH_ENV):
+                self._path = Path(os.environ[STATS_PATH_ENV])
+        if self._path is None:
+            return
+        try:
+            mtime_ns = self._path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        self._mtime_ns = mtime_ns
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as err:
+            logger.warning(f"渲染后端统计读取失败，将重新记录: {err}")
+            return
+        ratios = data.get("calibration") if isinstance(data.get("calibration"), dict) else {}
+        self._ratios = {
+            backend: {"ratio": float(entry.get("ratio", 1.0)), "samples": int(entry.get("samples", 0))}
+            for backend, entry in ratios.items()
+            if backend in BACKENDS and isinstance(entry, dict)
+        }
+        # 旧版本的失败记录没有时间戳，也可能包含素材导致的失败，直接丢弃
+        failures = data.get("failures") if data.get("version") == STATS_VERSION and isinstance(data.get("failures"), dict) else {}
+        self._failures = {
+            str(key): {backend: entry for backend, entry in value.items() if isinstance(entry, dict)}
+            for key, value in failures.items()
+            if isinstance(value, dict)
+        }
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        payload = {"version": STATS_VERSION, "calibration": self._ratios, "failures": self._failures}
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self._path.with_name(f".{self._path.name}.{os.getpid()}.tmp")
+            temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+            os.replace(temp_path, self._path)
+            self._mtime_ns = self._path.stat().st_mtime_ns
+        except OSError as err:
+            logger.warning(f"渲染后端统计保存失败: {err}")
+
+    @staticmethod
+    def prior_cost(backend: str, features: Dict[str, float]) -> float:
+        weights = PRIOR_WEIGHTS[backend]
+        return weights["base"] + sum(weight * float(features.get(name, 0)) for name, weight in weights.items() if name != "base")
+
+    def estimate(self, backend: str, features: Dict[str, float]) -> float:
+        with self._lock:
+            self._ensure_loaded()
+            ratio = self._ratios.get(backend, {}).get("ratio", 1.0)
+        return self.prior_cost(backend, features) * ratio
+
+    def _active_failures(self, template_key: str) -> Dict[str, Dict[str, Any]]:
+        entry = self._failures.get(template_key, {})
+        now = time.time()
+        return {backend: failure for backend, failure in entry.items() if now - float(failure.get("at", 0)) < FAILURE_TTL_SECONDS}
+
+    def plan(self, template_key: str, features: Dict[str, float], candidates: Sequence[str] = BACKENDS) -> List[str]:
+        """
+        在 candidates（能正确渲染该模板的后端）中按估算耗时排序，排除已知失败或不可用的后端；全部排除时仍保留 Pillow
+        """
+        estimates = {backend: self.estimate(backend, features) for backend in candidates}
+        with self._lock:
+            failed = set(self._active_failures(template_key)) | set(self._unavailable)
+        order = [backend for backend in sorted(candidates, key=lambda name: estimates[name]) if backend not in failed]
+        logger.info("模板渲染后端估算: " + ", ".join(f"{name}={estimates[name]:.0f}" for name in candidates) + f"，顺序: {order or ['pillow']}")
+        return order or ["pillow"]
+
+    def record_timing(self, backend: str, features: Dict[str, float], seconds: float) -> None:
+        prior = self.prior_cost(backend, features)
+        if prior <= 0 or seconds <= 0:
+            return
+        observed = min(MAX_RATIO, max(MIN_RATIO, seconds * 1000.0 / prior))
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._ratios.setdefault(backend, {"ratio": observed, "samples": 0})
+            if entry["samples"]:
+                entry["ratio"] = (1 - CALIBRATION_ALPHA) * entry["ratio"] + CALIBRATION_ALPHA * observed
+            entry["samples"] += 1
+            if entry["samples"] % SAVE_EVERY_SAMPLES == 1:
+                self._save()
+
+    def record_failure(self, template_key: str, backend: str, error: BaseException, source_error: bool = False) -> None:
+        """
+        记录后端失败
+
+        依赖无法加载（BackendUnavailable 或 ImportError）时本进程内不再尝试该后端；
+        source_error 表示调用方确认素材文件无法读取，失败与模板和后端无关，不记录；
+        其余视为该后端无法渲染此模板，在有效期内不再尝试
+        """
+        causes = _exception_chain(error)
+        with self._lock:
+            self._ensure_loaded()
+            if any(isinstance(cause, (BackendUnavailable, ImportError)) for cause in causes):
+                self._unavailable[backend] = str(error)
+                return
+            if source_error:
+                logger.info(f"渲染后端 {backend} 失败源于素材读取，不记录为模板失败: {error}")
+                return
+            # 重新插入，使最近失败的模板排在最后，超出上限时先淘汰最早的记录
+            entry = self._failures.pop(template_key, {})
+            entry[backend] = {"error": str(error)[:200], "at": time.time()}
+            self._failures[template_key] = entry
+            while len(self._failures) > MAX_FAILURES:
+                self._failures.pop(next(iter(self._failures)))
+            self._save()
+
+    def known_failures(self, template_key: str) -> Dict[str, str]:
+        with self._lock:
+            self._ensure_loaded()
+            return {backend: failure.get("error", "") for backend, failure in self._active_failures(template_key).items()}
+
+
+def _exception_chain(error: BaseException) -> List[BaseException]:
+    chain: List[BaseException] = []
+    current: Optional[BaseException] = error
+    while current is not None and current not in chain:
+        chain.append(current)
+        current = current.__cause__ or current.__context__
+    return chain
+
+
+BACKEND_PLANNER = BackendPlanner()
@@ -0,0 +1,242 @@
+"""
+风格渲染基准测试
+逐个计时 style/ 下的 create_style_* 引擎，覆盖各分辨率、帧数与输出格式，记录耗时、峰值内存与输出大小，
+可保存为 JSON 基线并在后续运行中按容差判定性能回退。每个用例在独立的 spawn 子进程中执行，峰值内存互不叠加。
+
+在 MoviePilot 根目录执行：
+    python -m app.plugins.yahahacoverstudio.utils.benchmark --font /path/to/font.ttf --save-baseline baseline.json
+    python -m app.plugins.yahahacoverstudio.utils.benchmark --font /path/to/font.ttf --baseline baseline.json --tolerance 0.25
+    python -m app.plugins.yahahacoverstudio.utils.benchmark --font /path/to/font.ttf --smoke
+"""
+import argparse
+import base64
+import itertools
+import json
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+
+STATIC_STYLES = ("static_1", "static_2", "static_3", "static_4")
+CUSTOM_STYLES = ("static_custom",)
+ANIMATED_STYLES = ("animated_1", "animated_2", "animated_3", "animated_4")
+STATIC_RESOLUTIONS = ("720p", "1080p", "4k")
+# 预设静态风格固定输出 JPEG，只有自定义画布暴露输出格式
+STATIC_FORMATS = ("jpeg",)
+CUSTOM_FORMATS = ("jpeg", "png")
+ANIMATED_RESOLUTIONS = ("320x180", "640x360")
+ANIMATED_FRAMES = (30, 150)
+ANIMATED_FORMATS = ("apng", "gif")
+ANIMATION_FPS = 15
+SOURCE_COLORS = (
+    ("#87d9ff", "#152238"), ("#ffd166", "#2c1d12"), ("#b39cff", "#201633"),
+    ("#70e1b5", "#10241f"), ("#f6c2d9", "#2f1725"), ("#a7c7ff", "#17203b"),
+    ("#f6e6a8", "#30220b"), ("#9fe7f5", "#102a31"), ("#d4b8ff", "#21183a"),
+)
+
+
+@dataclass(frozen=True)
+class BenchmarkCase:
+    style: str
+    resolution: str
+    output_format: str
+    frames: int = 1
+
+    @property
+    def case_id(self) -> str:
+        if self.style.startswith("animated_"):
+            return f"{self.style}/{self.resolution}/{self.frames}f/{self.output_format}"
+        return f"{self.style}/{self.resolution}/{self.output_format}"
+
+
+def build_cases(styles: Optional[List[str]] = None, resolutions: Optional[List[str]] = None,
+                formats: Optional[List[str]] = None, frames: Optional[List[int]] = None,
+                quick: bool = False) -> List[BenchmarkCase]:
+    def pick(values: Tuple[Any, ...], wanted: Optional[List[Any]]) -> Tuple[Any, ...]:
+        if wanted:
+            values = tuple(value for value in values if value in wanted) or tuple(wanted)
+        return values[:1] if quick and not wanted else values
+
+    cases: List[BenchmarkCase] = []
+    for group, style_formats in ((STATIC_STYLES, STATIC_FORMATS), (CUSTOM_STYLES, CUSTOM_FORMATS)):
+        for style in group:
+            if styles and style not in styles:
+                continue
+            for resolution, output_format in itertools.product(pick(STATIC_RESOLUTIONS, resolutions), pick(style_formats, formats)):
+                cases.append(BenchmarkCase(style, resolution, output_format))
+    for style in ANIMATED_STYLES:
+        if styles and style not in styles:
+            continue
+        for resolution, frame_count, output_format in itertools.product(
+                pick(ANIMATED_RESOLUTIONS, resolutions), pick(ANIMATED_FRAMES, frames), pick(ANIMATED_FORMATS, formats)):
+            cases.append(BenchmarkCase(style, resolution, output_format, frame_count))
+    return cases
+
+
+# 冒烟测试：一个静态与一个动态用例，确认两类引擎的调用参数都能渲染
+SMOKE_CASES = (
+    BenchmarkCase("static_1", "720p", "jpeg"),
+    BenchmarkCase("animated_3", "320x180", "gif", ANIMATION_FPS),
+)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 下 ru_maxrss 单位为 KiB，macOS 为字节
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _create_sources(directory: Path) -> None:
+    for index, (top, bottom) in enumerate(SOURCE_COLORS, start=1):
+        top_image = Image.new("RGB", (1000, 1500), top)
+        mask = Image.linear_gradient("L").resize((1000, 1500))
+        Image.composite(Image.new("RGB", (1000, 1500), bottom), top_image, mask).save(directory / f"{index}.jpg", quality=90)
+
+
+def _case_call(case: BenchmarkCase, source_dir: Path, fonts: Tuple[str, str, str]) -> Tuple[tuple, Dict[str, Any]]:
+    from app.plugins.yahahacoverstudio.style.preset_templates import create_preset_layout
+    from app.plugins.yahahacoverstudio.utils.image_manager import ResolutionConfig
+
+    title = ("基准测试", "Benchmark")
+    bg_color_config = {"mode": "auto"}
+    if case.style == "static_custom":
+        image_slots = {index: str(path) for index, path in enumerate(sorted(source_dir.glob("*.jpg")), start=1)}
+        return (), {
+            "image_slots": image_slots, "title": title, "font_path": fonts,
+            "layout_config": create_preset_layout("static_3"), "blur_size": 50, "color_ratio": 0.8,
+            "resolution_config": ResolutionConfig(case.resolution), "bg_color_config": bg_color_config,
+            "output_format": case.output_format,
+        }
+    if case.style in STATIC_STYLES:
+        image = str(source_dir) if case.style == "static_3" else str(source_dir / "1.jpg")
+        return (image, title, fonts), {
+            "resolution_config": ResolutionConfig(case.resolution), "bg_color_config": bg_color_config,
+        }
+    # 动态风格只接收主标题与副标题两个字体
+    return (str(source_dir), title, fonts[:2]), {
+        "resolution_config": ResolutionConfig("1080p"), "bg_color_config": bg_color_config,
+        "animation_duration": max(1, case.frames // ANIMATION_FPS), "animation_fps": ANIMATION_FPS,
+        "animation_format": case.output_format, "animation_resolution": case.resolution,
+    }
+
+
+def _run_case(case: BenchmarkCase, source_dir: str, fonts: Tuple[str, str, str], repeat: int) -> Dict[str, Any]:
+    from app.plugins.yahahacoverstudio.style.registry import render_style
+
+    args, kwargs = _case_call(case, Path(source_dir), fonts)
+    rss_before = _peak_rss_mb()
+    timings: List[float] = []
+    output_bytes = 0
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = render_style(case.style, *args, **kwargs)
+        timings.append(time.perf_counter() - started)
+        if not result:
+            raise RuntimeError("风格引擎未返回图片")
+        output_bytes = len(base64.b64decode(result))
+    peak = _peak_rss_mb()
+    return {
+        "wall_seconds": round(statistics.median(timings), 4),
+        "peak_rss_mb": peak,
+        "render_rss_mb": round(max(0.0, peak - rss_before), 1),
+        "output_bytes": output_bytes,
+    }
+
+
+def run_benchmark(cases: List[BenchmarkCase], fonts: Tuple[str, str, str], repeat: int = 1) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as source_dir:
+        _create_sources(Path(source_dir))
+        context = get_context("spawn")
+        for case in cases:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                try:
+                    measured = pool.submit(_run_case, case, source_dir, fonts, repeat).result()
+                except Exception as err:
+                    measured = {"error": f"{type(err).__name__}: {err}"}
+            results[case.case_id] = {**asdict(case), **measured}
+    return {
+        "created_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "cases": results,
+    }
+
+
+def compare_to_baseline(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[Dict[str, Any]]:
+    """返回耗时或峰值内存超过 基线 * (1 + tolerance) 的用例"""
+    regressions: List[Dict[str, Any]] = []
+    for case_id, result in current.get("cases", {}).items():
+        reference = baseline.get("cases", {}).get(case_id)
+        if not reference or "error" in reference:
+            continue
+        if "error" in result:
+            regressions.append({"case": case_id, "metric": "error", "current": result["error"]})
+            continue
+        for metric in ("wall_seconds", "peak_rss_mb"):
+            before = float(reference.get(metric) or 0)
+            after = float(result.get(metric) or 0)
+            if before > 0 and after > before * (1 + tolerance):
+                regressions.append({"case": case_id, "metric": metric, "baseline": before, "current": after, "ratio": round(after / before, 3)})
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.plugins.yahahacoverstudio.utils.benchmark", description="封面风格渲染基准测试")
+    parser.add_argument("--font", required=True, help="主标题字体路径")
+    parser.add_argument("--subtitle-font", help="副标题字体路径，默认与主标题相同")
+    parser.add_argument("--style", action="append", dest="styles", help="只测试该风格，可重复")
+    parser.add_argument("--resolution", action="append", dest="resolutions", help="只测试该分辨率，可重复")
+    parser.add_argument("--format", action="append", dest="formats", help="只测试该输出格式，可重复")
+    parser.add_argument("--frames", action="append", type=int, help="动态风格帧数，可重复")
+    parser.add_argument("--quick", action="store_true", help="每个风格只取一种分辨率、格式与帧数")
+    parser.add_argument("--smoke", action="store_true", help="只运行冒烟用例（一个静态、一个动态），任一失败返回非零")
+    parser.add_argument("--repeat", type=int, default=1, help="每个用例渲染次数，记录中位数")
+    parser.add_argument("--output", type=Path, help="将本次结果写入 JSON 文件")
+    parser.add_argument("--save-baseline", type=Path, help="将本次结果保存为新基线")
+    parser.add_argument("--baseline", type=Path, help="与该基线比较，出现回退时返回非零")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的耗时/内存增长比例，默认 0.25")
+    args = parser.parse_args(argv)
+
+    cases = list(SMOKE_CASES) if args.smoke else build_cases(args.styles, args.resolutions, args.formats, args.frames, args.quick)
+    if not cases:
+        print("没有选中任何用例", file=sys.stderr)
+        return 2
+    subtitle_font = args.subtitle_font or args.font
+    report = run_benchmark(cases, (args.font, subtitle_font, args.font), args.repeat)
+    for case_id, result in report["cases"].items():
+        if "error" in result:
+            print(f"{case_id:36s}  失败: {result['error']}")
+        else:
+            print(f"{case_id:36s}  {result['wall_seconds']:8.3f}s  {result['peak_rss_mb']:8.1f}MB  {result['output_bytes']:>10d}B")
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    failed = any("error" in result for result in report["cases"].values())
+    if args.baseline:
+        regressions = compare_to_baseline(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for item in regressions:
+            if item["metric"] == "error":
+                print(f"性能回退 {item['case']}: {item['current']}")
+            else:
+                print(f"性能回退 {item['case']} {item['metric']}: {item['baseline']} -> {item['current']} (x{item['ratio']})")
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
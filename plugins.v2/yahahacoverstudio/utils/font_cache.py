@@ -0,0 +1,102 @@
+"""
+字体对象缓存
+同一进程内复用已解析的 FreeType 字体、字体校验结果与文本宽度测量，
+避免每次渲染都重新读取和解析体积较大的中日韩字体。
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple, Union
+
+from PIL import ImageFont
+
+
+_FONT_CACHE_SIZE = 48
+_VALIDATION_CACHE_SIZE = 256
+# 每个字体对象最多缓存的文本宽度条数
+_TEXT_LENGTH_CACHE_SIZE = 2048
+
+_lock = threading.Lock()
+_fonts: "OrderedDict[Tuple[str, int, float, int], ImageFont.FreeTypeFont]" = OrderedDict()
+_validated: "OrderedDict[Tuple[str, int, int], bool]" = OrderedDict()
+
+
+def _file_signature(font_path: Union[str, Path]) -> Tuple[str, int, int]:
+    resolved = os.path.realpath(str(font_path))
+    stat = os.stat(resolved)
+    return resolved, stat.st_mtime_ns, stat.st_size
+
+
+def load_font(font_path: Union[str, Path], size: float, index: int = 0) -> ImageFont.FreeTypeFont:
+    """
+    按 (真实路径, mtime, 字号, 字体索引) 复用 FreeType 字体对象
+
+    文件被替换后 mtime 变化，旧对象自然失效；无法 stat 的路径（例如系统字体名）直接交给 Pillow 加载。
+    """
+    try:
+        resolved, mtime_ns, _ = _file_signature(font_path)
+    except OSError:
+        return ImageFont.truetype(font_path, size, index=index)
+    key = (resolved, mtime_ns, size, int(index))
+    with _lock:
+        font = _fonts.get(key)
+        if font is not None:
+            _fonts.move_to_end(key)
+            return font
+    font = ImageFont.truetype(resolved, size, index=index)
+    with _lock:
+        _fonts[key] = font
+        _fonts.move_to_end(key)
+        while len(_fonts) > _FONT_CACHE_SIZE:
+            _fonts.popitem(last=False)
+    return font
+
+
+def is_valid_font_file(font_path: Path) -> bool:
+    """
+    按 (真实路径, mtime, 文件大小) 缓存字体可加载性的校验结果
+
+    加载失败时抛出原始异常，由调用方决定如何记录日志；失败结果不缓存，便于下载修复后重新校验。
+    """
+    signature = _file_signature(font_path)
+    if signature[2] == 0:
+        return False
+    with _lock:
+        if _validated.get(signature):
+            _validated.move_to_end(signature)
+            return True
+    load_font(signature[0], 12)
+    with _lock:
+        _validated[signature] = True
+        while len(_validated) > _VALIDATION_CACHE_SIZE:
+            _validated.popitem(last=False)
+    return True
+
+
+def text_length(font: ImageFont.FreeTypeFont, text: str) -> float:
+    """
+    缓存的单行文本宽度
+
+    测量结果挂在字体对象上而不是以字体为键的全局缓存中，load_font 的 LRU 淘汰字体后测量结果随之释放，
+    缓存不会让已淘汰的字体继续驻留。
+    """
+    lengths = getattr(font, "_cached_text_lengths", None)
+    if lengths is None:
+        lengths = {}
+        try:
+            font._cached_text_lengths = lengths
+        except AttributeError:
+            return float(font.getlength(text))
+    length = lengths.get(text)
+    if length is None:
+        if len(lengths) >= _TEXT_LENGTH_CACHE_SIZE:
+            lengths.clear()
+        length = lengths[text] = float(font.getlength(text))
+    return length
+
+
+def clear_font_cache() -> None:
+    with _lock:
+        _fonts.clear()
+        _validated.clear()
@@ -0,0 +1,302 @@
+"""
+金标图像回归检查
+为每个风格以及 style/preset_templates.py 中的每个模板预设，用固定的素材渲染一份金标输出；
+之后的改动（渐变向量化、CairoSVG 与 Pillow 快速路径切换、调色板量化等）重新渲染并与金标比较，
+逐个输出报告 SSIM 与 ΔE，超出容差即判定为可见偏移。
+
+在 MoviePilot 根目录执行：
+    python -m app.plugins.yahahacoverstudio.utils.golden --golden-dir golden --font /path/to/font.ttf --update
+    python -m app.plugins.yahahacoverstudio.utils.golden --golden-dir golden --font /path/to/font.ttf
+
+素材由 create_sources 按固定随机种子生成，不随金标提交。插件的 tests/golden 提交了 static_1 至 static_4 的一小组金标，
+由 tests/test_golden.py 检查，字体为本仓库的 fonts/chaohei.ttf；重新生成：
+    python -m app.plugins.yahahacoverstudio.utils.golden --golden-dir app/plugins/yahahacoverstudio/tests/golden --font <仓库目录>/fonts/chaohei.ttf --case static_1 --case static_2 --case static_3 --case static_4 --update
+"""
+import argparse
+import base64
+import io
+import json
+import random
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageSequence
+
+
+# 默认容差：结构相似度下限、平均色差与 95 分位色差上限
+DEFAULT_TOLERANCE = {"ssim_min": 0.98, "delta_e_mean_max": 2.0, "delta_e_p95_max": 6.0}
+PRESET_LAYOUTS = ("static_1", "static_2", "static_3", "static_4")
+ANIMATION_RESOLUTION = "320x180"
+ANIMATION_FPS = 8
+ANIMATION_DURATION = 2
+SAMPLED_FRAMES = 5
+SOURCE_COUNT = 9
+SOURCE_SIZE = (1000, 1500)
+
+
+@dataclass(frozen=True)
+class GoldenCase:
+    case_id: str
+    style: str
+    layout: str = ""
+
+    @property
+    def animated(self) -> bool:
+        return self.style.startswith("animated_")
+
+    def filename(self, data: bytes) -> str:
+        """金标文件名，扩展名按渲染输出的实际格式（静态风格输出 JPEG，动态风格输出 APNG）"""
+        with Image.open(io.BytesIO(data)) as image:
+            suffix = ".jpg" if image.format == "JPEG" else ".png"
+        return self.case_id.replace("/", "__") + (".anim" if self.animated else "") + suffix
+
+
+def golden_cases() -> List[GoldenCase]:
+    cases = [GoldenCase(style, style) for style in PRESET_LAYOUTS]
+    cases.extend(GoldenCase(f"static_custom/{layout}", "static_custom", layout) for layout in PRESET_LAYOUTS)
+    cases.extend(GoldenCase(style, style) for style in ("animated_1", "animated_2", "animated_3", "animated_4"))
+    return cases
+
+
+def create_sources(directory: Path) -> List[Path]:
+    """生成带渐变、色块与细节边缘的固定素材；已存在的素材保持不变，保证金标可复现"""
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(20260501)
+    paths: List[Path] = []
+    width, height = SOURCE_SIZE
+    for index in range(1, SOURCE_COUNT + 1):
+        path = directory / f"{index}.jpg"
+        paths.append(path)
+        if path.exists():
+            continue
+        top = tuple(rng.randrange(40, 256) for _ in range(3))
+        bottom = tuple(rng.randrange(0, 160) for _ in range(3))
+        mask = Image.linear_gradient("L").resize((width, height))
+        image = Image.composite(Image.new("RGB", (width, height), bottom), Image.new("RGB", (width, height), top), mask)
+        draw = ImageDraw.Draw(image)
+        for _ in range(12):
+            x, y = rng.randrange(0, width - 200), rng.randrange(0, height - 200)
+            size = rng.randrange(60, 400)
+            draw.rectangle((x, y, x + size, y + size // 2), fill=tuple(rng.randrange(0, 256) for _ in range(3)))
+            draw.line((rng.randrange(0, width), 0, rng.randrange(0, width), height), fill=(255, 255, 255), width=3)
+        image.save(path, quality=95)
+    return paths
+
+
+def render_case(case: GoldenCase, sources: List[Path], fonts: Tuple[str, str, str]) -> bytes:
+    """按固定参数与随机种子渲染一个用例，返回图片字节"""
+    from app.plugins.yahahacoverstudio.style.preset_templates import create_preset_layout
+    from app.plugins.yahahacoverstudio.style.registry import render_style
+    from app.plugins.yahahacoverstudio.utils.image_manager import ResolutionConfig
+
+    random.seed(0)
+    np.random.seed(0)
+    title = ("金标测试", "Golden Image")
+    bg_color_config = {"mode": "auto"}
+    resolution = ResolutionConfig("720p")
+    if case.style == "static_custom":
+        result = render_style(
+            "static_custom",
+            image_slots={index: str(path) for index, path in enumerate(sources, start=1)},
+            title=title,
+            font_path=fonts,
+            layout_config=create_preset_layout(case.layout),
+            blur_size=50,
+            color_ratio=0.8,
+            resolution_config=resolution,
+            bg_color_config=bg_color_config,
+            output_format="png",
+        )
+    elif case.animated:
+        result = render_style(
+            # 动态风格只接收主标题与副标题两个字体
+            case.style, str(sources[0].parent), title, fonts[:2],
+            resolution_config=resolution, bg_color_config=bg_color_config,
+            animation_duration=ANIMATION_DURATION, animation_fps=ANIMATION_FPS,
+            animation_format="apng", animation_resolution=ANIMATION_RESOLUTION,
+        )
+    else:
+        image = str(sources[0].parent) if case.style == "static_3" else str(sources[0])
+        result = render_style(case.style, image, title, fonts, resolution_config=resolution, bg_color_config=bg_color_config)
+    if not result:
+        raise RuntimeError(f"{case.case_id} 未返回图片")
+    return base64.b64decode(result)
+
+
+def _frames(data: bytes, limit: int = SAMPLED_FRAMES) -> List[Image.Image]:
+    with Image.open(io.BytesIO(data)) as image:
+        frames = [frame.convert("RGB") for frame in ImageSequence.Iterator(image)]
+    if len(frames) <= limit:
+        return frames
+    step = (len(frames) - 1) / (limit - 1)
+    return [frames[round(index * step)] for index in range(limit)]
+
+
+def _gaussian_window(size: int = 11, sigma: float = 1.5) -> np.ndarray:
+    offsets = np.arange(size, dtype=np.float64) - (size - 1) / 2
+    kernel = np.exp(-(offsets ** 2) / (2 * sigma ** 2))
+    return kernel / kernel.sum()
+
+
+def _filter(values: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """可分离高斯滤波（valid 模式）"""
+    size = kernel.size
+    rows = sum(kernel[i] * values[i:values.shape[0] - size + 1 + i, :] for i in range(size))
+    return sum(kernel[i] * rows[:, i:rows.shape[1] - size + 1 + i] for i in range(size))
+
+
+def ssim(first: Image.Image, second: Image.Image) -> float:
+    """亮度通道上的结构相似度（Wang et al. 2004，11x11 高斯窗口）"""
+    a = np.asarray(first.convert("L"), dtype=np.float64)
+    b = np.asarray(second.convert("L"), dtype=np.float64)
+    kernel = _gaussian_window()
+    if min(a.shape) < kernel.size:
+        return 1.0 if np.array_equal(a, b) else 0.0
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mu_a, mu_b = _filter(a, kernel), _filter(b, kernel)
+    var_a = _filter(a * a, kernel) - mu_a ** 2
+    var_b = _filter(b * b, kernel) - mu_b ** 2
+    covariance = _filter(a * b, kernel) - mu_a * mu_b
+    index = ((2 * mu_a * mu_b + c1) * (2 * covariance + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(index.mean())
+
+
+def _to_lab(image: Image.Image) -> np.ndarray:
+    rgb = np.asarray(image.convert("RGB"), dtype=np.float64) / 255.0
+    linear = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    matrix = np.array([
+        [0.4124564, 0.3575761, 0.1804375],
+        [0.2126729, 0.7151522, 0.0721750],
+        [0.0193339, 0.1191920, 0.9503041],
+    ])
+    xyz = linear @ matrix.T / np.array([0.95047, 1.0, 1.08883])
+    epsilon, kappa = 216 / 24389, 24389 / 27
+    f = np.where(xyz > epsilon, np.cbrt(xyz), (kappa * xyz + 16) / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def delta_e(first: Image.Image, second: Image.Image) -> Tuple[float, float]:
+    """CIE76 色差，返回 (平均值, 95 分位)"""
+    difference = np.sqrt(((_to_lab(first) - _to_lab(second)) ** 2).sum(axis=-1))
+    return float(difference.mean()), float(np.percentile(difference, 95))
+
+
+def compare_images(golden: bytes, current: bytes, tolerance: Dict[str, float]) -> Dict[str, Any]:
+    """逐帧比较两份输出，取最差帧的指标"""
+    golden_frames, current_frames = _frames(golden), _frames(current)
+    result: Dict[str, Any] = {"frames": len(current_frames)}
+    if len(golden_frames) != len(current_frames):
+        return {**result, "ok": False, "reason": f"帧数不一致: {len(golden_frames)} -> {len(current_frames)}"}
+    if golden_frames[0].size != current_frames[0].size:
+        return {**result, "ok": False, "reason": f"尺寸不一致: {golden_frames[0].size} -> {current_frames[0].size}"}
+    scores = [ssim(a, b) for a, b in zip(golden_frames, current_frames)]
+    differences = [delta_e(a, b) for a, b in zip(golden_frames, current_frames)]
+    result.update({
+        "ssim": round(min(scores), 5),
+        "delta_e_mean": round(max(mean for mean, _ in differences), 4),
+        "delta_e_p95": round(max(p95 for _, p95 in differences), 4),
+    })
+    failures = []
+    if result["ssim"] < tolerance["ssim_min"]:
+        failures.append(f"SSIM {result['ssim']} < {tolerance['ssim_min']}")
+    if result["delta_e_mean"] > tolerance["delta_e_mean_max"]:
+        failures.append(f"平均 ΔE {result['delta_e_mean']} > {tolerance['delta_e_mean_max']}")
+    if result["delta_e_p95"] > tolerance["delta_e_p95_max"]:
+        failures.append(f"P95 ΔE {result['delta_e_p95']} > {tolerance['delta_e_p95_max']}")
+    result["ok"] = not failures
+    if failures:
+        result["reason"] = "；".join(failures)
+    return result
+
+
+def run_golden(golden_dir: Path, fonts: Tuple[str, str, str], update: bool = False,
+               case_ids: Optional[List[str]] = None, tolerance: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    update=True 时重写金标；否则与金标比较。manifest.json 中的按用例容差优先于默认值
+
+    更新时任一用例渲染失败即抛出 RuntimeError，不写入任何金标与 manifest，避免留下缺少部分用例的金标集
+    """
+    manifest_path = golden_dir / "manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {"cases": {}}
+    base_tolerance = {**DEFAULT_TOLERANCE, **(manifest.get("tolerance") or {}), **(tolerance or {})}
+    sources = create_sources(golden_dir / "sources")
+    results: Dict[str, Any] = {}
+    updates: List[Tuple[GoldenCase, bytes]] = []
+    for case in golden_cases():
+        if case_ids and case.case_id not in case_ids:
+            continue
+        try:
+            rendered = render_case(case, sources, fonts)
+        except Exception as err:
+            results[case.case_id] = {"ok": False, "reason": f"渲染失败: {type(err).__name__}: {err}"}
+            continue
+        if update:
+            updates.append((case, rendered))
+            continue
+        golden_file = manifest["cases"].get(case.case_id, {}).get("file")
+        golden_path = golden_dir / golden_file if golden_file else None
+        if golden_path is None or not golden_path.exists():
+            results[case.case_id] = {"ok": False, "reason": "缺少金标，请先使用 --update 生成"}
+            continue
+        case_tolerance = {**base_tolerance, **(manifest["cases"].get(case.case_id, {}).get("tolerance") or {})}
+        results[case.case_id] = compare_images(golden_path.read_bytes(), rendered, case_tolerance)
+    if update:
+        if results:
+            details = "\n".join(f"  {case_id}: {result['reason']}" for case_id, result in results.items())
+            raise RuntimeError(f"{len(results)} 个用例渲染失败，未更新任何金标:\n{details}")
+        for case, rendered in updates:
+            filename = case.filename(rendered)
+            (golden_dir / filename).write_bytes(rendered)
+            entry = manifest["cases"].setdefault(case.case_id, {})
+            entry.update({"file": filename, "style": case.style, "layout": case.layout})
+            results[case.case_id] = {"ok": True, "updated": True}
+        manifest.setdefault("tolerance", dict(DEFAULT_TOLERANCE))
+        manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return {"golden_dir": str(golden_dir), "tolerance": base_tolerance, "cases": results}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.plugins.yahahacoverstudio.utils.golden", description="封面风格金标图像回归检查")
+    parser.add_argument("--golden-dir", type=Path, required=True, help="金标、素材与 manifest.json 所在目录")
+    parser.add_argument("--font", required=True, help="主标题字体路径；金标与检查必须使用同一字体")
+    parser.add_argument("--subtitle-font", help="副标题字体路径，默认与主标题相同")
+    parser.add_argument("--case", action="append", dest="cases", help="只处理该用例，可重复")
+    parser.add_argument("--update", action="store_true", help="重新渲染并覆盖金标")
+    parser.add_argument("--ssim-min", type=float)
+    parser.add_argument("--delta-e-mean-max", type=float)
+    parser.add_argument("--delta-e-p95-max", type=float)
+    parser.add_argument("--report", type=Path, help="将比较结果写入 JSON 文件")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        key: value for key, value in (
+            ("ssim_min", args.ssim_min),
+            ("delta_e_mean_max", args.delta_e_mean_max),
+            ("delta_e_p95_max", args.delta_e_p95_max),
+        ) if value is not None
+    }
+    args.golden_dir.mkdir(parents=True, exist_ok=True)
+    subtitle_font = args.subtitle_font or args.font
+    try:
+        report = run_golden(args.golden_dir, (args.font, subtitle_font, args.font), args.update, args.cases, overrides)
+    except RuntimeError as err:
+        print(f"金标更新失败: {err}", file=sys.stderr)
+        return 2
+    for case_id, result in report["cases"].items():
+        if result.get("updated"):
+            print(f"{case_id:28s}  已更新金标")
+        elif "ssim" in result:
+            status = "通过" if result["ok"] else f"偏移: {result['reason']}"
+            print(f"{case_id:28s}  SSIM={result['ssim']:.5f}  ΔE={result['delta_e_mean']:.3f}/{result['delta_e_p95']:.3f}  {status}")
+        else:
+            print(f"{case_id:28s}  {result.get('reason')}")
+    if args.report:
+        args.report.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0 if all(result.get("ok") for result in report["cases"].values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
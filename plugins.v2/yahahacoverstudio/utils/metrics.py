@@ -0,0 +1,120 @@
+"""
+运行指标
+插件进程内的计数器与直方图，以 Prometheus 文本格式通过插件 API /metrics 暴露。
+指标名称与 Docker 版 /metrics 保持一致，并附加 source="plugin" 标签便于在同一 Prometheus 中区分。
+"""
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _label_text(names: Tuple[str, ...], values: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = [("source", "plugin")] + list(zip(names, values)) + list((extra or {}).items())
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        value = max(0.0, float(value))
+        with self._lock:
+            counts, total, count = self._series.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._series[key] = (counts, total + value, count + 1)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, {'le': _format_value(bound)})} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, {'le': '+Inf'})} {count}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {count}")
+        return lines
+
+
+GENERATION_STAGE_SECONDS = Histogram("yahaha_generation_stage_seconds", "各生成阶段耗时（fetch、download、render、upload）", ("stage", "style", "server"))
+CACHE_REQUESTS = Counter("yahaha_cache_requests_total", "缓存查询次数，按缓存与结果（hit/miss）", ("cache", "result"))
+RETRIES = Counter("yahaha_retries_total", "重试次数，按操作与服务器", ("operation", "server"))
+FAILURES = Counter("yahaha_failures_total", "失败次数，按操作与服务器", ("operation", "server"))
+UPLOADED_BYTES = Counter("yahaha_uploaded_bytes_total", "上传到媒体服务器的封面字节数", ("server",))
+UPLOADS = Counter("yahaha_uploads_total", "封面上传次数，按服务器与结果", ("server", "result"))
+GENERATION_QUEUE_DEPTH = Gauge("yahaha_generation_queue_depth", "当前生成任务中等待处理的媒体库数量", ("state",))
+
+REGISTRY = [GENERATION_STAGE_SECONDS, CACHE_REQUESTS, RETRIES, FAILURES, UPLOADED_BYTES, UPLOADS, GENERATION_QUEUE_DEPTH]
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -205,10 +205,9 @@ def validate_font_file(font_path: Path) -> bool:
         if not font_path.exists() or font_path.stat().st_size == 0:
             return False
 
-        # 尝试加载字体文件
-        from PIL import ImageFont
-        font = ImageFont.truetype(str(font_path), 12)
-        return True
+        # 尝试加载字体文件；结果按路径、修改时间与大小缓存
+        from app.plugins.yahahacoverstudio.utils.font_cache import is_valid_font_file
+        return is_valid_font_file(font_path)
     except Exception as e:
         logger.warning(f"字体文件验证失败: {font_path}, 错误: {e}")
         return False
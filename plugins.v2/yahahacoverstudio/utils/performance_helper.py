@@ -5,11 +5,13 @@
 import time
 import threading
 import os
-from typing import Tuple, Optional, Callable, Any
+from typing import TYPE_CHECKING, Tuple, Optional, Callable, Any
 from PIL import Image, ImageFilter
-import numpy as np
 from app.log import logger
 
+if TYPE_CHECKING:
+    import numpy as np
+
 
 _GC_LOCK = threading.Lock()
 _LAST_FULL_GC = 0.0
@@ -103,6 +105,9 @@ class OptimizedImageProcessor:
             if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
                 analysis_image.thumbnail(max_size, Image.Resampling.LANCZOS)
 
+            # numpy 只在颜色分析时导入，插件加载不依赖它
+            import numpy as np
+
             # 转换为RGB数组
             img_array = np.array(analysis_image)
             pixels = img_array.reshape(-1, 3)
@@ -111,10 +116,12 @@ class OptimizedImageProcessor:
             return OptimizedImageProcessor._simple_color_extraction(pixels, num_colors)
 
     @staticmethod
-    def _simple_color_extraction(pixels: np.ndarray, num_colors: int) -> list:
+    def _simple_color_extraction(pixels: "np.ndarray", num_colors: int) -> list:
         """
         简化的颜色提取方法（不依赖sklearn）
         """
+        import numpy as np
+
         # 量化颜色空间
         quantized = (pixels // 32) * 32  # 将颜色量化到32的倍数
 
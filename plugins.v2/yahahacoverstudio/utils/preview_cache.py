@@ -0,0 +1,169 @@
+"""
+预览结果缓存
+以规范化哈希为键（风格、全部渲染参数：布局/模板、标题、字体、分辨率，以及源图片与字体文件的路径/大小/修改时间），
+在内存中保留最近的预览渲染结果。重复预览、撤销/重做或切回之前的设置时直接返回，无需重新渲染。
+编辑时先渲染低分辨率草图（无颗粒、按比例缩小模糊半径、动图只渲染一帧），同一会话的新请求会取代尚未开始渲染的旧请求。
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.plugins.yahahacoverstudio.utils import metrics
+
+
+PREVIEW_CACHE_SIZE = 32
+# 预览只需要屏幕显示尺寸，高于此分辨率的配置在预览时按此渲染
+PREVIEW_MAX_RESOLUTION = (1280, 720)
+DRAFT_RESOLUTION = (640, 360)
+MAX_DIRECTORY_ENTRIES = 200
+
+
+def _path_identity(path: str) -> Any:
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return path
+    if os.path.isdir(path):
+        try:
+            names = sorted(os.listdir(path))[:MAX_DIRECTORY_ENTRIES]
+        except OSError:
+            names = []
+        return [path, [_path_identity(os.path.join(path, name)) for name in names if not os.path.isdir(os.path.join(path, name))]]
+    return [path, stat_result.st_size, stat_result.st_mtime_ns]
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, Path):
+        return _path_identity(str(value))
+    if isinstance(value, str):
+        return _path_identity(value) if value.startswith("/") and len(value) < 4096 else value
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(item) for item in value]
+        return sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, (bytes, bytearray)):
+        return hashlib.sha256(value).hexdigest()
+    if hasattr(value, "__dict__"):
+        return {"__type__": type(value).__name__, **{key: _canonical(item) for key, item in vars(value).items()}}
+    return repr(value)
+
+
+def preview_key(style: str, args: tuple, kwargs: dict) -> str:
+    """渲染调用的规范化哈希；源图片、目录与字体按文件身份参与计算"""
+    canonical = {"style": style, "args": _canonical(args), "kwargs": _canonical(kwargs)}
+    encoded = json.dumps(canonical, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=repr)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _without_grain(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_without_grain(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: 0 if key == "grain" else _without_grain(item) for key, item in value.items()}
+
+
+def draft_render_kwargs(style: str, kwargs: dict, blur_scale: float) -> dict:
+    """草图渲染参数：去掉颗粒，动图只渲染一帧，无布局模板时按分辨率比例缩小模糊半径"""
+    draft = dict(kwargs)
+    if style.startswith("animated"):
+        draft["animation_fps"] = 1
+        draft["animation_duration"] = 1
+    for key in ("layout_config", "bg_color_config"):
+        if isinstance(draft.get(key), dict):
+            draft[key] = _without_grain(draft[key])
+    # 布局模板按设计尺寸合成，模糊半径不随输出分辨率缩放
+    if "blur_size" in draft and not draft.get("layout_config") and not style.startswith("animated"):
+        try:
+            draft["blur_size"] = max(1, int(round(float(draft["blur_size"]) * blur_scale)))
+        except (TypeError, ValueError):
+            pass
+    return draft
+
+
+class PreviewOverride:
+    """
+    插件实例属性；预览请求在 state.overrides 打开期间的赋值只写入当前线程的覆盖表，
+    其他线程（定时/手动生成、并发的其他预览）始终读到原始配置，预览结束时丢弃覆盖表即可，无需恢复
+    """
+
+    def __init__(self, state: threading.local, default: Any = None):
+        self._state = state
+        self.default = default
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        overrides = getattr(self._state, "overrides", None)
+        if overrides is not None and self.name in overrides:
+            return overrides[self.name]
+        return instance.__dict__.get(self.name, self.default)
+
+    def __set__(self, instance, value) -> None:
+        overrides = getattr(self._state, "overrides", None)
+        if overrides is not None:
+            overrides[self.name] = value
+        else:
+            instance.__dict__[self.name] = value
+
+
+class PreviewSessions:
+    """每个编辑会话最新的预览请求；开始新请求时通知被取代的旧请求停止"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: Dict[str, threading.Event] = {}
+
+    def begin(self, session: str) -> threading.Event:
+        cancel = threading.Event()
+        with self._lock:
+            previous = self._active.get(session)
+            self._active[session] = cancel
+        if previous is not None:
+            previous.set()
+        return cancel
+
+    def finish(self, session: str, cancel: threading.Event) -> None:
+        with self._lock:
+            if self._active.get(session) is cancel:
+                del self._active[session]
+
+
+class PreviewCache:
+    """线程安全的 LRU 预览结果缓存"""
+
+    def __init__(self, max_entries: int = PREVIEW_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            image_data = self._entries.get(key)
+            if image_data is not None:
+                self._entries.move_to_end(key)
+        metrics.CACHE_REQUESTS.inc(cache="preview_render", result="hit" if image_data is not None else "miss")
+        return image_data
+
+    def put(self, key: str, image_data: str) -> None:
+        if not image_data:
+            return
+        with self._lock:
+            self._entries[key] = image_data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,149 @@
+"""
+远程渲染
+把风格渲染任务发送到 Docker 版的 /api/v1/render/batch 接口，由独立的容器或主机完成渲染。
+插件内风格函数的参数在这里转换为 Docker 版渲染配置；字体按预设名在远端解析。
+"""
+import base64
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import requests
+
+from app.log import logger
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+# 插件风格名 -> Docker 版风格名；static_1..4 与 animated_* 由 Docker 端的 normalize_style 统一映射
+_REMOTE_STYLES = {"static_custom": "custom_static"}
+_POSITIONAL = ("images", "title", "font_path")
+# 等待远端响应时检查停止信号的间隔（秒）
+STOP_POLL_SECONDS = 0.5
+
+
+class RemoteRenderUnavailable(RuntimeError):
+    """远端不可达、未授权或返回了无法识别的响应，调用方可以退回本地渲染"""
+
+
+def _collect_images(source: Any, limit: int) -> List[Path]:
+    if isinstance(source, dict):
+        candidates = [Path(str(source[key])) for key in sorted(source) if source[key]]
+    elif isinstance(source, (list, tuple)):
+        candidates = [Path(str(item)) for item in source if item]
+    elif source:
+        path = Path(str(source))
+        if path.is_dir():
+            candidates = sorted(item for item in path.iterdir() if item.suffix.lower() in IMAGE_EXTENSIONS)
+        else:
+            candidates = [path]
+    else:
+        candidates = []
+    return [path for path in candidates if path.is_file()][:limit]
+
+
+def build_render_job(style: str, args: Tuple[Any, ...], kwargs: Dict[str, Any], fonts: Dict[str, str]) -> Dict[str, Any]:
+    """把 render_style(style, *args, **kwargs) 的参数转换为一个远程渲染任务"""
+    params = dict(zip(_POSITIONAL, args))
+    params.update(kwargs)
+    if "image_slots" in params:
+        params["images"] = params.pop("image_slots")
+    title = params.get("title") or ("", "")
+    config: Dict[str, Any] = {f"{role}_font_preset": preset for role, preset in fonts.items() if preset}
+    font_size = params.get("font_size")
+    if isinstance(font_size, (list, tuple)) and len(font_size) >= 2:
+        config["main_title_font_size"] = font_size[0]
+        config["subtitle_font_size"] = font_size[1]
+    for source, target in (("blur_size", "blur_size"), ("color_ratio", "color_ratio"), ("image_count", "animated_2_image_count"), ("departure_type", "animated_2_departure_type")):
+        if params.get(source) is not None:
+            config[target] = params[source]
+    for key in ("animation_duration", "animation_scroll", "animation_fps", "animation_format", "animation_resolution", "animation_reduce_colors"):
+        if params.get(key) is not None:
+            config[key] = params[key]
+    resolution_config = params.get("resolution_config")
+    if resolution_config is not None:
+        config["resolution"] = f"{resolution_config.width}x{resolution_config.height}"
+    bg_color_config = params.get("bg_color_config") or {}
+    if bg_color_config.get("mode") == "custom" and bg_color_config.get("custom_color"):
+        config["background_color"] = bg_color_config["custom_color"]
+    elif bg_color_config.get("mode") == "config" and bg_color_config.get("config_color"):
+        config["background_color"] = bg_color_config["config_color"]
+    limit = int(params.get("image_count") or 0) or 9
+    images = _collect_images(params.get("images"), max(1, min(60, limit)))
+    return {
+        "style": _REMOTE_STYLES.get(style, style),
+        "title": str(title[0] if len(title) > 0 else ""),
+        "subtitle": str(title[1] if len(title) > 1 else ""),
+        "config": config,
+        "layout": params.get("layout_config") or None,
+        "images": [base64.b64encode(path.read_bytes()).decode("ascii") for path in images],
+    }
+
+
+class RemoteRenderClient:
+    """Docker 版批量渲染接口的客户端"""
+
+    def __init__(self, base_url: str, token: str, timeout: float = 600):
+        self.base_url = str(base_url or "").rstrip("/")
+        self.token = str(token or "").strip()
+        self.timeout = float(timeout)
+
+    def render_batch(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            response = requests.post(
+                f"{self.base_url}/api/v1/render/batch",
+                json={"jobs": jobs},
+                headers={"Authorization": f"Bearer {self.token}"},
+                timeout=(10, self.timeout),
+            )
+        except requests.RequestException as err:
+            raise RemoteRenderUnavailable(f"远程渲染服务不可达: {err}") from err
+        if response.status_code != 200:
+            raise RemoteRenderUnavailable(f"远程渲染服务返回 HTTP {response.status_code}")
+        try:
+            results = response.json()["data"]["results"]
+        except (ValueError, KeyError, TypeError) as err:
+            raise RemoteRenderUnavailable(f"远程渲染服务响应无法解析: {err}") from err
+        if not isinstance(results, list) or len(results) != len(jobs):
+            raise RemoteRenderUnavailable("远程渲染服务返回的结果数量不一致")
+        return results
+
+    def _render_batch_until_stopped(self, jobs: List[Dict[str, Any]], stop_event: Optional[threading.Event]) -> Optional[List[Dict[str, Any]]]:
+        """在后台线程中发送请求并等待响应；收到停止信号时不再等待（请求结果被丢弃），返回 None"""
+        if stop_event is None:
+            return self.render_batch(jobs)
+        outcome: Dict[str, Any] = {}
+
+        def send() -> None:
+            try:
+                outcome["results"] = self.render_batch(jobs)
+            except BaseException as err:
+                outcome["error"] = err
+
+        sender = threading.Thread(target=send, name="yahaha-remote-render", daemon=True)
+        sender.start()
+        while sender.is_alive():
+            if stop_event.wait(STOP_POLL_SECONDS):
+                return None
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["results"]
+
+    def render(self, style: str, args: Tuple[Any, ...], kwargs: Dict[str, Any], fonts: Dict[str, str]) -> Union[str, bool]:
+        """
+        远程执行单个风格渲染，返回与本地风格函数一致的 Base64 字符串；收到停止信号时返回 False（与本地渲染的停止语义一致）
+
+        Raises:
+            RemoteRenderUnavailable: 远端不可用或该任务在远端渲染失败，调用方退回本地渲染
+        """
+        kwargs = dict(kwargs)
+        stop_event = kwargs.pop("stop_event", None)
+        if stop_event is not None and stop_event.is_set():
+            return False
+        results = self._render_batch_until_stopped([build_render_job(style, args, kwargs, fonts)], stop_event)
+        if results is None:
+            logger.info(f"远程渲染 {style} 收到停止信号，不再等待远端结果")
+            return False
+        result = results[0]
+        if not result.get("ok") or not isinstance(result.get("data"), str):
+            raise RemoteRenderUnavailable(f"远程渲染 {style} 失败: {result.get('error') or '未返回图片数据'}")
+        return result["data"]
@@ -0,0 +1,264 @@
+"""
+渲染子进程
+将风格渲染放到常驻子进程中执行，通过标准输入输出上的长度前缀 pickle 帧传递任务与结果。
+Pillow/NumPy 的内存池很少归还给系统，子进程在处理一定数量的任务或常驻内存超出预算后自动回收，
+崩溃或卡死的渲染也只会结束子进程，不影响 MoviePilot 主进程。
+子进程以脚本方式启动，不执行 app.plugins 与插件包的 __init__，只加载渲染所需的模块。
+"""
+import os
+import pickle
+import select
+import struct
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import types
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from app.log import logger
+
+
+_HEADER = struct.Struct(">Q")
+_SCRIPT = Path(__file__).resolve()
+_PLUGIN_DIR = _SCRIPT.parents[1]
+_PLUGIN_PACKAGE = "app.plugins.yahahacoverstudio"
+# render_worker.py -> utils -> yahahacoverstudio -> plugins -> app -> MoviePilot 根目录
+_APP_ROOT = _SCRIPT.parents[4]
+
+
+class RenderWorkerError(RuntimeError):
+    """子进程异常退出或超时"""
+
+
+class RenderWorkerUnavailable(RenderWorkerError):
+    """子进程无法启动，调用方可以退回进程内渲染"""
+
+
+def _write_frame(stream: BinaryIO, payload: Any) -> None:
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    stream.write(_HEADER.pack(len(data)))
+    stream.write(data)
+    stream.flush()
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _read_frame_until(fd: int, deadline: float, stop_event: Optional[threading.Event]) -> Tuple[str, Any]:
+    """
+    在截止时间前从文件描述符读取一帧；每次读取前都等待可读，写了半帧就卡住的子进程同样受超时约束
+
+    Returns:
+        ("ok", 帧内容)、("stopped", None)、("timeout", None) 或 ("eof", None)
+    """
+    buffer = bytearray()
+    expected: Optional[int] = None
+    while True:
+        if stop_event is not None and stop_event.is_set():
+            return "stopped", None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return "timeout", None
+        ready, _, _ = select.select([fd], [], [], min(0.5, remaining))
+        if not ready:
+            continue
+        chunk = os.read(fd, 1 << 20)
+        if not chunk:
+            return "eof", None
+        buffer += chunk
+        if expected is None and len(buffer) >= _HEADER.size:
+            expected = _HEADER.size + _HEADER.unpack_from(buffer)[0]
+        if expected is not None and len(buffer) >= expected:
+            return "ok", pickle.loads(bytes(buffer[_HEADER.size:expected]))
+
+
+def _read_frame(stream: BinaryIO) -> Any:
+    header = _read_exact(stream, _HEADER.size)
+    if header is None:
+        return None
+    data = _read_exact(stream, _HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    return pickle.loads(data)
+
+
+def _current_rss() -> int:
+    """当前常驻内存（字节）；无 /proc 时退回峰值内存"""
+    try:
+        with open("/proc/self/statm", "r", encoding="ascii") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+    except Exception:
+        return 0
+
+
+class RenderWorker:
+    """
+    常驻渲染子进程的主进程端
+
+    同一时间只处理一个任务；子进程按需启动，处理 max_jobs 个任务或常驻内存超过 rss_limit_mb 后回收。
+    """
+
+    def __init__(self, max_jobs: int = 50, rss_limit_mb: int = 1024, timeout: float = 900):
+        self.max_jobs = max(1, int(max_jobs))
+        self.rss_limit = max(128, int(rss_limit_mb)) * 1024 * 1024
+        self.timeout = float(timeout)
+        self._lock = threading.Lock()
+        self._process: Optional[subprocess.Popen] = None
+        self._jobs = 0
+
+    def configure(self, max_jobs: int, rss_limit_mb: int) -> None:
+        self.max_jobs = max(1, int(max_jobs))
+        self.rss_limit = max(128, int(rss_limit_mb)) * 1024 * 1024
+
+    def _ensure_process(self) -> subprocess.Popen:
+        if self._process and self._process.poll() is None:
+            return self._process
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(_APP_ROOT), env.get("PYTHONPATH", "")]))
+        try:
+            self._process = subprocess.Popen(
+                [sys.executable, str(_SCRIPT)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                env=env,
+            )
+        except OSError as err:
+            self._process = None
+            raise RenderWorkerUnavailable(f"渲染子进程启动失败: {err}") from err
+        self._jobs = 0
+        logger.info(f"渲染子进程已启动 pid={self._process.pid}")
+        return self._process
+
+    def _kill(self, reason: str, force: bool = False) -> None:
+        """空闲子进程关闭 stdin 让其自行退出；正在渲染的子进程（force）直接结束"""
+        process, self._process = self._process, None
+        if not process:
+            return
+        logger.info(f"回收渲染子进程 pid={process.pid}: {reason}")
+        try:
+            if not force and process.poll() is None:
+                try:
+                    process.stdin.close()
+                    process.wait(timeout=5)
+                except Exception:
+                    pass
+            if process.poll() is None:
+                process.kill()
+                process.wait(timeout=5)
+        except Exception as err:
+            logger.warning(f"结束渲染子进程失败 pid={process.pid}: {err}")
+        finally:
+            for stream in (process.stdin, process.stdout):
+                try:
+                    if stream:
+                        stream.close()
+                except Exception:
+                    pass
+
+    def _await_response(self, process: subprocess.Popen, stop_event: Optional[threading.Event]) -> Tuple[bool, Any]:
+        # 直接读取文件描述符，不经过带缓冲的 process.stdout
+        status, response = _read_frame_until(process.stdout.fileno(), time.monotonic() + self.timeout, stop_event)
+        if status == "stopped":
+            self._kill("收到停止信号", force=True)
+            return False, None
+        if status == "timeout":
+            self._kill("渲染超时", force=True)
+            raise RenderWorkerError(f"渲染超过 {int(self.timeout)} 秒未完成，已结束子进程")
+        if status == "eof":
+            code = process.poll()
+            self._kill("子进程异常退出", force=True)
+            raise RenderWorkerError(f"渲染子进程异常退出 code={code}")
+        return True, response
+
+    def render(self, style: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        """在子进程中执行 render_style(style, *args, **kwargs)；stop_event 留在主进程用于中断"""
+        kwargs = dict(kwargs)
+        stop_event = kwargs.pop("stop_event", None)
+        with self._lock:
+            process = self._ensure_process()
+            try:
+                _write_frame(process.stdin, {"style": style, "args": args, "kwargs": kwargs})
+            except (BrokenPipeError, OSError) as err:
+                self._kill("写入任务失败", force=True)
+                raise RenderWorkerError(f"渲染任务发送失败: {err}") from err
+            completed, response = self._await_response(process, stop_event)
+            if not completed:
+                # 与进程内渲染的停止语义一致
+                return False
+            self._jobs += 1
+            rss = int(response.get("rss") or 0)
+            if self._jobs >= self.max_jobs:
+                self._kill(f"已处理 {self._jobs} 个任务")
+            elif rss > self.rss_limit:
+                self._kill(f"常驻内存 {rss // (1024 * 1024)}MB 超出预算")
+        if not response.get("ok"):
+            logger.debug(response.get("traceback") or "")
+            raise RuntimeError(response.get("error") or "渲染子进程返回未知错误")
+        return response.get("result")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._kill("插件停止")
+
+
+def _register_lean_packages() -> None:
+    """
+    以空的包对象登记 app.plugins 与插件包，只保留 __path__ 供子模块导入；
+    两者的 __init__ 会加载 MoviePilot 插件体系（fastapi、apscheduler、app.chain/db 等），渲染子进程不需要
+    """
+    import app
+
+    for name, path in (("app.plugins", _PLUGIN_DIR.parent), (_PLUGIN_PACKAGE, _PLUGIN_DIR)):
+        if name in sys.modules:
+            continue
+        package = types.ModuleType(name)
+        package.__path__ = [str(path)]
+        package.__package__ = name
+        sys.modules[name] = package
+    app.plugins = sys.modules["app.plugins"]
+    app.plugins.yahahacoverstudio = sys.modules[_PLUGIN_PACKAGE]
+
+
+def _serve() -> None:
+    # 协议独占原始 stdout；渲染代码中的 print 等输出转到 stderr，避免破坏帧
+    protocol_out = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    requests = sys.stdin.buffer
+
+    _register_lean_packages()
+    from app.plugins.yahahacoverstudio.style.registry import render_style
+
+    while True:
+        request = _read_frame(requests)
+        if request is None:
+            break
+        try:
+            response = {"ok": True, "result": render_style(request["style"], *request["args"], **request["kwargs"])}
+        except Exception as err:
+            response = {"ok": False, "error": f"{type(err).__name__}: {err}", "traceback": traceback.format_exc()}
+        response["rss"] = _current_rss()
+        _write_frame(protocol_out, response)
+
+
+if __name__ == "__main__":
+    # 以脚本启动时 sys.path[0] 是 utils 目录，移除以免其中的模块名遮蔽顶层包
+    if sys.path and Path(sys.path[0] or ".").resolve() == _SCRIPT.parent:
+        del sys.path[0]
+    _serve()
@@ -0,0 +1,156 @@
+"""
+SVG 模板图片预缩放缓存
+CairoSVG 会完整解码 <image> 引用的原图，再缩小绘制到图层区域；几千万像素的海报只为画进几百像素的槽位。
+这里按图层在画布上的实际像素尺寸（乘以设备缩放）生成缩小后的副本，按（源文件身份、目标尺寸、适应方式）缓存到磁盘，
+SVG 改为引用这些副本，CairoSVG 的解码与内存开销随输出尺寸而不是源图尺寸增长。渲染子进程通过环境变量共享同一目录。
+"""
+import hashlib
+import math
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from app.log import logger
+from app.plugins.yahahacoverstudio.utils import metrics
+
+
+CACHE_DIR_ENV = "YAHAHA_SCALED_IMAGE_CACHE"
+MAX_SCALED_IMAGES = 256
+# 源图不比目标大多少时直接引用原图，省去一次重新编码
+MIN_SHRINK_RATIO = 1.25
+FITS = ("cover", "contain", "stretch")
+
+
+def scaled_size(source_size: Tuple[int, int], target_size: Tuple[int, int], fit: str) -> Tuple[int, int]:
+    """按适应方式计算副本尺寸：cover 居中裁切为目标尺寸，contain 保持比例缩入目标，stretch 直接拉伸为目标尺寸"""
+    source_width, source_height = source_size
+    target_width, target_height = max(1, target_size[0]), max(1, target_size[1])
+    if fit == "stretch" or source_width <= 0 or source_height <= 0:
+        return target_width, target_height
+    if fit == "contain":
+        scale = min(target_width / source_width, target_height / source_height)
+        return max(1, int(round(source_width * scale))), max(1, int(round(source_height * scale)))
+    return target_width, target_height
+
+
+def worth_scaling(source_size: Tuple[int, int], target_size: Tuple[int, int], fit: str) -> bool:
+    """源图绘制时至少缩小 MIN_SHRINK_RATIO 倍才生成副本"""
+    source_width, source_height = source_size
+    if source_width <= 0 or source_height <= 0:
+        return False
+    scale_x, scale_y = target_size[0] / source_width, target_size[1] / source_height
+    if fit == "stretch":
+        return min(scale_x, scale_y) * MIN_SHRINK_RATIO <= 1
+    scale = min(scale_x, scale_y) if fit == "contain" else max(scale_x, scale_y)
+    return scale * MIN_SHRINK_RATIO <= 1
+
+
+class ScaledImageCache:
+    """线程安全的预缩放图片磁盘缓存，超出上限时淘汰最久未使用的副本"""
+
+    def __init__(self, root: Optional[Path] = None, max_entries: int = MAX_SCALED_IMAGES):
+        self._root = root
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def configure(self, root: Optional[Path]) -> None:
+        with self._lock:
+            self._root = Path(root) if root else None
+        if root:
+            os.environ[CACHE_DIR_ENV] = str(root)
+
+    @property
+    def root(self) -> Path:
+        if self._root is None:
+            self._root = Path(os.environ.get(CACHE_DIR_ENV) or Path(tempfile.gettempdir()) / "yahaha_scaled_images")
+        return self._root
+
+    @staticmethod
+    def key(path: str, target_size: Tuple[int, int], fit: str) -> str:
+        stat_result = os.stat(path)
+        identity = f"{Path(path).resolve()}|{stat_result.st_size}|{stat_result.st_mtime_ns}|{target_size[0]}x{target_size[1]}|{fit}"
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+    def scaled_path(self, path: str, width: float, height: float, fit: str = "cover", device_scale: float = 1.0) -> Optional[Path]:
+        """
+        返回按图层画布尺寸缩小后的副本路径
+
+        Args:
+            path: 源图片路径
+            width, height: 图层在画布上的尺寸（画布像素）
+            fit: cover / contain / stretch，与 SVG preserveAspectRatio 对应
+            device_scale: 光栅化时画布到输出像素的缩放
+
+        Returns:
+            副本路径；源图不够大、无法读取或写入失败时返回 None，调用方应继续引用原图
+        """
+        fit = fit if fit in FITS else "cover"
+        target_size = (max(1, int(math.ceil(width * device_scale))), max(1, int(math.ceil(height * device_scale))))
+        try:
+            key = self.key(path, target_size, fit)
+        except OSError:
+            return None
+        for suffix in (".jpg", ".png"):
+            cached = self.root / f"{key}{suffix}"
+            try:
+                if cached.stat().st_size > 0:
+                    # 更新修改时间，淘汰时保留最近使用的副本
+                    os.utime(cached)
+                    metrics.CACHE_REQUESTS.inc(cache="scaled_image", result="hit")
+                    return cached
+            except OSError:
+                continue
+        metrics.CACHE_REQUESTS.inc(cache="scaled_image", result="miss")
+        try:
+            return self._create(path, key, target_size, fit)
+        except Exception as err:
+            logger.warning(f"预缩放图片失败，继续引用原图 {path}: {err}")
+            return None
+
+    def _create(self, path: str, key: str, target_size: Tuple[int, int], fit: str) -> Optional[Path]:
+        with Image.open(path) as source:
+            if not worth_scaling(source.size, target_size, fit):
+                return None
+            size = scaled_size(source.size, target_size, fit)
+            # JPEG 在解码阶段按 1/2、1/4、1/8 缩小，不必解码完整像素
+            source.draft("RGB", (size[0] * 2, size[1] * 2))
+            has_alpha = source.mode in ("RGBA", "LA", "PA") or (source.mode == "P" and "transparency" in source.info)
+            image = source.convert("RGBA" if has_alpha else "RGB")
+            if fit == "cover":
+                image = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+            else:
+                image = image.resize(size, Image.Resampling.LANCZOS)
+        suffix = ".png" if has_alpha else ".jpg"
+        self.root.mkdir(parents=True, exist_ok=True)
+        target = self.root / f"{key}{suffix}"
+        temp_path = self.root / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp{suffix}"
+        if has_alpha:
+            image.save(temp_path, format="PNG")
+        else:
+            image.save(temp_path, format="JPEG", quality=92)
+        os.replace(temp_path, target)
+        self.prune()
+        return target
+
+    def prune(self) -> int:
+        with self._lock:
+            try:
+                entries = [path for path in self.root.iterdir() if path.is_file() and not path.name.startswith(".")]
+                entries.sort(key=lambda path: path.stat().st_mtime_ns, reverse=True)
+            except OSError:
+                return 0
+            removed = 0
+            for path in entries[self.max_entries:]:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+            return removed
+
+
+SCALED_IMAGES = ScaledImageCache()